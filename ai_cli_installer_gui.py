@@ -1,6 +1,14 @@
+import atexit
+import base64
+import collections
+import contextlib
 import ctypes
-import glob
+import functools
+import itertools
 import os
+import queue
+import random
+import re
 import shlex
 import shutil
 import stat
@@ -10,8 +18,10 @@ import tempfile
 import threading
 import time
 import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Callable, Iterable, Mapping, Optional, TextIO, TypeVar
 
 import wx
 
@@ -20,6 +30,13 @@ try:  # Windows-only
 except ImportError:  # pragma: no cover - exercised on non-Windows only
     winreg = None  # type: ignore[assignment]
 
+try:  # Optional (pywin32): create shortcuts through COM in-process instead of spawning PowerShell.
+    import pythoncom
+    import win32com.client
+except ImportError:  # pragma: no cover - depends on pywin32 being installed
+    pythoncom = None  # type: ignore[assignment]
+    win32com = None  # type: ignore[assignment]
+
 
 CREATE_NO_WINDOW = 0x08000000
 WM_SETTINGCHANGE = 0x001A
@@ -27,18 +44,35 @@ SMTO_ABORTIFHUNG = 0x0002
 NODE_WINGET_ID = "OpenJS.NodeJS.LTS"
 PYTHON_314_WINGET_ID = "Python.Python.3.14"
 OLLAMA_WINGET_ID = "Ollama.Ollama"
+# winget exit codes meaning the package is already present (HRESULTs, compared as unsigned 32-bit).
+WINGET_UPDATE_NOT_APPLICABLE = 0x8A15002B
+WINGET_PACKAGE_ALREADY_INSTALLED = 0x8A150061
+WINGET_INSTALL_ALREADY_INSTALLED = 0x8A15010D
+WINGET_ALREADY_INSTALLED_EXIT_CODES = frozenset(
+    {WINGET_UPDATE_NOT_APPLICABLE, WINGET_PACKAGE_ALREADY_INSTALLED, WINGET_INSTALL_ALREADY_INSTALLED}
+)
 LINUX_OLLAMA_INSTALL_URL = "https://ollama.com/install.sh"
 AUTO_UPDATE_TASK_NAME = "InstallTheCli - Update AI CLIs"
 AUTO_UPDATE_DAILY_TIME = "3:00AM"
+AUTO_UPDATE_TASK_DESCRIPTION = "Hidden npm AI CLI auto-update (user logon + daily) created by InstallTheCli."
 AUTO_UPDATE_DIR_NAME = "InstallTheCli"
 AUTO_UPDATE_PACKAGES_FILE = "auto_update_packages.txt"
 AUTO_UPDATE_SCRIPT_FILE = "auto_update_clis.ps1"
 GUI_LAST_RUN_LOG_FILE = "gui_last_run.log"
 NPM_INSTALL_MAX_ATTEMPTS = 3
 NPM_INSTALL_RETRY_DELAY_SECONDS = 2.0
+NPM_INSTALL_MAX_BACKOFF_SECONDS = 10.0
+INSTALL_MAX_WORKERS = 4
+LOG_FLUSH_INTERVAL_MS = 50
+LOG_FLUSH_MAX_LINES = 500
 NPM_QUIET_FLAGS = ["--no-fund", "--no-audit", "--no-update-notifier", "--loglevel", "error"]
 PIP_QUIET_FLAGS = ["--disable-pip-version-check", "--no-input", "--quiet"]
 
+# Platform facts cannot change while the process runs, so resolve them once at import.
+_IS_WINDOWS = os.name == "nt"
+_IS_LINUX = sys.platform.startswith("linux")
+_CREATIONFLAGS_KWARGS: dict[str, int] = {"creationflags": CREATE_NO_WINDOW} if _IS_WINDOWS else {}
+
 
 @dataclass(frozen=True)
 class CliSpec:
@@ -203,14 +237,24 @@ GUI_APP_SPECS: tuple[GuiAppSpec, ...] = (
 )
 
 
+# Lookup tables derived from the spec tuples; built once since the specs never change.
+_CLI_BY_KEY: dict[str, CliSpec] = {spec.key: spec for spec in CLI_SPECS}
+_GUI_APP_BY_KEY: dict[str, GuiAppSpec] = {spec.key: spec for spec in GUI_APP_SPECS}
+# CLIs installed by their own installers (uv/pip, winget/official script) rather than npm.
+_NON_NPM_CLI_KEYS = frozenset({"mistral", "ollama"})
+# Extra CLI directory lookups (see BinDirCache) the non-npm CLIs need on top of the npm ones.
+_CLI_DIR_KIND_BY_KEY = {"mistral": "python", "ollama": "ollama"}
+
+
 def is_windows() -> bool:
-    return os.name == "nt"
+    return _IS_WINDOWS
 
 
 def is_linux() -> bool:
-    return sys.platform.startswith("linux")
+    return _IS_LINUX
 
 
+@functools.lru_cache(maxsize=1)
 def is_admin() -> bool:
     if not is_windows():
         geteuid = getattr(os, "geteuid", None)
@@ -226,12 +270,29 @@ def is_admin() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
+def _send_message_timeout_w() -> Callable[..., int]:
+    # Resolve the export once and declare its signature so 64-bit handles/pointers marshal correctly.
+    func = ctypes.windll.user32.SendMessageTimeoutW
+    func.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_uint,
+        ctypes.c_size_t,
+        ctypes.c_wchar_p,
+        ctypes.c_uint,
+        ctypes.c_uint,
+        ctypes.POINTER(ctypes.c_size_t),
+    ]
+    func.restype = ctypes.c_ssize_t
+    return func
+
+
 def broadcast_environment_change() -> None:
     if not is_windows():
         return
     try:
-        result = ctypes.c_ulong()
-        ctypes.windll.user32.SendMessageTimeoutW(
+        result = ctypes.c_size_t()
+        _send_message_timeout_w()(
             0xFFFF,
             WM_SETTINGCHANGE,
             0,
@@ -245,26 +306,51 @@ def broadcast_environment_change() -> None:
 
 
 def subprocess_creationflags_kwargs() -> dict[str, int]:
-    if is_windows():
-        return {"creationflags": CREATE_NO_WINDOW}
-    return {}
+    # Shared dict: callers only ever unpack it with ``**``, which copies.
+    return _CREATIONFLAGS_KWARGS
 
 
-def read_linux_os_release() -> dict[str, str]:
+@functools.lru_cache(maxsize=1)
+def _load_linux_os_release() -> tuple[tuple[str, str], ...]:
+    # /etc/os-release does not change while the installer runs, so it is parsed once.
     data: dict[str, str] = {}
-    if not is_linux():
-        return data
     try:
         with open("/etc/os-release", "r", encoding="utf-8") as f:
             for raw_line in f:
                 line = raw_line.strip()
                 if not line or "=" not in line or line.startswith("#"):
                     continue
-                key, value = line.split("=", 1)
-                data[key] = value.strip().strip('"').strip("'")
+                try:
+                    tokens = shlex.split(line, comments=True)
+                except ValueError:
+                    tokens = []
+                if len(tokens) == 1 and "=" in tokens[0]:
+                    key, value = tokens[0].split("=", 1)
+                else:
+                    key, value = line.split("=", 1)
+                    value = value.strip().strip('"').strip("'")
+                data[key.strip()] = value
     except OSError:
+        return ()
+    return tuple(data.items())
+
+
+def read_linux_os_release() -> dict[str, str]:
+    if not is_linux():
         return {}
-    return data
+    return dict(_load_linux_os_release())
+
+
+_DISTRO_FAMILY_BY_TOKEN = {
+    "ubuntu": "debian",
+    "debian": "debian",
+    "fedora": "fedora",
+    "rhel": "fedora",
+    "centos": "fedora",
+    "arch": "arch",
+}
+_DISTRO_TOKEN_RE = re.compile("|".join(_DISTRO_FAMILY_BY_TOKEN))
+_DISTRO_FAMILY_PRIORITY = ("debian", "fedora", "arch")
 
 
 def detect_linux_distro_family() -> Optional[str]:
@@ -273,13 +359,8 @@ def detect_linux_distro_family() -> Optional[str]:
     info = read_linux_os_release()
     values = [info.get("ID", ""), info.get("ID_LIKE", "")]
     haystack = " ".join(v.lower() for v in values if v)
-    if any(token in haystack for token in ("ubuntu", "debian")):
-        return "debian"
-    if any(token in haystack for token in ("fedora", "rhel", "centos")):
-        return "fedora"
-    if "arch" in haystack:
-        return "arch"
-    return None
+    families = {_DISTRO_FAMILY_BY_TOKEN[token] for token in _DISTRO_TOKEN_RE.findall(haystack)}
+    return next((family for family in _DISTRO_FAMILY_PRIORITY if family in families), None)
 
 
 def linux_requires_root_for_system_install() -> bool:
@@ -309,9 +390,16 @@ def split_path(value: str) -> list[str]:
 
 
 def normalize_path_for_compare(path: str) -> str:
-    expanded = os.path.expandvars(path.strip())
-    normalized = os.path.normpath(expanded)
-    return os.path.normcase(normalized)
+    stripped = path.strip()
+    if "%" in stripped or "$" in stripped:
+        # Variable references depend on the live environment, so they are never cached.
+        return _normalize_expanded_path(os.path.expandvars(stripped))
+    return _normalize_expanded_path(stripped)
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_expanded_path(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
 
 
 def is_path_within(path: str, root: str) -> bool:
@@ -323,11 +411,93 @@ def is_path_within(path: str, root: str) -> bool:
         return False
 
 
+# Positive filesystem probe results, only kept while a workflow run is in progress. Misses are
+# never cached, so directories and commands that an install creates are still picked up.
+_fs_probe_cache_active = False
+_ISDIR_CACHE: set[str] = set()
+_WHICH_CACHE: dict[tuple[str, str], str] = {}
+_COMMAND_HIT_CACHE: dict[str, str | tuple[str, ...]] = {}
+# Normalized registry PATH entries per scope, as last read or written during the current run.
+_REGISTRY_PATH_CACHE: dict[str, set[str]] = {}
+
+
+def reset_fs_caches() -> None:
+    _ISDIR_CACHE.clear()
+    _WHICH_CACHE.clear()
+    _COMMAND_HIT_CACHE.clear()
+    _REGISTRY_PATH_CACHE.clear()
+
+
+@contextlib.contextmanager
+def fs_probe_cache():
+    """Memoize positive isdir/which probes for the duration of one workflow run."""
+    global _fs_probe_cache_active
+    reset_fs_caches()
+    previous, _fs_probe_cache_active = _fs_probe_cache_active, True
+    try:
+        yield
+    finally:
+        _fs_probe_cache_active = previous
+        reset_fs_caches()
+
+
+def run_with_fs_probe_cache(target: Callable[..., None], *args: object) -> None:
+    with fs_probe_cache():
+        target(*args)
+
+
+def _isdir_cached(path: str) -> bool:
+    if path in _ISDIR_CACHE:
+        return True
+    if not os.path.isdir(path):
+        return False
+    if _fs_probe_cache_active:
+        _ISDIR_CACHE.add(path)
+    return True
+
+
+def _which_cached(cmd: str) -> Optional[str]:
+    key = (cmd, os.environ.get("PATH", ""))
+    cached = _WHICH_CACHE.get(key)
+    if cached is not None:
+        return cached
+    found = shutil.which(cmd)
+    if found and _fs_probe_cache_active:
+        _WHICH_CACHE[key] = found
+    return found
+
+
+_T = TypeVar("_T")
+
+
+def _memoize_command_hit(probe: Callable[[], _T]) -> Callable[[], _T]:
+    """Reuse ``probe``'s last hit during a workflow run while that executable still exists.
+
+    A hit is one existence check instead of a PATH scan plus install-location probes; an
+    executable removed by an uninstall step is noticed and probed for again.
+    """
+    key = probe.__qualname__
+
+    @functools.wraps(probe)
+    def wrapper() -> _T:
+        hit = _COMMAND_HIT_CACHE.get(key)
+        if hit is not None:
+            if os.path.exists(hit if isinstance(hit, str) else hit[0]):
+                return hit if isinstance(hit, str) else list(hit)
+            _COMMAND_HIT_CACHE.pop(key, None)
+        found = probe()
+        if found and _fs_probe_cache_active:
+            _COMMAND_HIT_CACHE[key] = found if isinstance(found, str) else tuple(found)
+        return found
+
+    return wrapper
+
+
 def add_dirs_to_path(scope: str, dirs: list[str]) -> tuple[list[str], Optional[str]]:
     if not dirs:
         return ([], None)
 
-    dirs = [d for d in dirs if d and os.path.isdir(os.path.expandvars(d))]
+    dirs = [d for d in dirs if d and _isdir_cached(os.path.expandvars(d))]
     if not dirs:
         return ([], None)
 
@@ -375,28 +545,36 @@ def add_dirs_to_path(scope: str, dirs: list[str]) -> tuple[list[str], Optional[s
     else:
         raise ValueError(f"Unsupported scope: {scope}")
 
+    cached_seen = _REGISTRY_PATH_CACHE.get(scope)
+    if cached_seen is not None and all(normalize_path_for_compare(d) in cached_seen for d in dirs):
+        return ([], None)
+
     added: list[str] = []
     try:
-        with winreg.OpenKey(root, subkey, 0, winreg.KEY_READ | winreg.KEY_WRITE) as key:
+        # Probe with a read-only handle first; only reopen for write when something is missing.
+        with winreg.OpenKey(root, subkey, 0, winreg.KEY_READ) as key:
             try:
                 existing_value, reg_type = winreg.QueryValueEx(key, "Path")
             except FileNotFoundError:
                 existing_value, reg_type = "", winreg.REG_EXPAND_SZ
 
-            parts = split_path(existing_value)
-            seen = {normalize_path_for_compare(p) for p in parts}
-            for directory in dirs:
-                norm = normalize_path_for_compare(directory)
-                if norm not in seen:
-                    parts.append(directory)
-                    seen.add(norm)
-                    added.append(directory)
-
-            if added:
-                new_value = ";".join(parts)
-                if reg_type not in (winreg.REG_EXPAND_SZ, winreg.REG_SZ):
-                    reg_type = winreg.REG_EXPAND_SZ
+        parts = split_path(existing_value)
+        seen = {normalize_path_for_compare(p) for p in parts}
+        for directory in dirs:
+            norm = normalize_path_for_compare(directory)
+            if norm not in seen:
+                parts.append(directory)
+                seen.add(norm)
+                added.append(directory)
+
+        if added:
+            new_value = ";".join(parts)
+            if reg_type not in (winreg.REG_EXPAND_SZ, winreg.REG_SZ):
+                reg_type = winreg.REG_EXPAND_SZ
+            with winreg.OpenKey(root, subkey, 0, winreg.KEY_WRITE) as key:
                 winreg.SetValueEx(key, "Path", 0, reg_type, new_value)
+        if _fs_probe_cache_active:
+            _REGISTRY_PATH_CACHE[scope] = seen
     except PermissionError as exc:
         return ([], str(exc))
     except OSError as exc:
@@ -407,6 +585,7 @@ def add_dirs_to_path(scope: str, dirs: list[str]) -> tuple[list[str], Optional[s
     return (added, None)
 
 
+@functools.lru_cache(maxsize=1)
 def find_desktop_directory() -> str:
     candidates: list[str] = []
 
@@ -442,18 +621,20 @@ def find_desktop_directory() -> str:
     return candidates[0]
 
 
+@functools.lru_cache(maxsize=256)
 def powershell_single_quote(value: str) -> str:
     return "'" + value.replace("'", "''") + "'"
 
 
+# Quoted forms of the constants that every generated script embeds.
+_PS_AUTO_UPDATE_TASK_NAME = powershell_single_quote(AUTO_UPDATE_TASK_NAME)
+_PS_AUTO_UPDATE_DAILY_TIME = powershell_single_quote(AUTO_UPDATE_DAILY_TIME)
+_PS_AUTO_UPDATE_TASK_DESCRIPTION = powershell_single_quote(AUTO_UPDATE_TASK_DESCRIPTION)
+_PS_NPM_QUIET_ARGS = " ".join(powershell_single_quote(flag) for flag in NPM_QUIET_FLAGS)
+
+
 def dedupe_preserve_order(values: list[str]) -> list[str]:
-    unique: list[str] = []
-    seen: set[str] = set()
-    for value in values:
-        if value not in seen:
-            unique.append(value)
-            seen.add(value)
-    return unique
+    return list(dict.fromkeys(values))
 
 
 def get_app_support_directory() -> str:
@@ -472,8 +653,26 @@ def get_gui_last_run_log_path() -> str:
     return os.path.join(get_app_support_directory(), GUI_LAST_RUN_LOG_FILE)
 
 
+# Open persistent log handles by path, kept line-buffered for the rest of the run.
+_persistent_log_files: dict[str, TextIO] = {}
+_persistent_log_lock = threading.Lock()
+
+
+def close_persistent_log_files() -> None:
+    with _persistent_log_lock:
+        handles = list(_persistent_log_files.values())
+        _persistent_log_files.clear()
+    for handle in handles:
+        with contextlib.suppress(OSError):
+            handle.close()
+
+
+atexit.register(close_persistent_log_files)
+
+
 def reset_gui_last_run_log() -> Optional[str]:
     path = get_gui_last_run_log_path()
+    close_persistent_log_files()
     try:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, "w", encoding="utf-8", newline="\n") as f:
@@ -487,12 +686,20 @@ def reset_gui_last_run_log() -> Optional[str]:
 def append_persistent_log_line(path: Optional[str], message: str) -> Optional[str]:
     if not path:
         return None
-    try:
-        with open(path, "a", encoding="utf-8", newline="\n") as f:
-            f.write(message + "\n")
-        return None
-    except OSError as exc:
-        return str(exc)
+    with _persistent_log_lock:
+        handle = _persistent_log_files.get(path)
+        try:
+            if handle is None:
+                handle = open(path, "a", encoding="utf-8", newline="\n", buffering=1)
+                _persistent_log_files[path] = handle
+            handle.write(message + "\n")
+            return None
+        except OSError as exc:
+            _persistent_log_files.pop(path, None)
+            if handle is not None:
+                with contextlib.suppress(OSError):
+                    handle.close()
+            return str(exc)
 
 
 def read_nonempty_lines(path: str) -> list[str]:
@@ -504,11 +711,8 @@ def read_nonempty_lines(path: str) -> list[str]:
 
 
 def write_nonempty_lines(path: str, values: list[str]) -> None:
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
-        for value in values:
-            value = value.strip()
-            if value:
-                f.write(value + "\n")
+    stripped = (value.strip() for value in values)
+    write_text_file(path, "".join(value + "\n" for value in stripped if value))
 
 
 def write_text_file(path: str, content: str) -> None:
@@ -517,9 +721,6 @@ def write_text_file(path: str, content: str) -> None:
 
 
 def build_cli_auto_update_script(npm_exe: str, packages_file: str) -> str:
-    npm_quiet_args = " ".join(
-        powershell_single_quote(flag) for flag in NPM_QUIET_FLAGS
-    )
     lines = [
         "$ErrorActionPreference = 'Stop'",
         "$ProgressPreference = 'SilentlyContinue'",
@@ -532,7 +733,7 @@ def build_cli_auto_update_script(npm_exe: str, packages_file: str) -> str:
         "if (-not (Test-Path -LiteralPath $packagesFile)) { exit 0 }",
         "$packages = Get-Content -LiteralPath $packagesFile -ErrorAction SilentlyContinue | ForEach-Object { $_.Trim() } | Where-Object { $_ }",
         "if (-not $packages -or $packages.Count -eq 0) { exit 0 }",
-        f"$null = & $npm {npm_quiet_args} 'update' '-g' @packages *>&1",
+        f"$null = & $npm {_PS_NPM_QUIET_ARGS} 'update' '-g' @packages *>&1",
         "if ($LASTEXITCODE -is [int]) { exit $LASTEXITCODE }",
         "exit 0",
     ]
@@ -570,34 +771,21 @@ def ensure_cli_auto_update_task(
         f"$action = New-ScheduledTaskAction -Execute 'powershell.exe' -Argument {powershell_single_quote(action_args)}",
         "$triggerStartup = New-ScheduledTaskTrigger -AtStartup",
         "$triggerLogon = New-ScheduledTaskTrigger -AtLogOn",
-        f"$triggerDaily = New-ScheduledTaskTrigger -Daily -At {powershell_single_quote(AUTO_UPDATE_DAILY_TIME)}",
+        f"$triggerDaily = New-ScheduledTaskTrigger -Daily -At {_PS_AUTO_UPDATE_DAILY_TIME}",
         "$settings = New-ScheduledTaskSettingsSet -Hidden -StartWhenAvailable -AllowStartIfOnBatteries -DontStopIfGoingOnBatteries",
         "$principal = New-ScheduledTaskPrincipal -UserId $currentUser -LogonType Interactive -RunLevel Limited",
         "Register-ScheduledTask "
-        + f"-TaskName {powershell_single_quote(AUTO_UPDATE_TASK_NAME)} "
+        + f"-TaskName {_PS_AUTO_UPDATE_TASK_NAME} "
         + "-Action $action "
         + "-Trigger @($triggerStartup, $triggerLogon, $triggerDaily) "
         + "-Settings $settings "
         + "-Principal $principal "
-        + f"-Description {powershell_single_quote('Hidden npm AI CLI auto-update (user logon + daily) created by InstallTheCli.')} "
+        + f"-Description {_PS_AUTO_UPDATE_TASK_DESCRIPTION} "
         + "-Force | Out-Null",
     ]
 
     try:
-        subprocess.run(
-            [
-                "powershell",
-                "-NoProfile",
-                "-ExecutionPolicy",
-                "Bypass",
-                "-Command",
-                "; ".join(register_lines),
-            ],
-            check=True,
-            capture_output=True,
-            text=True,
-            **subprocess_creationflags_kwargs(),
-        )
+        run_powershell_script(register_lines)
     except subprocess.CalledProcessError as exc:
         detail = (exc.stderr or exc.stdout or str(exc)).strip()
         raise RuntimeError(
@@ -638,6 +826,178 @@ def remove_cli_auto_update_packages(
     return kept
 
 
+class PowerShellSession:
+    """Long-lived powershell.exe fed over stdin, so its start-up cost is paid once per install run."""
+
+    def __init__(self) -> None:
+        self._process: Optional[subprocess.Popen[str]] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen[str]:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                **subprocess_creationflags_kwargs(),
+            )
+            assert self._process.stdin is not None
+            self._process.stdin.write("[Console]::OutputEncoding = [Text.Encoding]::UTF8\n")
+        return self._process
+
+    def run(self, script: str) -> tuple[int, str]:
+        with self._lock:
+            process = self._ensure_started()
+            assert process.stdin is not None and process.stdout is not None
+            sentinel = f"__INSTALLTHECLI_DONE_{uuid.uuid4().hex}__"
+            # Base64 keeps the stdin line ASCII-only and single-line whatever the script contains.
+            payload = base64.b64encode(script.encode("utf-8")).decode("ascii")
+            process.stdin.write(
+                "$__code = 0; try { & ([ScriptBlock]::Create([Text.Encoding]::UTF8.GetString("
+                + f"[Convert]::FromBase64String('{payload}')))) *>&1 | Out-String -Stream }} "
+                + "catch { Write-Output $_.Exception.Message; $__code = 1 }; "
+                + f'Write-Output "{sentinel} $__code"\n'
+            )
+            process.stdin.flush()
+            output: list[str] = []
+            for line in process.stdout:
+                if line.startswith(sentinel):
+                    code_text = line[len(sentinel):].strip()
+                    return (int(code_text) if code_text.isdigit() else 1, "".join(output))
+                output.append(line)
+            raise OSError("PowerShell session exited unexpectedly.")
+
+    def close(self) -> None:
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+_powershell_session: Optional[PowerShellSession] = None
+
+
+@contextlib.contextmanager
+def powershell_session():
+    """Route run_powershell_script() through one shared PowerShell process inside the block."""
+    global _powershell_session
+    session = PowerShellSession()
+    previous, _powershell_session = _powershell_session, session
+    try:
+        yield session
+    finally:
+        _powershell_session = previous
+        session.close()
+
+
+def run_powershell_script(script_lines: list[str]) -> subprocess.CompletedProcess[str]:
+    """Run ``script_lines`` as one PowerShell script, reusing the active session when there is one."""
+    session = _powershell_session
+    if session is not None:
+        script = "\n".join(["$ErrorActionPreference = 'Stop'", *script_lines])
+        try:
+            code, output = session.run(script)
+        except OSError:
+            session.close()  # Fall through to a one-shot process below.
+        else:
+            if code != 0:
+                raise subprocess.CalledProcessError(code, ["powershell"], output=output, stderr=output)
+            return subprocess.CompletedProcess(["powershell"], 0, stdout=output, stderr="")
+
+    fd, script_path = tempfile.mkstemp(prefix="installthecli-", suffix=".ps1")
+    try:
+        # Windows PowerShell 5.1 only reads a script as UTF-8 when it carries a BOM.
+        with os.fdopen(fd, "w", encoding="utf-8-sig") as f:
+            f.write("\n".join(["$ErrorActionPreference = 'Stop'", *script_lines]) + "\n")
+        return subprocess.run(
+            ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", script_path],
+            check=True,
+            capture_output=True,
+            text=True,
+            **subprocess_creationflags_kwargs(),
+        )
+    finally:
+        try:
+            os.remove(script_path)
+        except OSError:
+            pass
+
+
+def _create_windows_shortcuts_in_process(shortcuts: list[dict[str, str]]) -> dict[str, str]:
+    failures: dict[str, str] = {}
+    pythoncom.CoInitialize()
+    try:
+        shell = win32com.client.Dispatch("WScript.Shell")
+        for shortcut in shortcuts:
+            try:
+                sc = shell.CreateShortcut(shortcut["shortcut_path"])
+                sc.TargetPath = shortcut["target_path"]
+                if shortcut.get("arguments"):
+                    sc.Arguments = shortcut["arguments"]
+                if shortcut.get("working_directory"):
+                    sc.WorkingDirectory = shortcut["working_directory"]
+                if shortcut.get("icon_location"):
+                    sc.IconLocation = shortcut["icon_location"]
+                sc.Save()
+            except Exception as exc:
+                failures[shortcut["shortcut_path"]] = str(exc) or "shortcut creation failed"
+    finally:
+        pythoncom.CoUninitialize()
+    return failures
+
+
+def create_windows_shortcuts(shortcuts: list[dict[str, str]]) -> dict[str, str]:
+    """Create every shortcut in one pass; returns ``{shortcut_path: error}`` for failures.
+
+    Uses pywin32's COM bindings in-process when available and otherwise a single PowerShell run.
+    """
+    if not shortcuts:
+        return {}
+    if win32com is not None:
+        try:
+            return _create_windows_shortcuts_in_process(shortcuts)
+        except Exception:
+            pass  # COM unavailable in this session; PowerShell below reports its own errors.
+    script_lines = ["$ws = New-Object -ComObject WScript.Shell"]
+    for shortcut in shortcuts:
+        shortcut_path = powershell_single_quote(shortcut["shortcut_path"])
+        script_lines.append("try {")
+        script_lines.append(f"$sc = $ws.CreateShortcut({shortcut_path})")
+        script_lines.append(f"$sc.TargetPath = {powershell_single_quote(shortcut['target_path'])}")
+        if shortcut.get("arguments"):
+            script_lines.append(f"$sc.Arguments = {powershell_single_quote(shortcut['arguments'])}")
+        if shortcut.get("working_directory"):
+            script_lines.append(
+                f"$sc.WorkingDirectory = {powershell_single_quote(shortcut['working_directory'])}"
+            )
+        if shortcut.get("icon_location"):
+            script_lines.append(f"$sc.IconLocation = {powershell_single_quote(shortcut['icon_location'])}")
+        script_lines.append("$sc.Save()")
+        script_lines.append(
+            "} catch { Write-Output ('FAILED' + [char]9 + " + shortcut_path + " + [char]9 + $_.Exception.Message) }"
+        )
+
+    completed = run_powershell_script(script_lines)
+    failures: dict[str, str] = {}
+    for line in (completed.stdout or "").splitlines():
+        marker, _, rest = line.partition("\t")
+        if marker != "FAILED":
+            continue
+        path, _, message = rest.partition("\t")
+        failures[path] = message.strip() or "shortcut creation failed"
+    return failures
+
+
 def create_windows_shortcut(
     shortcut_path: str,
     target_path: str,
@@ -645,28 +1005,19 @@ def create_windows_shortcut(
     working_directory: str = "",
     icon_location: str = "",
 ) -> None:
-    script_lines = [
-        "$ws = New-Object -ComObject WScript.Shell",
-        f"$sc = $ws.CreateShortcut({powershell_single_quote(shortcut_path)})",
-        f"$sc.TargetPath = {powershell_single_quote(target_path)}",
-    ]
-    if arguments:
-        script_lines.append(f"$sc.Arguments = {powershell_single_quote(arguments)}")
-    if working_directory:
-        script_lines.append(
-            f"$sc.WorkingDirectory = {powershell_single_quote(working_directory)}"
-        )
-    if icon_location:
-        script_lines.append(f"$sc.IconLocation = {powershell_single_quote(icon_location)}")
-    script_lines.append("$sc.Save()")
-
-    subprocess.run(
-        ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", "; ".join(script_lines)],
-        check=True,
-        capture_output=True,
-        text=True,
-        **subprocess_creationflags_kwargs(),
+    failures = create_windows_shortcuts(
+        [
+            {
+                "shortcut_path": shortcut_path,
+                "target_path": target_path,
+                "arguments": arguments,
+                "working_directory": working_directory,
+                "icon_location": icon_location,
+            }
+        ]
     )
+    if shortcut_path in failures:
+        raise RuntimeError(failures[shortcut_path])
 
 
 def run_command(
@@ -681,86 +1032,160 @@ def run_command(
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         stdin=subprocess.DEVNULL,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
         env=env,
         cwd=cwd,
         **subprocess_creationflags_kwargs(),
     )
     assert process.stdout is not None
-    for line in process.stdout:
+    # Read raw chunks and decode whole blocks of complete lines, rather than paying the
+    # text-wrapper cost per line on chatty installers such as npm.
+    # The remainder lives in a bytearray so a long unterminated line (a progress bar) grows
+    # in place instead of being re-copied on every read.
+    fd = process.stdout.fileno()
+    pending = bytearray()
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        search_from = len(pending)
+        pending += chunk
+        cut = max(pending.rfind(b"\n", search_from), pending.rfind(b"\r", search_from))
+        if cut < 0:
+            continue
+        _log_output_block(pending[: cut + 1], log)
+        del pending[: cut + 1]
+    if pending:
+        _log_output_block(pending, log)
+    return process.wait()
+
+
+def _log_output_block(block: bytes, log: Callable[[str], None]) -> None:
+    for line in block.decode("utf-8", errors="replace").splitlines():
         text = line.rstrip()
         if text:
             log(text)
-    return process.wait()
+
+
+def prefixed_log(log: Callable[[str], None], label: str) -> Callable[[str], None]:
+    """Tag every line with ``label`` so output from concurrent installs stays attributable."""
+    prefix = f"[{label}] "
+
+    def tagged(message: str) -> None:
+        log(prefix + message)
+
+    return tagged
 
 
 def command_exists(name: str, env: Optional[dict[str, str]] = None) -> bool:
-    probe = ["where", name] if is_windows() else ["which", name]
-    try:
-        completed = subprocess.run(
-            probe,
-            capture_output=True,
-            text=True,
-            env=env,
-            **subprocess_creationflags_kwargs(),
-        )
-        return completed.returncode == 0
-    except OSError:
-        return False
+    path_value = env.get("PATH") if env is not None else None
+    return shutil.which(name, path=path_value) is not None
+
+
+def where_all(name: str, env: Optional[Mapping[str, str]] = None) -> list[str]:
+    """In-process ``where name`` / ``which -a name``: every PATH match, in PATH order."""
+    source = env if env is not None else os.environ
+    variants = _path_name_variants(name, source)
+    found: list[str] = []
+    for directory in _split_path_entries(source.get("PATH", "")):
+        listing = _list_dir_names(directory)
+        for variant in variants:
+            if os.path.normcase(variant) not in listing:
+                continue
+            candidate = os.path.join(directory, variant)
+            if _is_executable_file(candidate):
+                found.append(candidate)
+    return found
+
+
+@functools.lru_cache(maxsize=8)
+def _split_path_entries(path_value: str) -> tuple[str, ...]:
+    # Keyed on the PATH string itself, so edits to os.environ["PATH"] invalidate naturally.
+    return tuple(dict.fromkeys(part for part in path_value.split(os.pathsep) if part))
+
 
+# PATH directory listings keyed by directory and validated by its mtime, so the node/npm/ollama
+# lookups of one workflow list each PATH directory once and then only stat it. Listings whose
+# mtime is too recent are not cached: an entry added within the same timestamp tick (2 s on
+# FAT) would leave the mtime unchanged.
+_DIR_LISTING_CACHE: dict[str, tuple[int, frozenset[str]]] = {}
+_DIR_LISTING_MIN_AGE_NS = 2_000_000_000
 
-def where_all(name: str, env: Optional[dict[str, str]] = None) -> list[str]:
-    probe = ["where", name] if is_windows() else ["which", "-a", name]
+
+def _list_dir_names(directory: str) -> frozenset[str]:
     try:
-        completed = subprocess.run(
-            probe,
-            capture_output=True,
-            text=True,
-            env=env,
-            **subprocess_creationflags_kwargs(),
-        )
+        mtime_ns = os.stat(directory).st_mtime_ns
+        cached = _DIR_LISTING_CACHE.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        listing = frozenset(os.path.normcase(name) for name in os.listdir(directory))
     except OSError:
-        return []
-    if completed.returncode != 0:
-        return []
-    return [line.strip() for line in completed.stdout.splitlines() if line.strip()]
+        return frozenset()
+    if time.time_ns() - mtime_ns >= _DIR_LISTING_MIN_AGE_NS:
+        _DIR_LISTING_CACHE[directory] = (mtime_ns, listing)
+    return listing
+
+
+def _path_name_variants(name: str, env: Mapping[str, str]) -> tuple[str, ...]:
+    if not is_windows():
+        return (name,)
+    extensions = [ext for ext in env.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(";") if ext]
+    return tuple(dict.fromkeys([name, *(name + ext.lower() for ext in extensions)]))
+
+
+def _is_executable_file(path: str) -> bool:
+    return os.path.isfile(path) and (is_windows() or os.access(path, os.X_OK))
 
 
+def _command_file_names(name: str, env: Mapping[str, str]) -> tuple[str, ...]:
+    # PATHEXT forms first on Windows, so e.g. npm.cmd wins over the extensionless npm shell script.
+    variants = _path_name_variants(name, env)
+    return variants[1:] + variants[:1]
+
+
+def _scan_path_for(names: tuple[str, ...]) -> Optional[str]:
+    """Return the first PATH hit for bare command ``names`` in priority order, listing each PATH dir at most once."""
+    listings: dict[str, frozenset[str]] = {}
+    entries = _split_path_entries(os.environ.get("PATH", ""))
+    for name in names:
+        for file_name in _command_file_names(name, os.environ):
+            key = os.path.normcase(file_name)
+            for directory in entries:
+                listing = listings.get(directory)
+                if listing is None:
+                    listing = listings[directory] = _list_dir_names(directory)
+                if key not in listing:
+                    continue
+                candidate = os.path.join(directory, file_name)
+                if _is_executable_file(candidate):
+                    return candidate
+    return None
+
+
+@_memoize_command_hit
 def find_winget() -> Optional[str]:
     return shutil.which("winget")
 
 
+@_memoize_command_hit
 def find_uv() -> Optional[str]:
-    for name in ("uv.exe", "uv"):
-        path = shutil.which(name)
-        if path:
-            return path
-    return None
+    return _scan_path_for(("uv",))
 
 
+@_memoize_command_hit
 def find_python_launcher() -> Optional[str]:
-    for name in ("py.exe", "py", "python.exe", "python"):
-        path = shutil.which(name)
-        if path:
-            return path
-    return None
+    return _scan_path_for(("py", "python"))
 
 
+@_memoize_command_hit
 def find_pip3() -> Optional[str]:
-    for name in ("pip3.exe", "pip3", "pip.exe", "pip"):
-        path = shutil.which(name)
-        if path:
-            return path
-    return None
+    return _scan_path_for(("pip3", "pip"))
 
 
+@_memoize_command_hit
 def find_ollama() -> Optional[str]:
-    for name in ("ollama.exe", "ollama"):
-        path = shutil.which(name)
-        if path:
-            return path
+    path = _scan_path_for(("ollama",))
+    if path:
+        return path
 
     if is_linux():
         for candidate in ("/usr/local/bin/ollama", "/usr/bin/ollama"):
@@ -782,7 +1207,15 @@ def find_ollama() -> Optional[str]:
     return None
 
 
+# Successful probes only: a miss must be re-probed after winget/apt installs a new interpreter.
+_PYTHON_VERSION_CACHE: dict[tuple[str, ...], tuple[int, int, int]] = {}
+
+
 def get_python_version(prefix_args: list[str]) -> Optional[tuple[int, int, int]]:
+    key = tuple(prefix_args)
+    cached = _PYTHON_VERSION_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
         completed = subprocess.run(
             [
@@ -801,11 +1234,14 @@ def get_python_version(prefix_args: list[str]) -> Optional[tuple[int, int, int]]
     text = (completed.stdout or "").strip()
     try:
         major_s, minor_s, patch_s = text.split(".", 2)
-        return (int(major_s), int(minor_s), int(patch_s))
+        version = (int(major_s), int(minor_s), int(patch_s))
     except (TypeError, ValueError):
         return None
+    _PYTHON_VERSION_CACHE[key] = version
+    return version
 
 
+@_memoize_command_hit
 def find_python_314_command() -> Optional[list[str]]:
     for py_name in ("py.exe", "py"):
         py_path = shutil.which(py_name)
@@ -818,10 +1254,8 @@ def find_python_314_command() -> Optional[list[str]]:
 
     for name in ("python3.14.exe", "python3.14"):
         path = shutil.which(name)
-        if not path:
-            continue
-        version = get_python_version([path])
-        if version and version[:2] == (3, 14):
+        if path:
+            # The versioned filename already pins the minor version; skip the probe subprocess.
             return [path]
 
     local_app = os.environ.get("LocalAppData", "")
@@ -851,58 +1285,126 @@ def find_python_314_command() -> Optional[list[str]]:
     return None
 
 
-def find_node() -> Optional[str]:
-    for name in ("node.exe", "node"):
-        path = shutil.which(name)
-        if path:
-            return path
-
+def windows_node_install_dirs() -> list[str]:
+    """Directories the Node.js LTS installer (winget/MSI) installs into, most common first."""
     program_files = os.environ.get("ProgramFiles", r"C:\Program Files")
     local_app = os.environ.get("LocalAppData", "")
     program_files_x86 = os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")
 
-    candidates = [
-        os.path.join(program_files, "nodejs", "node.exe"),
-        os.path.join(program_files_x86, "nodejs", "node.exe"),
+    dirs = [
+        os.path.join(program_files, "nodejs"),
+        os.path.join(program_files_x86, "nodejs"),
     ]
     if local_app:
-        candidates.append(os.path.join(local_app, "Programs", "nodejs", "node.exe"))
+        dirs.append(os.path.join(local_app, "Programs", "nodejs"))
+    return dirs
 
-    for candidate in candidates:
-        if os.path.isfile(candidate):
-            return candidate
-    return None
+
+def _first_existing_file(paths: Iterable[str]) -> Optional[str]:
+    return next((path for path in paths if os.path.isfile(path)), None)
+
+
+def append_to_process_path(directory: str) -> None:
+    """Make ``directory`` visible to this process's PATH lookups and child processes."""
+    path_value = os.environ.get("PATH", "")
+    target = normalize_path_for_compare(directory)
+    if any(normalize_path_for_compare(part) == target for part in path_value.split(os.pathsep) if part):
+        return
+    os.environ["PATH"] = path_value + os.pathsep + directory if path_value else directory
+
+
+@_memoize_command_hit
+def find_node() -> Optional[str]:
+    path = _scan_path_for(("node",))
+    if path:
+        return path
+    return _first_existing_file(os.path.join(d, "node.exe") for d in windows_node_install_dirs())
 
 
+@_memoize_command_hit
 def find_npm() -> Optional[str]:
-    for name in ("npm.cmd", "npm"):
-        path = shutil.which(name)
-        if path:
-            return path
+    path = _scan_path_for(("npm",))
+    if path:
+        return path
+    return _first_existing_file(os.path.join(d, "npm.cmd") for d in windows_node_install_dirs())
 
-    program_files = os.environ.get("ProgramFiles", r"C:\Program Files")
-    local_app = os.environ.get("LocalAppData", "")
-    program_files_x86 = os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")
 
-    candidates = [
-        os.path.join(program_files, "nodejs", "npm.cmd"),
-        os.path.join(program_files_x86, "nodejs", "npm.cmd"),
-    ]
-    if local_app:
-        candidates.append(os.path.join(local_app, "Programs", "nodejs", "npm.cmd"))
+def npm_subprocess_env(npm_exe: str) -> dict[str, str]:
+    """Environment for running npm: its own directory first on PATH and the update notifier off."""
+    npm_dir = os.path.dirname(npm_exe)
+    path_value = os.environ.get("PATH", "")
+    return {
+        **os.environ,
+        "PATH": npm_dir + os.pathsep + path_value if npm_dir else path_value,
+        "npm_config_update_notifier": "false",
+    }
+
+
+# Successful npm global prefix lookups, keyed by npm executable.
+_NPM_PREFIX_CACHE: dict[str, str] = {}
 
-    for candidate in candidates:
-        if os.path.isfile(candidate):
-            return candidate
-    return None
+
+_NPMRC_VAR_RE = re.compile(r"\$\{([^}]+)\}")
+
+
+def _read_npmrc_prefix(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    value: Optional[str] = None
+    for line in lines:
+        key, sep, raw = line.strip().partition("=")
+        if sep and key.strip() == "prefix":
+            value = raw.strip().strip("\"'")  # Later entries win, as in npm.
+    if not value:
+        return None
+    missing: list[str] = []
+
+    def expand(match: "re.Match[str]") -> str:
+        name = match.group(1)
+        if name not in os.environ:
+            missing.append(name)
+            return ""
+        return os.environ[name]
+
+    value = _NPMRC_VAR_RE.sub(expand, value)
+    if missing:
+        return None
+    return os.path.expanduser(value)
+
+
+def npm_prefix_from_npmrc(npm_exe: str) -> Optional[str]:
+    """The global prefix as set in the user npmrc or, on Windows, npm's builtin npmrc; None if unsure."""
+    user_rc = os.environ.get("NPM_CONFIG_USERCONFIG") or os.path.join(os.path.expanduser("~"), ".npmrc")
+    prefix = _read_npmrc_prefix(user_rc)
+    if prefix or not is_windows() or os.environ.get("NPM_CONFIG_GLOBALCONFIG"):
+        return prefix
+    # The Windows Node.js installer ships node_modules/npm/npmrc with prefix=${APPDATA}\npm. A global
+    # npmrc under that prefix could still override it, so leave that case to npm.
+    prefix = _read_npmrc_prefix(os.path.join(os.path.dirname(npm_exe), "node_modules", "npm", "npmrc"))
+    if prefix and os.path.isfile(os.path.join(prefix, "etc", "npmrc")):
+        return None
+    return prefix
 
 
 def get_npm_global_prefix(npm_exe: str, log: Callable[[str], None]) -> Optional[str]:
-    env = os.environ.copy()
-    npm_dir = os.path.dirname(npm_exe)
-    if npm_dir:
-        env["PATH"] = npm_dir + os.pathsep + env.get("PATH", "")
-    env["npm_config_update_notifier"] = "false"
+    cached = _NPM_PREFIX_CACHE.get(npm_exe)
+    if cached is not None:
+        return cached
+    # npm honours the prefix from the environment, so no subprocess is needed when it is set.
+    env_prefix = (os.environ.get("NPM_CONFIG_PREFIX") or os.environ.get("npm_config_prefix") or "").strip()
+    if env_prefix and os.path.isdir(env_prefix):
+        _NPM_PREFIX_CACHE[npm_exe] = env_prefix
+        return env_prefix
+    # Next, the npmrc files npm itself would consult; starting node just to print the prefix
+    # costs far more than reading them.
+    rc_prefix = npm_prefix_from_npmrc(npm_exe)
+    if rc_prefix and os.path.isdir(rc_prefix):
+        _NPM_PREFIX_CACHE[npm_exe] = rc_prefix
+        return rc_prefix
+    env = npm_subprocess_env(npm_exe)
     for args in ([npm_exe, "prefix", "-g"], [npm_exe, "config", "get", "prefix"]):
         try:
             completed = subprocess.run(
@@ -918,49 +1420,64 @@ def get_npm_global_prefix(npm_exe: str, log: Callable[[str], None]) -> Optional[
         if completed.returncode == 0:
             prefix = completed.stdout.strip()
             if prefix and os.path.isdir(prefix):
+                _NPM_PREFIX_CACHE[npm_exe] = prefix
                 return prefix
     return None
 
 
 def get_cli_bin_dirs(npm_exe: Optional[str], log: Callable[[str], None]) -> list[str]:
-    dirs: list[str] = []
-
     if is_linux():
-        node_dir_candidates = ["/usr/local/bin", "/usr/bin"]
+        dirs = ["/usr/local/bin", "/usr/bin"]
     else:
-        node_dir_candidates = [
+        dirs = [
             os.path.join(os.environ.get("ProgramFiles", r"C:\Program Files"), "nodejs"),
             os.path.join(os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)"), "nodejs"),
         ]
-    for d in node_dir_candidates:
-        if os.path.isdir(d):
-            dirs.append(d)
 
     appdata = os.environ.get("AppData")
     if appdata:
-        npm_global_default = os.path.join(appdata, "npm")
-        if os.path.isdir(npm_global_default):
-            dirs.append(npm_global_default)
+        dirs.append(os.path.join(appdata, "npm"))
 
     if npm_exe:
         prefix = get_npm_global_prefix(npm_exe, log)
         if prefix:
             prefix_bin = prefix if is_windows() else os.path.join(prefix, "bin")
-            if os.path.isdir(prefix_bin):
-                dirs.append(prefix_bin)
-            elif os.path.isdir(prefix):
-                dirs.append(prefix)
+            dirs.append(prefix_bin if prefix_bin == prefix or _isdir_cached(prefix_bin) else prefix)
+
+    return _dedup_existing_dirs(dirs)
+
 
+def _dedup_existing_dirs(dirs: list[str]) -> list[str]:
+    """Keep the first of each existing directory, comparing normalized paths, in one pass."""
     unique: list[str] = []
     seen: set[str] = set()
     for d in dirs:
+        if not d:
+            continue
         norm = normalize_path_for_compare(d)
-        if norm not in seen:
+        if norm in seen:
+            continue  # Same directory as an earlier entry: already kept or already found missing.
+        seen.add(norm)
+        if _isdir_cached(d):
             unique.append(d)
-            seen.add(norm)
     return unique
 
 
+def _python_scripts_under(root: str) -> list[str]:
+    # One directory listing instead of a glob; is_dir() uses the listing's cached file type.
+    prefix = os.path.normcase("Python")
+    try:
+        with os.scandir(root) as entries:
+            version_dirs = sorted(
+                entry.path
+                for entry in entries
+                if os.path.normcase(entry.name).startswith(prefix) and entry.is_dir()
+            )
+    except OSError:
+        return []
+    return [os.path.join(path, "Scripts") for path in version_dirs]
+
+
 def get_python_cli_bin_dirs(log: Callable[[str], None]) -> list[str]:
     del log  # reserved for future diagnostics to keep call shape consistent with other helpers
     dirs: list[str] = []
@@ -971,39 +1488,21 @@ def get_python_cli_bin_dirs(log: Callable[[str], None]) -> list[str]:
 
     appdata = os.environ.get("AppData")
     if appdata:
-        dirs.extend(glob.glob(os.path.join(appdata, "Python", "Python*", "Scripts")))
+        dirs.extend(_python_scripts_under(os.path.join(appdata, "Python")))
 
     local_app = os.environ.get("LocalAppData")
     if local_app:
-        dirs.extend(glob.glob(os.path.join(local_app, "Programs", "Python", "Python*", "Scripts")))
+        dirs.extend(_python_scripts_under(os.path.join(local_app, "Programs", "Python")))
 
-    existing_dirs = [d for d in dirs if d and os.path.isdir(d)]
-    unique: list[str] = []
-    seen: set[str] = set()
-    for d in existing_dirs:
-        norm = normalize_path_for_compare(d)
-        if norm not in seen:
-            unique.append(d)
-            seen.add(norm)
-    return unique
+    return _dedup_existing_dirs(dirs)
 
 
 def get_ollama_cli_bin_dirs(log: Callable[[str], None]) -> list[str]:
     del log  # reserved for future diagnostics to keep call shape consistent with other helpers
-    dirs: list[str] = []
-
     if is_linux():
-        dirs.extend(["/usr/local/bin", "/usr/bin"])
-        existing_dirs = [d for d in dirs if d and os.path.isdir(d)]
-        unique: list[str] = []
-        seen: set[str] = set()
-        for d in existing_dirs:
-            norm = normalize_path_for_compare(d)
-            if norm not in seen:
-                unique.append(d)
-                seen.add(norm)
-        return unique
+        return _dedup_existing_dirs(["/usr/local/bin", "/usr/bin"])
 
+    dirs: list[str] = []
     local_app = os.environ.get("LocalAppData")
     program_files = os.environ.get("ProgramFiles", r"C:\Program Files")
     program_files_x86 = os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")
@@ -1012,15 +1511,38 @@ def get_ollama_cli_bin_dirs(log: Callable[[str], None]) -> list[str]:
     dirs.append(os.path.join(program_files, "Ollama"))
     dirs.append(os.path.join(program_files_x86, "Ollama"))
 
-    existing_dirs = [d for d in dirs if d and os.path.isdir(d)]
-    unique: list[str] = []
-    seen: set[str] = set()
-    for d in existing_dirs:
-        norm = normalize_path_for_compare(d)
-        if norm not in seen:
-            unique.append(d)
-            seen.add(norm)
-    return unique
+    return _dedup_existing_dirs(dirs)
+
+
+class BinDirCache:
+    """Per-run memo of the npm/Python/Ollama CLI directory lookups, keyed by kind ("npm", "python", "ollama")."""
+
+    def __init__(self, npm_exe: Optional[str], log: Callable[[str], None]) -> None:
+        self._npm_exe = npm_exe
+        self._log = log
+        self._dirs: dict[str, list[str]] = {}
+
+    def _lookup(self, kind: str) -> list[str]:
+        if kind == "npm":
+            return get_cli_bin_dirs(self._npm_exe, self._log)
+        if kind == "python":
+            return get_python_cli_bin_dirs(self._log)
+        if kind == "ollama":
+            return get_ollama_cli_bin_dirs(self._log)
+        raise ValueError(f"Unknown CLI directory kind: {kind}")
+
+    def dirs(self, *kinds: str) -> list[str]:
+        combined: list[str] = []
+        for kind in kinds:
+            cached = self._dirs.get(kind)
+            if cached is None:
+                cached = self._dirs[kind] = self._lookup(kind)
+            combined.extend(cached)
+        return dedupe_preserve_order(combined)
+
+    def invalidate(self) -> None:
+        # Installs can create directories (npm prefix, Python Scripts, Ollama) that were missing before.
+        self._dirs.clear()
 
 
 def filter_system_path_dirs(dirs: list[str]) -> list[str]:
@@ -1033,12 +1555,20 @@ def filter_system_path_dirs(dirs: list[str]) -> list[str]:
         if value:
             user_roots.append(value)
 
-    filtered: list[str] = []
-    for directory in dirs:
-        if any(is_path_within(directory, root) for root in user_roots):
-            continue
-        filtered.append(directory)
-    return filtered
+    norm_roots = frozenset(normalize_path_for_compare(root) for root in user_roots)
+    return [d for d in dirs if not _has_ancestor_in(normalize_path_for_compare(d), norm_roots)]
+
+
+def _has_ancestor_in(norm_path: str, norm_roots: frozenset[str]) -> bool:
+    # Walk the path's ancestors (itself included) once, with a set lookup per level.
+    current = norm_path
+    while True:
+        if current in norm_roots:
+            return True
+        parent = os.path.dirname(current)
+        if parent == current:
+            return False
+        current = parent
 
 
 def linux_package_manager_name() -> Optional[str]:
@@ -1048,10 +1578,8 @@ def linux_package_manager_name() -> Optional[str]:
 def linux_package_manager_install_commands(packages: list[str]) -> list[list[str]]:
     family = linux_package_manager_name()
     if family == "debian":
-        return [
-            ["apt-get", "update"],
-            ["apt-get", "install", "-y", *packages],
-        ]
+        # One shell runs the index refresh and the install, so the pair costs a single process launch.
+        return [["sh", "-c", "apt-get update && apt-get install -y " + shlex.join(packages)]]
     if family == "fedora":
         return [["dnf", "install", "-y", *packages]]
     if family == "arch":
@@ -1078,6 +1606,11 @@ def ensure_linux_packages_installed(packages: list[str], log: Callable[[str], No
             )
 
 
+# Windows Installer runs one MSI transaction at a time (a second one fails with 1618), so
+# winget installs of MSI-backed prerequisites (Node.js, Python) never overlap each other.
+_WINDOWS_INSTALLER_LOCK = threading.Lock()
+
+
 def ensure_node_via_winget(log: Callable[[str], None]) -> None:
     if is_linux():
         node_path = find_node()
@@ -1123,25 +1656,38 @@ def ensure_node_via_winget(log: Callable[[str], None]) -> None:
         missing.append("npm")
     log("Installing Node.js LTS via winget (includes npm)...")
     log("Missing prerequisites: " + ", ".join(missing))
-    code = run_command(
-        [
-            winget,
-            "install",
-            "--id",
-            NODE_WINGET_ID,
-            "-e",
-            "--accept-package-agreements",
-            "--accept-source-agreements",
-            "--silent",
-            "--disable-interactivity",
-        ],
-        log,
-    )
-    if code != 0:
+    with _WINDOWS_INSTALLER_LOCK:
+        code = run_command(
+            [
+                winget,
+                "install",
+                "--id",
+                NODE_WINGET_ID,
+                "-e",
+                "--accept-package-agreements",
+                "--accept-source-agreements",
+                "--silent",
+                "--disable-interactivity",
+            ],
+            log,
+        )
+    if code != 0 and not is_winget_already_installed_exit_code(code):
         raise RuntimeError(f"winget Node.js install failed with exit code {code}.")
 
-    node_path = find_node()
-    npm_path = find_npm()
+    # This process still has its pre-install PATH, so check where the installer puts Node.js
+    # first and only then fall back to the PATH-driven lookups.
+    node_dir = next(
+        (d for d in windows_node_install_dirs() if os.path.isfile(os.path.join(d, "node.exe"))),
+        None,
+    )
+    if node_dir:
+        append_to_process_path(node_dir)
+        node_path = os.path.join(node_dir, "node.exe")
+        npm_cmd = os.path.join(node_dir, "npm.cmd")
+        npm_path = npm_cmd if os.path.isfile(npm_cmd) else find_npm()
+    else:
+        node_path = find_node()
+        npm_path = find_npm()
     if not node_path or not npm_path:
         raise RuntimeError(
             "Node.js installation completed, but node and/or npm could not be found. "
@@ -1218,6 +1764,12 @@ def ensure_ollama_via_winget(log: Callable[[str], None]) -> tuple[bool, Optional
 
     log("Installing official Ollama for Windows via winget (includes ollama CLI)...")
     code = run_command(install_args, log)
+    if code != 0 and (code & 0xFFFFFFFF) == WINGET_UPDATE_NOT_APPLICABLE:
+        # winget already checked for an upgrade and found none, so `winget upgrade` would be a no-op.
+        existing = existing or find_ollama()
+        if existing:
+            log(f"Ollama is already installed and up to date: {existing}")
+            return (True, package_name)
     if code != 0:
         log(
             "winget install for Ollama failed with exit code "
@@ -1254,21 +1806,22 @@ def ensure_python_314_via_winget(log: Callable[[str], None]) -> list[str]:
         )
 
     log("Installing Python 3.14 via winget for Mistral Vibe CLI...")
-    code = run_command(
-        [
-            winget,
-            "install",
-            "--id",
-            PYTHON_314_WINGET_ID,
-            "-e",
-            "--accept-package-agreements",
-            "--accept-source-agreements",
-            "--silent",
-            "--disable-interactivity",
-        ],
-        log,
-    )
-    if code != 0:
+    with _WINDOWS_INSTALLER_LOCK:
+        code = run_command(
+            [
+                winget,
+                "install",
+                "--id",
+                PYTHON_314_WINGET_ID,
+                "-e",
+                "--accept-package-agreements",
+                "--accept-source-agreements",
+                "--silent",
+                "--disable-interactivity",
+            ],
+            log,
+        )
+    if code != 0 and not is_winget_already_installed_exit_code(code):
         raise RuntimeError(f"winget Python 3.14 install failed with exit code {format_exit_code(code)}.")
 
     python_cmd = find_python_314_command()
@@ -1283,7 +1836,7 @@ def ensure_python_314_via_winget(log: Callable[[str], None]) -> list[str]:
 
 def find_linux_python_for_mistral() -> Optional[list[str]]:
     for candidate in (["python3.14"], ["python3"], ["python"]):
-        exe = shutil.which(candidate[0])
+        exe = _which_cached(candidate[0])
         if not exe:
             continue
         version = get_python_version([exe])
@@ -1607,11 +2160,7 @@ def npm_install_global(
     package_name: str,
     log: Callable[[str], None],
 ) -> int:
-    env = os.environ.copy()
-    npm_dir = os.path.dirname(npm_exe)
-    if npm_dir:
-        env["PATH"] = npm_dir + os.pathsep + env.get("PATH", "")
-    env["npm_config_update_notifier"] = "false"
+    env = npm_subprocess_env(npm_exe)
     sudo = _linux_sudo() if is_linux() else []
     return run_command([*sudo, npm_exe, *NPM_QUIET_FLAGS, "install", "-g", package_name], log, env=env)
 
@@ -1621,36 +2170,38 @@ def npm_uninstall_global(
     package_name: str,
     log: Callable[[str], None],
 ) -> int:
-    env = os.environ.copy()
-    npm_dir = os.path.dirname(npm_exe)
-    if npm_dir:
-        env["PATH"] = npm_dir + os.pathsep + env.get("PATH", "")
-    env["npm_config_update_notifier"] = "false"
+    env = npm_subprocess_env(npm_exe)
     sudo = _linux_sudo() if is_linux() else []
     return run_command([*sudo, npm_exe, *NPM_QUIET_FLAGS, "uninstall", "-g", package_name], log, env=env)
 
 
+def is_winget_already_installed_exit_code(code: int) -> bool:
+    return (code & 0xFFFFFFFF) in WINGET_ALREADY_INSTALLED_EXIT_CODES
+
+
+# npm on Windows sometimes returns negative errno values reinterpreted as unsigned exit codes.
+_WINDOWS_ERRNO_EXIT_CODE_MIN = 0xFFFF0000
+
+
 def is_probably_windows_errno_exit_code(code: int) -> bool:
-    # npm on Windows sometimes returns negative errno values reinterpreted as unsigned exit codes.
-    return code >= 0xFFFF0000
+    return code >= _WINDOWS_ERRNO_EXIT_CODE_MIN
 
 
 def format_exit_code(code: int) -> str:
-    if not is_probably_windows_errno_exit_code(code):
+    # Same test as is_probably_windows_errno_exit_code, inlined: this runs for every failure log line.
+    if code < _WINDOWS_ERRNO_EXIT_CODE_MIN:
         return str(code)
-    signed = code - (1 << 32)
-    return f"{code} (Windows errno {signed})"
+    return f"{code} (Windows errno {code - (1 << 32)})"
+
+
+# EBUSY as npm reports it: by name, as a signed Windows errno, or as the unsigned exit code.
+_WINDOWS_FILE_LOCK_RE = re.compile(r"ebusy|windows errno -4082|4294963214", re.IGNORECASE)
 
 
 def is_probably_windows_file_lock_error(detail: Optional[str]) -> bool:
     if not detail:
         return False
-    lowered = detail.lower()
-    return (
-        "ebusy" in lowered
-        or "windows errno -4082" in lowered
-        or "4294963214" in lowered
-    )
+    return _WINDOWS_FILE_LOCK_RE.search(detail) is not None
 
 
 def _ensure_flatpak_flathub(log: Callable[[str], None]) -> bool:
@@ -2010,6 +2561,14 @@ def uninstall_gui_app(spec: GuiAppSpec, log: Callable[[str], None]) -> bool:
     return True
 
 
+def npm_retry_delay_seconds(attempt: int) -> float:
+    """Back-off before retrying a file-locked npm operation: doubling per attempt, jittered, capped."""
+    # A lock held by a CLI that is just exiting clears quickly; one held by a running CLI does not.
+    # Jitter keeps concurrent retries from waking up in lockstep.
+    delay = NPM_INSTALL_RETRY_DELAY_SECONDS * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+    return min(delay, NPM_INSTALL_MAX_BACKOFF_SECONDS)
+
+
 def try_install_package_candidates(
     npm_exe: str,
     spec: CliSpec,
@@ -2025,11 +2584,12 @@ def try_install_package_candidates(
                 return (True, package_name)
 
             if attempt < NPM_INSTALL_MAX_ATTEMPTS and is_probably_windows_errno_exit_code(code):
+                delay = npm_retry_delay_seconds(attempt)
                 log(
                     "Transient npm install failure detected (possible Windows file lock). "
-                    + f"Retrying in {NPM_INSTALL_RETRY_DELAY_SECONDS:.0f}s..."
+                    + f"Retrying in {delay:.1f}s..."
                 )
-                time.sleep(NPM_INSTALL_RETRY_DELAY_SECONDS)
+                time.sleep(delay)
                 continue
 
             last_error = f"{package_name} failed with exit code {format_exit_code(code)}"
@@ -2038,6 +2598,37 @@ def try_install_package_candidates(
     return (False, last_error)
 
 
+def npm_install_global_batch(
+    npm_exe: str,
+    package_names: list[str],
+    log: Callable[[str], None],
+) -> int:
+    env = npm_subprocess_env(npm_exe)
+    sudo = _linux_sudo() if is_linux() else []
+    return run_command([*sudo, npm_exe, *NPM_QUIET_FLAGS, "install", "-g", *package_names], log, env=env)
+
+
+def try_bulk_install_npm(
+    npm_exe: str,
+    specs: list[CliSpec],
+    log: Callable[[str], None],
+) -> bool:
+    """Install every spec's first-choice npm package with one npm process.
+
+    npm installs the whole list or nothing, so False means the caller falls back to
+    try_install_package_candidates for each spec.
+    """
+    if len(specs) < 2 or not all(spec.package_candidates for spec in specs):
+        return False
+    package_names = [spec.package_candidates[0] for spec in specs]
+    log("Trying one npm install for: " + ", ".join(package_names))
+    code = npm_install_global_batch(npm_exe, package_names, log)
+    if code == 0:
+        return True
+    log(f"Batched npm install failed with exit code {format_exit_code(code)}; installing packages one at a time.")
+    return False
+
+
 def try_uninstall_package_candidates(
     npm_exe: str,
     spec: CliSpec,
@@ -2055,11 +2646,12 @@ def try_uninstall_package_candidates(
                 break
 
             if attempt < NPM_INSTALL_MAX_ATTEMPTS and is_probably_windows_errno_exit_code(code):
+                delay = npm_retry_delay_seconds(attempt)
                 log(
                     "Transient npm uninstall failure detected (possible Windows file lock). "
-                    + f"Retrying in {NPM_INSTALL_RETRY_DELAY_SECONDS:.0f}s..."
+                    + f"Retrying in {delay:.1f}s..."
                 )
-                time.sleep(NPM_INSTALL_RETRY_DELAY_SECONDS)
+                time.sleep(delay)
                 continue
 
             last_error = f"{package_name} uninstall failed with exit code {format_exit_code(code)}"
@@ -2071,38 +2663,45 @@ def try_uninstall_package_candidates(
     return (False, last_error)
 
 
+# Preferred command extensions, best first, mapped to their rank.
+_WINDOWS_COMMAND_EXT_RANK = {".cmd": 0, ".exe": 1, ".bat": 2, ".ps1": 3}
+_LINUX_COMMAND_EXT_RANK = {".sh": 0, ".bin": 1}
+
+
+def _command_ext_rank(path: str, ext_rank: Mapping[str, int]) -> int:
+    return ext_rank.get(os.path.splitext(path)[1].lower(), len(ext_rank))
+
+
 def resolve_command_path(
     command_candidates: tuple[str, ...],
     extra_dirs: list[str],
 ) -> Optional[str]:
-    env = os.environ.copy()
+    # where_all only reads PATH/PATHEXT, so overlay PATH on the live environment instead of copying it.
+    env: Mapping[str, str] = os.environ
     if extra_dirs:
         joined = os.pathsep.join(extra_dirs)
-        env["PATH"] = joined + os.pathsep + env.get("PATH", "")
+        env = collections.ChainMap({"PATH": joined + os.pathsep + os.environ.get("PATH", "")}, os.environ)
 
+    ext_rank = _WINDOWS_COMMAND_EXT_RANK if is_windows() else _LINUX_COMMAND_EXT_RANK
     for cmd in command_candidates:
         found = where_all(cmd, env=env)
         if found:
-            priority_order = (".cmd", ".exe", ".bat", ".ps1") if is_windows() else (".sh", ".bin", "")
-            for ext in priority_order:
-                for candidate in found:
-                    if ext:
-                        if candidate.lower().endswith(ext):
-                            return candidate
-                    else:
-                        return candidate
-            return found[0]
+            # Best-ranked extension wins; min() keeps PATH order among equally ranked hits.
+            return min(found, key=lambda candidate: _command_ext_rank(candidate, ext_rank))
 
+    # Check names against one listing per directory; only actual hits are stat()ed.
     for d in extra_dirs:
+        listing = _list_dir_names(d)
+        if not listing:
+            continue
         for cmd in command_candidates:
-            ext_candidates = (".cmd", ".exe", ".bat", ".ps1") if is_windows() else (".sh", ".bin")
-            for ext in ext_candidates:
-                candidate = os.path.join(d, cmd + ext)
+            for ext in (*ext_rank, ""):
+                file_name = cmd + ext
+                if os.path.normcase(file_name) not in listing:
+                    continue
+                candidate = os.path.join(d, file_name)
                 if os.path.isfile(candidate):
                     return candidate
-            direct = os.path.join(d, cmd)
-            if os.path.isfile(direct):
-                return direct
     return None
 
 
@@ -2154,8 +2753,10 @@ def create_linux_desktop_shortcut(
         "Categories=Development;",
         "StartupNotify=false",
     ]
-    write_text_file(shortcut_path, "\n".join(lines) + "\n")
-    os.chmod(shortcut_path, 0o755)
+    with open(shortcut_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines) + "\n")
+        # Mark it executable through the open handle instead of a second path lookup.
+        os.fchmod(f.fileno(), 0o755)
 
 
 def update_desktop_database_for_user(log: Callable[[str], None]) -> None:
@@ -2203,20 +2804,50 @@ def create_cli_desktop_shortcut(
         log(f"Created menu entry: {menu_path}")
         return shortcut_path
 
-    shortcut_path = os.path.join(desktop, f"{spec.shortcut_name}.lnk")
+    shortcut = _cli_windows_shortcut(desktop, spec, command_path)
+    create_windows_shortcut(**shortcut)
+    log(f"Created desktop shortcut: {shortcut['shortcut_path']}")
+    return shortcut["shortcut_path"]
+
+
+def _cli_windows_shortcut(desktop: str, spec: CliSpec, command_path: str) -> dict[str, str]:
     cmd_exe = os.environ.get("ComSpec", r"C:\Windows\System32\cmd.exe")
-    arguments = f'/k "{command_path}"'
-    working_dir = os.path.expanduser("~")
-    icon = f"{cmd_exe},0"
-    create_windows_shortcut(
-        shortcut_path=shortcut_path,
-        target_path=cmd_exe,
-        arguments=arguments,
-        working_directory=working_dir,
-        icon_location=icon,
-    )
-    log(f"Created desktop shortcut: {shortcut_path}")
-    return shortcut_path
+    return {
+        "shortcut_path": os.path.join(desktop, f"{spec.shortcut_name}.lnk"),
+        "target_path": cmd_exe,
+        "arguments": f'/k "{command_path}"',
+        "working_directory": os.path.expanduser("~"),
+        "icon_location": f"{cmd_exe},0",
+    }
+
+
+def create_cli_desktop_shortcuts(items: list[tuple[CliSpec, str]], log: Callable[[str], None]) -> None:
+    if not items:
+        return
+    if not is_windows():
+        for spec, command_path in items:
+            try:
+                create_cli_desktop_shortcut(spec, command_path, log)
+            except Exception as exc:
+                log(f"Shortcut creation failed for {spec.label}: {exc}")
+        if is_linux():
+            update_desktop_database_for_user(log)
+        return
+
+    desktop = find_desktop_directory()
+    shortcuts = [_cli_windows_shortcut(desktop, spec, command_path) for spec, command_path in items]
+    try:
+        failures = create_windows_shortcuts(shortcuts)
+    except Exception as exc:
+        for spec, _command_path in items:
+            log(f"Shortcut creation failed for {spec.label}: {exc}")
+        return
+    for (spec, _command_path), shortcut in zip(items, shortcuts):
+        error = failures.get(shortcut["shortcut_path"])
+        if error:
+            log(f"Shortcut creation failed for {spec.label}: {error}")
+        else:
+            log(f"Created desktop shortcut: {shortcut['shortcut_path']}")
 
 
 def remove_cli_desktop_shortcuts(spec: CliSpec, log: Callable[[str], None]) -> None:
@@ -2250,15 +2881,97 @@ def remove_cli_desktop_shortcuts(spec: CliSpec, log: Callable[[str], None]) -> N
         update_desktop_database_for_user(log)
 
 
+def _discovery_log(_message: str) -> None:
+    return None
+
+
+def _discover_cli_detection_dirs() -> list[str]:
+    dirs = get_cli_bin_dirs(find_npm(), _discovery_log)
+    dirs = dedupe_preserve_order(dirs + get_python_cli_bin_dirs(_discovery_log))
+    return dedupe_preserve_order(dirs + get_ollama_cli_bin_dirs(_discovery_log))
+
+
+_discovery: Optional[dict[str, object]] = None
+_discovery_lock = threading.Lock()
+
+
+def discover_environment(refresh: bool = False) -> dict[str, object]:
+    """Run the CLI detection probes concurrently and cache the results until the next refresh."""
+    global _discovery
+    with _discovery_lock:
+        if _discovery is not None and not refresh:
+            return _discovery
+
+    probes: dict[str, Callable[[], object]] = {
+        "ollama": find_ollama,
+        "cli_detection_dirs": _discover_cli_detection_dirs,
+    }
+    results: dict[str, object] = {}
+    # Both probes are dominated by filesystem, registry or subprocess waits, so threads overlap well.
+    with ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix="discovery") as pool:
+        futures = {key: pool.submit(probe) for key, probe in probes.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception:
+                results[key] = None
+    with _discovery_lock:
+        _discovery = results
+    return results
+
+
+def reset_discovery() -> None:
+    global _discovery
+    with _discovery_lock:
+        _discovery = None
+
+
+# One long-lived pool for GUI-triggered background work instead of a new thread per click.
+_BG_POOL = ThreadPoolExecutor(max_workers=max(2, min(4, os.cpu_count() or 4)), thread_name_prefix="itc-bg")
+atexit.register(_BG_POOL.shutdown, wait=False)
+
+
+def submit_bg(fn: Callable[..., object], *args: object, **kwargs: object) -> Future:
+    return _BG_POOL.submit(fn, *args, **kwargs)
+
+
+class BatchedLogger:
+    """Buffers log lines from worker threads until the GUI thread drains them in batches."""
+
+    def __init__(self, max_lines_per_drain: int = LOG_FLUSH_MAX_LINES) -> None:
+        self._queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._max_lines_per_drain = max_lines_per_drain
+
+    def enqueue(self, line: str) -> None:
+        self._queue.put(line)
+
+    def drain(self) -> list[str]:
+        lines: list[str] = []
+        while len(lines) < self._max_lines_per_drain:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+
 class InstallerFrame(wx.Frame):
     def __init__(self) -> None:  # pragma: no cover
         platform_label = "Windows 11" if is_windows() else "Linux"
         super().__init__(None, title=f"AI CLI Installer ({platform_label})", size=(920, 820))
-        self.worker_thread: Optional[threading.Thread] = None
+        self._log_buffer = BatchedLogger()
+        self._log_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda _evt: self._flush_log_queue(), self._log_timer)
+        self.Bind(wx.EVT_CLOSE, self._on_frame_close)
+        self._ui_update_lock = threading.Lock()
+        self._ui_last_values: dict[str, object] = {}
+        self.worker_future: Optional[Future] = None
         self._persistent_log_path: Optional[str] = None
         self._persistent_log_write_warning_shown = False
         self._reset_persistent_log_for_new_run()
         self._build_ui()
+        self._refresh_cli_detection_in_background()
+        self._log_timer.Start(LOG_FLUSH_INTERVAL_MS)
         self.Centre()
 
     def _build_ui(self) -> None:  # pragma: no cover
@@ -2382,34 +3095,93 @@ class InstallerFrame(wx.Frame):
 
         panel.SetSizer(root)
         self.install_all_btn.SetDefault()
-        self.refresh_cli_action_buttons()
         self.refresh_gui_app_action_buttons()
 
     def log(self, message: str) -> None:
-        wx.CallAfter(self._append_log, message)
+        # Worker threads only enqueue; the GUI timer appends queued lines in one batch per tick.
+        self._log_buffer.enqueue(message)
+
+    def _flush_log_queue(self) -> None:
+        lines = self._log_buffer.drain()
+        if lines:
+            self._append_log_lines(lines)
+
+    def _on_frame_close(self, event: wx.CloseEvent) -> None:
+        # The title-bar close goes through here too; do not exit under a running workflow.
+        if self.worker_future and not self.worker_future.done() and event.CanVeto():
+            wx.MessageBox(
+                "An install/uninstall workflow is still running. Wait for it to finish before closing.",
+                "Workflow In Progress",
+                wx.OK | wx.ICON_INFORMATION,
+                self,
+            )
+            event.Veto()
+            return
+        # Write out anything still queued so the persistent log is complete.
+        self._log_timer.Stop()
+        lines = self._log_buffer.drain()
+        while lines:
+            self._append_log_lines(lines)
+            lines = self._log_buffer.drain()
+        event.Skip()
 
     def _reset_persistent_log_for_new_run(self) -> None:
         self._persistent_log_path = reset_gui_last_run_log()
         self._persistent_log_write_warning_shown = False
 
-    def _append_log(self, message: str) -> None:
-        self.log_ctrl.AppendText(message + "\n")
+    def _append_log_lines(self, lines: list[str]) -> None:
+        text = "\n".join(lines)
+        self.log_ctrl.AppendText(text + "\n")
         self.log_ctrl.ShowPosition(self.log_ctrl.GetLastPosition())
-        err = append_persistent_log_line(getattr(self, "_persistent_log_path", None), message)
+        err = append_persistent_log_line(getattr(self, "_persistent_log_path", None), text)
         if err and not getattr(self, "_persistent_log_write_warning_shown", False):
             self._persistent_log_write_warning_shown = True
             warning = f"Persistent log write warning: {err}"
             self.log_ctrl.AppendText(warning + "\n")
             self.log_ctrl.ShowPosition(self.log_ctrl.GetLastPosition())
 
+    def _call_after_if_changed(self, key: str, value: object, fn: Callable[..., object], *args: object) -> None:
+        # Status/progress updates arrive from several install threads; post a GUI event only
+        # when the shown value actually changes.
+        with self._ui_update_lock:
+            if key in self._ui_last_values and self._ui_last_values[key] == value:
+                return
+            self._ui_last_values[key] = value
+            wx.CallAfter(fn, *args)
+
     def set_status(self, text: str) -> None:
-        wx.CallAfter(self.status_label.SetLabel, f"Status: {text}")
+        label = f"Status: {text}"
+        self._call_after_if_changed("status", label, self.status_label.SetLabel, label)
 
     def set_gauge(self, value: int) -> None:
         value = max(0, min(100, value))
-        wx.CallAfter(self.gauge.SetValue, value)
+        self._call_after_if_changed("gauge", value, self.gauge.SetValue, value)
+
+    def set_progress(self, text: str, value: int) -> None:
+        # Status label + gauge posted as one GUI event; unchanged parts are skipped.
+        label = f"Status: {text}"
+        value = max(0, min(100, value))
+        with self._ui_update_lock:
+            last = self._ui_last_values
+            new_label = label if last.get("status") != label else None
+            new_value = value if last.get("gauge") != value else None
+            if new_label is None and new_value is None:
+                return
+            last["status"] = label
+            last["gauge"] = value
+
+            def _apply() -> None:
+                if new_label is not None:
+                    self.status_label.SetLabel(new_label)
+                if new_value is not None:
+                    self.gauge.SetValue(new_value)
+
+            wx.CallAfter(_apply)
 
     def set_busy(self, busy: bool) -> None:
+        if busy:
+            with self._ui_update_lock:
+                self._ui_last_values.pop("gauge", None)  # Pulse() replaces the shown value.
         def _apply() -> None:
             self.install_btn.Enable(not busy)
             install_all_btn = getattr(self, "install_all_btn", None)
@@ -2423,19 +3195,12 @@ class InstallerFrame(wx.Frame):
                 self.gauge.Pulse()
         wx.CallAfter(_apply)
 
-    def _detection_log(self, _message: str) -> None:
-        return None
-
     def _get_cli_detection_dirs(self) -> list[str]:
-        npm_exe = find_npm()
-        dirs = get_cli_bin_dirs(npm_exe, self._detection_log)
-        dirs = dedupe_preserve_order(dirs + get_python_cli_bin_dirs(self._detection_log))
-        dirs = dedupe_preserve_order(dirs + get_ollama_cli_bin_dirs(self._detection_log))
-        return dirs
+        return list(discover_environment()["cli_detection_dirs"] or [])
 
     def _is_cli_installed(self, spec: CliSpec, cli_dirs: Optional[list[str]] = None) -> bool:
         if spec.key == "ollama":
-            return bool(find_ollama())
+            return bool(discover_environment()["ollama"])
         dirs = cli_dirs if cli_dirs is not None else self._get_cli_detection_dirs()
         return bool(resolve_command_path(spec.command_candidates, dirs))
 
@@ -2445,6 +3210,14 @@ class InstallerFrame(wx.Frame):
     def _all_gui_apps_installed(self) -> bool:
         return bool(GUI_APP_SPECS) and all(self.gui_app_installed_state.get(spec.key, False) for spec in GUI_APP_SPECS)
 
+    def _refresh_cli_detection_in_background(self) -> None:
+        # The probes can start subprocesses, so they never run on the GUI thread.
+        submit_bg(self._rediscover_cli_state)
+
+    def _rediscover_cli_state(self) -> None:
+        discover_environment(refresh=True)
+        wx.CallAfter(self.refresh_cli_action_buttons)
+
     def refresh_cli_action_buttons(self) -> None:
         cli_dirs = self._get_cli_detection_dirs()
         for spec in CLI_SPECS:
@@ -2473,7 +3246,7 @@ class InstallerFrame(wx.Frame):
             install_apps_btn.SetLabel("&Uninstall All Apps" if self._all_gui_apps_installed() else "Install Apps &All")
 
     def on_close(self, _event: wx.CommandEvent) -> None:
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self.worker_future and not self.worker_future.done():
             wx.MessageBox(
                 "An install/uninstall workflow is still running. Wait for it to finish before closing.",
                 "Workflow In Progress",
@@ -2484,7 +3257,7 @@ class InstallerFrame(wx.Frame):
         self.Close()
 
     def _prepare_for_worker_run(self) -> bool:
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self.worker_future and not self.worker_future.done():
             return False
 
         self._askpass_script: Optional[str] = None
@@ -2508,8 +3281,7 @@ class InstallerFrame(wx.Frame):
         reset_log = getattr(self, "_reset_persistent_log_for_new_run", None)
         if callable(reset_log):
             reset_log()
-        self.set_status("Starting...")
-        self.set_gauge(0)
+        self.set_progress("Starting...", 0)
         self.set_busy(True)
         return True
 
@@ -2521,18 +3293,13 @@ class InstallerFrame(wx.Frame):
         return auto_update_enabled
 
     def _start_worker(self, target: Callable[..., None], args: tuple[object, ...]) -> None:
-        self.worker_thread = threading.Thread(
-            target=target,
-            args=args,
-            daemon=True,
-        )
-        self.worker_thread.start()
+        self.worker_future = submit_bg(run_with_fs_probe_cache, target, *args)
 
     def on_cli_action(self, cli_key: str) -> None:
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self.worker_future and not self.worker_future.done():
             return
 
-        spec = next((item for item in CLI_SPECS if item.key == cli_key), None)
+        spec = _CLI_BY_KEY.get(cli_key)
         if spec is None:
             return
         installed = self.cli_installed_state.get(spec.key, self._is_cli_installed(spec))
@@ -2547,7 +3314,7 @@ class InstallerFrame(wx.Frame):
         )
 
     def on_install_all_toggle(self, _event: wx.CommandEvent) -> None:
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self.worker_future and not self.worker_future.done():
             return
 
         self.refresh_cli_action_buttons()
@@ -2575,10 +3342,10 @@ class InstallerFrame(wx.Frame):
         )
 
     def on_gui_app_action(self, app_key: str) -> None:
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self.worker_future and not self.worker_future.done():
             return
 
-        spec = next((item for item in GUI_APP_SPECS if item.key == app_key), None)
+        spec = _GUI_APP_BY_KEY.get(app_key)
         if spec is None:
             return
         installed = self.gui_app_installed_state.get(spec.key, is_gui_app_installed(spec))
@@ -2593,7 +3360,7 @@ class InstallerFrame(wx.Frame):
         )
 
     def on_install_all_apps_toggle(self, _event: wx.CommandEvent) -> None:
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self.worker_future and not self.worker_future.done():
             return
 
         self.refresh_gui_app_action_buttons()
@@ -2661,8 +3428,7 @@ class InstallerFrame(wx.Frame):
             if chosen_apps:
                 self._run_gui_apps_install(chosen_apps)
             self.log("Installation workflow complete.")
-            self.set_status("Complete")
-            self.set_gauge(100)
+            self.set_progress("Complete", 100)
         except Exception as exc:
             self.log(f"ERROR: {exc}")
             self.log(traceback.format_exc().rstrip())
@@ -2672,9 +3438,9 @@ class InstallerFrame(wx.Frame):
             cleanup = getattr(self, "_cleanup_askpass", None)
             if callable(cleanup):
                 cleanup()
-            refresh_cli = getattr(self, "refresh_cli_action_buttons", None)
+            refresh_cli = getattr(self, "_refresh_cli_detection_in_background", None)
             if callable(refresh_cli):
-                wx.CallAfter(refresh_cli)
+                refresh_cli()
             refresh_apps = getattr(self, "refresh_gui_app_action_buttons", None)
             if callable(refresh_apps):
                 wx.CallAfter(refresh_apps)
@@ -2694,8 +3460,7 @@ class InstallerFrame(wx.Frame):
                 self.log("CLI uninstall workflow complete.")
             else:
                 raise RuntimeError(f"Unsupported CLI action: {action}")
-            self.set_status("Complete")
-            self.set_gauge(100)
+            self.set_progress("Complete", 100)
         except Exception as exc:
             self.log(f"ERROR: {exc}")
             self.log(traceback.format_exc().rstrip())
@@ -2705,9 +3470,9 @@ class InstallerFrame(wx.Frame):
             cleanup = getattr(self, "_cleanup_askpass", None)
             if callable(cleanup):
                 cleanup()
-            refresh_cli = getattr(self, "refresh_cli_action_buttons", None)
+            refresh_cli = getattr(self, "_refresh_cli_detection_in_background", None)
             if callable(refresh_cli):
-                wx.CallAfter(refresh_cli)
+                refresh_cli()
             refresh_apps = getattr(self, "refresh_gui_app_action_buttons", None)
             if callable(refresh_apps):
                 wx.CallAfter(refresh_apps)
@@ -2726,8 +3491,7 @@ class InstallerFrame(wx.Frame):
                 self.log("Desktop app uninstall workflow complete.")
             else:
                 raise RuntimeError(f"Unsupported desktop-app action: {action}")
-            self.set_status("Complete")
-            self.set_gauge(100)
+            self.set_progress("Complete", 100)
         except Exception as exc:
             self.log(f"ERROR: {exc}")
             self.log(traceback.format_exc().rstrip())
@@ -2737,9 +3501,9 @@ class InstallerFrame(wx.Frame):
             cleanup = getattr(self, "_cleanup_askpass", None)
             if callable(cleanup):
                 cleanup()
-            refresh_cli = getattr(self, "refresh_cli_action_buttons", None)
+            refresh_cli = getattr(self, "_refresh_cli_detection_in_background", None)
             if callable(refresh_cli):
-                wx.CallAfter(refresh_cli)
+                refresh_cli()
             refresh_apps = getattr(self, "refresh_gui_app_action_buttons", None)
             if callable(refresh_apps):
                 wx.CallAfter(refresh_apps)
@@ -2748,9 +3512,8 @@ class InstallerFrame(wx.Frame):
         total = len(selected_apps)
         any_installed = False
         for index, app_spec in enumerate(selected_apps, start=1):
-            pct = int((index - 1) / max(total, 1) * 80) + 10
-            self.set_gauge(pct)
-            self.set_status(f"Installing {app_spec.label} ({index}/{total})")
+            pct = 10 + (index - 1) * 80 // total
+            self.set_progress(f"Installing {app_spec.label} ({index}/{total})", pct)
             success = install_gui_app(app_spec, self.log)
             if success:
                 any_installed = True
@@ -2763,9 +3526,8 @@ class InstallerFrame(wx.Frame):
         total = len(selected_apps)
         any_uninstalled = False
         for index, app_spec in enumerate(selected_apps, start=1):
-            pct = int((index - 1) / max(total, 1) * 80) + 10
-            self.set_gauge(pct)
-            self.set_status(f"Uninstalling {app_spec.label} ({index}/{total})")
+            pct = 10 + (index - 1) * 80 // total
+            self.set_progress(f"Uninstalling {app_spec.label} ({index}/{total})", pct)
             success = uninstall_gui_app(app_spec, self.log)
             if success:
                 any_uninstalled = True
@@ -2788,11 +3550,11 @@ class InstallerFrame(wx.Frame):
             self.log("No CLI tools selected for uninstall.")
             return
 
-        needs_npm = any(spec.key not in ("mistral", "ollama") for spec in selected)
+        needs_npm = any(spec.key not in _NON_NPM_CLI_KEYS for spec in selected)
         npm_exe: Optional[str] = None
+        bin_dirs: Optional[BinDirCache] = None
         if needs_npm:
-            self.set_status("Locating npm")
-            self.set_gauge(10)
+            self.set_progress("Locating npm", 10)
             npm_exe = find_npm()
             if not npm_exe:
                 raise RuntimeError("npm was not found. Install Node.js/npm before uninstalling npm-based CLIs.")
@@ -2801,9 +3563,8 @@ class InstallerFrame(wx.Frame):
         removed_npm_packages: list[str] = []
         total = len(selected)
         for index, spec in enumerate(selected, start=1):
-            pct = 15 + int((index - 1) / max(total, 1) * 70)
-            self.set_gauge(pct)
-            self.set_status(f"Uninstalling {spec.label} ({index}/{total})")
+            pct = 15 + (index - 1) * 70 // total
+            self.set_progress(f"Uninstalling {spec.label} ({index}/{total})", pct)
 
             if spec.key == "mistral":
                 success, detail = try_uninstall_mistral_vibe(spec, self.log)
@@ -2821,20 +3582,18 @@ class InstallerFrame(wx.Frame):
 
             self.log(f"Uninstall completed for {spec.label}.")
             remove_cli_desktop_shortcuts(spec, self.log)
-            if spec.key not in ("mistral", "ollama"):
+            if spec.key not in _NON_NPM_CLI_KEYS:
                 removed_npm_packages.extend(spec.package_candidates)
 
         if removed_npm_packages and is_windows():
-            self.set_status("Updating auto-update package list")
-            self.set_gauge(90)
+            self.set_progress("Updating auto-update package list", 90)
             remaining = remove_cli_auto_update_packages(removed_npm_packages, self.log)
             if remaining:
                 self.log("Remaining npm packages in auto-update list: " + ", ".join(remaining))
             else:
                 self.log("No npm packages remain in auto-update list.")
 
-        self.set_status("Finalizing")
-        self.set_gauge(98)
+        self.set_progress("Finalizing", 98)
         self.log("")
         self.log("CLI uninstall run complete.")
 
@@ -2848,70 +3607,155 @@ class InstallerFrame(wx.Frame):
             self.log(
                 "System PATH update may fail without Administrator/root privileges."
             )
-        needs_python_cli_dirs = any(spec.key == "mistral" for spec in selected)
-        needs_ollama_cli_dirs = any(spec.key == "ollama" for spec in selected)
-
-        self.set_status("Checking/installing Node.js + npm")
-        self.set_gauge(5)
-        ensure_node_via_winget(self.log)
-
-        self.set_status("Locating npm")
-        self.set_gauge(15)
-        npm_exe = find_npm()
-        if not npm_exe:
-            raise RuntimeError(
-                "npm was not found after Node.js setup. Try closing and reopening the app, or install Node.js manually."
-            )
-        self.log(f"Using npm executable: {npm_exe}")
-
-        cli_bin_dirs = get_cli_bin_dirs(npm_exe, self.log)
-        if needs_python_cli_dirs:
-            cli_bin_dirs = dedupe_preserve_order(cli_bin_dirs + get_python_cli_bin_dirs(self.log))
-        if needs_ollama_cli_dirs:
-            cli_bin_dirs = dedupe_preserve_order(cli_bin_dirs + get_ollama_cli_bin_dirs(self.log))
-        self.log("PATH directories to ensure: " + (", ".join(cli_bin_dirs) if cli_bin_dirs else "(none found yet)"))
-
-        self.set_status("Updating user/system PATH")
-        self.set_gauge(20)
-        added_user, user_err = add_dirs_to_path("user", cli_bin_dirs)
-        if user_err:
-            self.log(f"User PATH update warning: {user_err}")
-        elif added_user:
-            self.log("Added to user PATH: " + ", ".join(added_user))
-        else:
-            self.log("User PATH already contains required directories.")
-
-        system_path_dirs = filter_system_path_dirs(cli_bin_dirs)
-        added_system, system_err = add_dirs_to_path("system", system_path_dirs)
-        if system_err:
-            self.log(f"System PATH update warning: {system_err}")
-        elif added_system:
-            self.log("Added to system PATH: " + ", ".join(added_system))
-        else:
-            self.log("System PATH already contains required directories.")
+        if not selected:
+            self.log("No CLI tools selected for install.")
+            return
 
+        selected_keys = {spec.key for spec in selected}
+        run_dir_kinds = ("npm", *(kind for key, kind in _CLI_DIR_KIND_BY_KEY.items() if key in selected_keys))
         total = len(selected)
         installed_commands: list[tuple[CliSpec, str]] = []
         installed_packages: list[str] = []
+        npm_exe: Optional[str] = None
 
-        for index, spec in enumerate(selected, start=1):
-            pct = 20 + int((index - 1) / max(total, 1) * 60)
-            self.set_gauge(pct)
-            self.set_status(f"Installing {spec.label} ({index}/{total})")
+        # npm installs stay strictly one at a time (a shared global prefix), and so do the
+        # winget/MSI or apt-backed installs, but the two families overlap each other.
+        npm_lock = threading.Lock()
+        system_lock = threading.Lock()
+        start_order = itertools.count(1)
+        abort = threading.Event()
+
+        def install_spec(spec: CliSpec) -> Optional[tuple[bool, Optional[str]]]:
+            lock = system_lock if spec.key in _NON_NPM_CLI_KEYS else npm_lock
+            with lock:
+                if abort.is_set():
+                    return None
+                self.set_status(f"Installing {spec.label} ({next(start_order)}/{total})")
+                spec_log = prefixed_log(self.log, spec.label)
+                try:
+                    if spec.key == "mistral":
+                        success, pkg = try_install_mistral_vibe(spec, spec_log)
+                    elif spec.key == "ollama":
+                        success, pkg = ensure_ollama_via_winget(spec_log)
+                    else:
+                        assert npm_exe is not None
+                        success, pkg = try_install_package_candidates(npm_exe, spec, spec_log)
+                except BaseException:
+                    abort.set()
+                    raise
+                if not success and not spec.optional and not is_probably_windows_file_lock_error(pkg):
+                    abort.set()  # A required CLI failed: do not start the remaining installs.
+                return (success, pkg)
+
+        def install_specs(specs: list[CliSpec]) -> list[tuple[CliSpec, Optional[tuple[bool, Optional[str]]]]]:
+            # Several npm CLIs share one npm process when that works; per-CLI installs (with their
+            # candidate fallbacks and file-lock retries) run only when the batch fails.
+            if len(specs) > 1 and not any(spec.key in _NON_NPM_CLI_KEYS for spec in specs):
+                with npm_lock:
+                    if abort.is_set():
+                        return [(spec, None) for spec in specs]
+                    self.set_status(f"Installing {len(specs)} npm CLIs in one batch")
+                    assert npm_exe is not None
+                    try:
+                        batch_log = prefixed_log(self.log, " + ".join(spec.label for spec in specs))
+                        batched = try_bulk_install_npm(npm_exe, specs, batch_log)
+                    except BaseException:
+                        abort.set()
+                        raise
+                if batched:
+                    return [(spec, (True, spec.package_candidates[0])) for spec in specs]
+            return [(spec, install_spec(spec)) for spec in specs]
+
+        results: dict[str, tuple[bool, Optional[str]]] = {}
+        futures: dict[Future, list[CliSpec]] = {}
+        pool = ThreadPoolExecutor(max_workers=max(1, min(total, INSTALL_MAX_WORKERS)), thread_name_prefix="install")
+        try:
+            # Mistral Vibe and Ollama do not need Node.js, so on Windows their winget installs start
+            # now and overlap the Node.js bootstrap below. On Linux they wait for it: apt/dnf/pacman
+            # hold one package-manager lock, so concurrent root installs would only block or fail.
+            if not is_linux():
+                for spec in selected:
+                    if spec.key in _NON_NPM_CLI_KEYS:
+                        futures[pool.submit(install_specs, [spec])] = [spec]
 
-            if spec.key == "mistral":
-                success, pkg = try_install_mistral_vibe(spec, self.log)
-            elif spec.key == "ollama":
-                success, pkg = ensure_ollama_via_winget(self.log)
-            else:
-                success, pkg = try_install_package_candidates(npm_exe, spec, self.log)
+            try:
+                self.set_progress("Checking/installing Node.js + npm", 5)
+                ensure_node_via_winget(self.log)
+
+                self.set_progress("Locating npm", 15)
+                npm_exe = find_npm()
+                if not npm_exe:
+                    raise RuntimeError(
+                        "npm was not found after Node.js setup. Try closing and reopening the app, or install Node.js manually."
+                    )
+                self.log(f"Using npm executable: {npm_exe}")
+
+                bin_dirs = BinDirCache(npm_exe, self.log)
+                cli_bin_dirs = bin_dirs.dirs(*run_dir_kinds)
+                self.log("PATH directories to ensure: " + (", ".join(cli_bin_dirs) if cli_bin_dirs else "(none found yet)"))
+
+                self.set_progress("Updating user/system PATH", 20)
+                added_user, user_err = add_dirs_to_path("user", cli_bin_dirs)
+                if user_err:
+                    self.log(f"User PATH update warning: {user_err}")
+                elif added_user:
+                    self.log("Added to user PATH: " + ", ".join(added_user))
+                else:
+                    self.log("User PATH already contains required directories.")
+
+                system_path_dirs = filter_system_path_dirs(cli_bin_dirs)
+                added_system, system_err = add_dirs_to_path("system", system_path_dirs)
+                if system_err:
+                    self.log(f"System PATH update warning: {system_err}")
+                elif added_system:
+                    self.log("Added to system PATH: " + ", ".join(added_system))
+                else:
+                    self.log("System PATH already contains required directories.")
+            except BaseException:
+                abort.set()
+                raise
+
+            submitted = {spec.key for specs in futures.values() for spec in specs}
+            for spec in selected:
+                if spec.key in _NON_NPM_CLI_KEYS and spec.key not in submitted:
+                    futures[pool.submit(install_specs, [spec])] = [spec]
+            npm_specs = [spec for spec in selected if spec.key not in _NON_NPM_CLI_KEYS]
+            if npm_specs:
+                futures[pool.submit(install_specs, npm_specs)] = npm_specs
+
+            done = 0
+            for future in as_completed(futures):
+                spec_results = future.result()
+                done += len(spec_results)
+                self.set_gauge(20 + done * 60 // total)
+                for spec, result in spec_results:
+                    if result is not None:
+                        results[spec.key] = result
+        finally:
+            abort.set()
+            pool.shutdown(wait=True)
+        assert npm_exe is not None and bin_dirs is not None
+
+        def resolve_installed_command(spec: CliSpec) -> Optional[str]:
+            # The directories probed before the installs usually still hold; probe again only on a miss.
+            extra_kind = _CLI_DIR_KIND_BY_KEY.get(spec.key)
+            kinds = ("npm", extra_kind) if extra_kind else ("npm",)
+            command_path = resolve_command_path(spec.command_candidates, bin_dirs.dirs(*kinds))
+            if command_path is None:
+                bin_dirs.invalidate()
+                command_path = resolve_command_path(spec.command_candidates, bin_dirs.dirs(*kinds))
+            return command_path
+
+        for spec in selected:
+            if spec.key not in results:
+                continue  # Skipped after a required failure, which is raised below.
+            success, pkg = results[spec.key]
             if not success:
                 if spec.optional:
                     self.log(f"Skipping optional {spec.label}: no working install candidate.")
                     continue
                 if is_probably_windows_file_lock_error(pkg):
-                    cli_bin_dirs = get_cli_bin_dirs(npm_exe, self.log)
-                    command_path = resolve_command_path(spec.command_candidates, cli_bin_dirs)
+                    command_path = resolve_installed_command(spec)
                     if command_path:
                         self.log(
                             f"Warning: {spec.label} install/update is blocked by a locked file "
@@ -2926,28 +3770,19 @@ class InstallerFrame(wx.Frame):
 
             assert pkg is not None
             self.log(f"Installed {spec.label} using package {pkg}")
-            if spec.key not in ("mistral", "ollama"):
+            if spec.key not in _NON_NPM_CLI_KEYS:
                 installed_packages.append(pkg)
 
-            cli_bin_dirs = get_cli_bin_dirs(npm_exe, self.log)
-            if spec.key == "mistral":
-                cli_bin_dirs = dedupe_preserve_order(cli_bin_dirs + get_python_cli_bin_dirs(self.log))
-            if spec.key == "ollama":
-                cli_bin_dirs = dedupe_preserve_order(cli_bin_dirs + get_ollama_cli_bin_dirs(self.log))
-            command_path = resolve_command_path(spec.command_candidates, cli_bin_dirs)
+            command_path = resolve_installed_command(spec)
             if command_path:
                 self.log(f"Resolved command path for {spec.label}: {command_path}")
                 installed_commands.append((spec, command_path))
             else:
                 self.log(f"Warning: Could not resolve executable path for {spec.label}. Shortcut will be skipped.")
 
-        self.set_status("Refreshing PATH entries")
-        self.set_gauge(85)
-        cli_bin_dirs = get_cli_bin_dirs(npm_exe, self.log)
-        if needs_python_cli_dirs:
-            cli_bin_dirs = dedupe_preserve_order(cli_bin_dirs + get_python_cli_bin_dirs(self.log))
-        if needs_ollama_cli_dirs:
-            cli_bin_dirs = dedupe_preserve_order(cli_bin_dirs + get_ollama_cli_bin_dirs(self.log))
+        self.set_progress("Refreshing PATH entries", 85)
+        bin_dirs.invalidate()
+        cli_bin_dirs = bin_dirs.dirs(*run_dir_kinds)
         added_user, user_err = add_dirs_to_path("user", cli_bin_dirs)
         if user_err:
             self.log(f"User PATH refresh warning: {user_err}")
@@ -2961,28 +3796,21 @@ class InstallerFrame(wx.Frame):
         elif added_system:
             self.log("Added to system PATH (post-install): " + ", ".join(added_system))
 
-        self.set_status("Configuring auto-updates")
-        self.set_gauge(90)
-        if enable_auto_update:
-            try:
-                ensure_cli_auto_update_task(npm_exe, installed_packages, self.log)
-            except Exception as exc:
-                self.log(f"Auto-update task warning: {exc}")
-        else:
-            self.log("Hidden auto-update task disabled for this run.")
+        # Task registration and shortcut creation share one PowerShell process (started only if needed).
+        with powershell_session():
+            self.set_progress("Configuring auto-updates", 90)
+            if enable_auto_update:
+                try:
+                    ensure_cli_auto_update_task(npm_exe, installed_packages, self.log)
+                except Exception as exc:
+                    self.log(f"Auto-update task warning: {exc}")
+            else:
+                self.log("Hidden auto-update task disabled for this run.")
 
-        self.set_status("Creating desktop shortcuts")
-        self.set_gauge(92)
-        for spec, cmd_path in installed_commands:
-            try:
-                create_cli_desktop_shortcut(spec, cmd_path, self.log)
-            except Exception as exc:
-                self.log(f"Shortcut creation failed for {spec.label}: {exc}")
-        if is_linux() and installed_commands:
-            update_desktop_database_for_user(self.log)
+            self.set_progress("Creating desktop shortcuts", 92)
+            create_cli_desktop_shortcuts(installed_commands, self.log)
 
-        self.set_status("Finalizing")
-        self.set_gauge(98)
+        self.set_progress("Finalizing", 98)
         self.log("")
         self.log("Next step: launch a shortcut on the Desktop, or open a new terminal and run the installed CLI command.")
 
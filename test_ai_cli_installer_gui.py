@@ -1,9 +1,12 @@
+import io
 import os
 import subprocess
 import tempfile
+import threading
+import time
 import types
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import ai_cli_installer_gui as m
 
@@ -24,11 +27,17 @@ class DummyFrame:
     def set_gauge(self, value: int) -> None:
         self.gauges.append(value)
 
+    def set_progress(self, text: str, value: int) -> None:
+        self.statuses.append(text)
+        self.gauges.append(value)
+
     def set_busy(self, busy: bool) -> None:
         self.busy.append(busy)
 
 
 class DummyCheckbox:
+    __slots__ = ("value",)
+
     def __init__(self, value: bool) -> None:
         self.value = value
 
@@ -40,6 +49,8 @@ class DummyCheckbox:
 
 
 class DummyLogCtrl:
+    __slots__ = ("cleared", "appended", "_pos")
+
     def __init__(self) -> None:
         self.cleared = False
         self.appended: list[str] = []
@@ -59,15 +70,19 @@ class DummyLogCtrl:
         return self._pos
 
 
-class DummyThreadState:
-    def __init__(self, alive: bool) -> None:
-        self._alive = alive
+class DummyWorkerFuture:
+    __slots__ = ("_running",)
+
+    def __init__(self, running: bool) -> None:
+        self._running = running
 
-    def is_alive(self) -> bool:
-        return self._alive
+    def done(self) -> bool:
+        return not self._running
 
 
 class FakeRegistryKey:
+    __slots__ = ()
+
     def __enter__(self):
         return self
 
@@ -77,103 +92,143 @@ class FakeRegistryKey:
 
 class UtilityFunctionTests(unittest.TestCase):
     def test_is_windows_reflects_os_name(self) -> None:
-        with patch.object(m.os, "name", "nt"):
+        self.assertEqual(m._IS_WINDOWS, os.name == "nt")
+        with patch.object(m, "_IS_WINDOWS", True):
             self.assertTrue(m.is_windows())
-        with patch.object(m.os, "name", "posix"):
+        with patch.object(m, "_IS_WINDOWS", False):
             self.assertFalse(m.is_windows())
 
     def test_is_linux_reflects_platform(self) -> None:
-        with patch.object(m.sys, "platform", "linux"):
+        self.assertEqual(m._IS_LINUX, m.sys.platform.startswith("linux"))
+        with patch.object(m, "_IS_LINUX", True):
             self.assertTrue(m.is_linux())
-        with patch.object(m.sys, "platform", "win32"):
+        with patch.object(m, "_IS_LINUX", False):
             self.assertFalse(m.is_linux())
 
     def test_is_admin_handles_success_and_exception(self) -> None:
+        self.addCleanup(m.is_admin.cache_clear)
         windll_true = types.SimpleNamespace(
             shell32=types.SimpleNamespace(IsUserAnAdmin=lambda: 1)
         )
         windll_fail = types.SimpleNamespace(
             shell32=types.SimpleNamespace(IsUserAnAdmin=MagicMock(side_effect=RuntimeError("boom")))
         )
-        with patch.object(m.ctypes, "windll", windll_true, create=True):
+        with (
+            patch.object(m, "_IS_WINDOWS", True),
+            patch.object(m.ctypes, "windll", windll_true, create=True),
+        ):
+            m.is_admin.cache_clear()
             self.assertTrue(m.is_admin())
-        with patch.object(m.ctypes, "windll", windll_fail, create=True):
+        with (
+            patch.object(m, "_IS_WINDOWS", True),
+            patch.object(m.ctypes, "windll", windll_fail, create=True),
+        ):
+            m.is_admin.cache_clear()
             self.assertFalse(m.is_admin())
 
+    def test_is_admin_caches_result(self) -> None:
+        self.addCleanup(m.is_admin.cache_clear)
+        m.is_admin.cache_clear()
+        geteuid = MagicMock(return_value=0)
+        with (
+            patch.object(m, "_IS_WINDOWS", False),
+            patch.object(m.os, "geteuid", geteuid, create=True),
+        ):
+            self.assertTrue(m.is_admin())
+            self.assertTrue(m.is_admin())
+        geteuid.assert_called_once_with()
+
     def test_is_admin_linux_uses_geteuid(self) -> None:
+        self.addCleanup(m.is_admin.cache_clear)
         with (
-            patch.object(m.os, "name", "posix"),
+            patch.object(m, "_IS_WINDOWS", False),
             patch.object(m.os, "geteuid", return_value=0, create=True),
         ):
+            m.is_admin.cache_clear()
             self.assertTrue(m.is_admin())
         with (
-            patch.object(m.os, "name", "posix"),
+            patch.object(m, "_IS_WINDOWS", False),
             patch.object(m.os, "geteuid", side_effect=OSError("nope"), create=True),
         ):
+            m.is_admin.cache_clear()
             self.assertFalse(m.is_admin())
         with (
-            patch.object(m.os, "name", "posix"),
+            patch.object(m, "_IS_WINDOWS", False),
             patch.object(m.os, "geteuid", None, create=True),
         ):
+            m.is_admin.cache_clear()
             self.assertFalse(m.is_admin())
 
     def test_broadcast_environment_change_calls_windows_api(self) -> None:
-        send_mock = MagicMock()
+        m._send_message_timeout_w.cache_clear()
+        self.addCleanup(m._send_message_timeout_w.cache_clear)
+        send_mock = Mock()
         fake_windll = types.SimpleNamespace(
             user32=types.SimpleNamespace(SendMessageTimeoutW=send_mock)
         )
-        fake_result = object()
         with (
+            patch.object(m, "_IS_WINDOWS", True),
             patch.object(m.ctypes, "windll", fake_windll, create=True),
-            patch.object(m.ctypes, "c_ulong", return_value=fake_result),
             patch.object(m.ctypes, "byref", side_effect=lambda x: ("ref", x)),
         ):
             m.broadcast_environment_change()
+            m.broadcast_environment_change()
 
         args = send_mock.call_args.args
         self.assertEqual(args[0], 0xFFFF)
         self.assertEqual(args[1], m.WM_SETTINGCHANGE)
         self.assertEqual(args[3], "Environment")
+        self.assertEqual(args[6][0], "ref")
+        self.assertIsInstance(args[6][1], m.ctypes.c_size_t)
+        self.assertEqual(len(send_mock.argtypes), 7)
+        self.assertEqual(send_mock.call_count, 2)
 
     def test_broadcast_environment_change_swallows_errors(self) -> None:
-        send_mock = MagicMock(side_effect=RuntimeError("fail"))
+        m._send_message_timeout_w.cache_clear()
+        self.addCleanup(m._send_message_timeout_w.cache_clear)
+        send_mock = Mock(side_effect=RuntimeError("fail"))
         fake_windll = types.SimpleNamespace(
             user32=types.SimpleNamespace(SendMessageTimeoutW=send_mock)
         )
         with (
+            patch.object(m, "_IS_WINDOWS", True),
             patch.object(m.ctypes, "windll", fake_windll, create=True),
-            patch.object(m.ctypes, "c_ulong", return_value=object()),
+            patch.object(m.ctypes, "c_size_t", return_value=object()),
             patch.object(m.ctypes, "byref", side_effect=lambda x: x),
         ):
             m.broadcast_environment_change()
 
     def test_broadcast_environment_change_returns_early_on_non_windows(self) -> None:
-        with patch.object(m.os, "name", "posix"):
+        with patch.object(m, "_IS_WINDOWS", False):
             self.assertIsNone(m.broadcast_environment_change())
 
     def test_subprocess_creationflags_kwargs_windows_and_non_windows(self) -> None:
-        with patch.object(m.os, "name", "nt"):
-            self.assertEqual(m.subprocess_creationflags_kwargs(), {"creationflags": m.CREATE_NO_WINDOW})
-        with patch.object(m.os, "name", "posix"):
-            self.assertEqual(m.subprocess_creationflags_kwargs(), {})
+        expected = {"creationflags": m.CREATE_NO_WINDOW} if os.name == "nt" else {}
+        self.assertEqual(m.subprocess_creationflags_kwargs(), expected)
+        self.assertIs(m.subprocess_creationflags_kwargs(), m._CREATIONFLAGS_KWARGS)
 
     def test_grok_spec_uses_vibe_kit_package(self) -> None:
-        grok = next(spec for spec in m.CLI_SPECS if spec.key == "grok")
+        grok = m._CLI_BY_KEY["grok"]
         self.assertEqual(grok.package_candidates, ("@vibe-kit/grok-cli",))
         self.assertIn("grok", grok.command_candidates)
 
     def test_ollama_spec_uses_official_winget_package(self) -> None:
-        ollama = next(spec for spec in m.CLI_SPECS if spec.key == "ollama")
+        ollama = m._CLI_BY_KEY["ollama"]
         self.assertEqual(ollama.package_candidates, (m.OLLAMA_WINGET_ID,))
         self.assertEqual(ollama.command_candidates, ("ollama",))
         self.assertIn("official", ollama.help_text.lower())
 
     def test_codex_desktop_app_spec_uses_msstore_product_id(self) -> None:
-        codex_app = next(spec for spec in m.GUI_APP_SPECS if spec.key == "codex_app")
+        codex_app = m._GUI_APP_BY_KEY["codex_app"]
         self.assertEqual(codex_app.winget_id, "9PLM9XGG6VKS")
         self.assertEqual(codex_app.winget_source, "msstore")
         self.assertIsNone(codex_app.windows_browser_url)
 
+    def test_spec_lookup_tables_cover_every_spec(self) -> None:
+        self.assertEqual(list(m._CLI_BY_KEY.values()), list(m.CLI_SPECS))
+        self.assertEqual(list(m._GUI_APP_BY_KEY.values()), list(m.GUI_APP_SPECS))
+        self.assertTrue(m._NON_NPM_CLI_KEYS <= set(m._CLI_BY_KEY))
+
     def test_split_path_filters_empty_parts(self) -> None:
         self.assertEqual(m.split_path(""), [])
         self.assertEqual(m.split_path("A;;B;"), ["A", "B"])
@@ -183,6 +238,66 @@ class UtilityFunctionTests(unittest.TestCase):
         expected = os.path.normcase(os.path.normpath(r"C:\Temp\foo\..\bar\\"))
         self.assertEqual(m.normalize_path_for_compare(raw), expected)
 
+    def test_normalize_path_for_compare_expands_variables_from_live_environment(self) -> None:
+        with patch.dict(m.os.environ, {"ITC_TEST_ROOT": "first"}, clear=False):
+            first = m.normalize_path_for_compare(os.path.join("$ITC_TEST_ROOT", "bin"))
+        with patch.dict(m.os.environ, {"ITC_TEST_ROOT": "second"}, clear=False):
+            second = m.normalize_path_for_compare(os.path.join("$ITC_TEST_ROOT", "bin"))
+        self.assertEqual(first, os.path.normcase(os.path.join("first", "bin")))
+        self.assertEqual(second, os.path.normcase(os.path.join("second", "bin")))
+
+    def test_fs_probe_cache_memoizes_hits_only_inside_a_run(self) -> None:
+        isdir = MagicMock(side_effect=lambda p: p == "hit")
+        which = MagicMock(return_value="/usr/bin/python3")
+        with (
+            patch.object(m.os.path, "isdir", isdir),
+            patch.object(m.shutil, "which", which),
+            patch.dict(m.os.environ, {"PATH": "/usr/bin"}, clear=False),
+        ):
+            self.assertTrue(m._isdir_cached("hit"))
+            self.assertTrue(m._isdir_cached("hit"))
+            self.assertEqual(isdir.call_count, 2)
+
+            isdir.reset_mock()
+            with m.fs_probe_cache():
+                self.assertTrue(m._isdir_cached("hit"))
+                self.assertTrue(m._isdir_cached("hit"))
+                self.assertFalse(m._isdir_cached("miss"))
+                self.assertFalse(m._isdir_cached("miss"))
+                self.assertEqual(m._which_cached("python3"), "/usr/bin/python3")
+                self.assertEqual(m._which_cached("python3"), "/usr/bin/python3")
+                m.os.environ["PATH"] = "/opt/bin"
+                m._which_cached("python3")
+            self.assertEqual([c.args[0] for c in isdir.call_args_list], ["hit", "miss", "miss"])
+            self.assertEqual(which.call_count, 2)
+            self.assertEqual(m._ISDIR_CACHE, set())
+            self.assertEqual(m._WHICH_CACHE, {})
+
+    def test_find_helpers_reuse_hits_inside_a_run_until_the_file_disappears(self) -> None:
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            uv_path = os.path.join(tmp_dir, "uv")
+            with open(uv_path, "w", encoding="utf-8") as f:
+                f.write("")
+            scan = MagicMock(side_effect=[None, uv_path, None, None])
+            with patch.object(m, "_scan_path_for", scan):
+                with m.fs_probe_cache():
+                    self.assertIsNone(m.find_uv())
+                    self.assertEqual(m.find_uv(), uv_path)
+                    self.assertEqual(m.find_uv(), uv_path)
+                    self.assertEqual(scan.call_count, 2)  # The miss was not cached; the hit was.
+                    os.remove(uv_path)
+                    self.assertIsNone(m.find_uv())
+                    self.assertEqual(scan.call_count, 3)
+                self.assertEqual(m._COMMAND_HIT_CACHE, {})
+                self.assertIsNone(m.find_uv())
+        self.assertEqual(scan.call_count, 4)
+
+    def test_run_with_fs_probe_cache_scopes_the_target(self) -> None:
+        seen: list[bool] = []
+        m.run_with_fs_probe_cache(lambda value: seen.append(value and m._fs_probe_cache_active), True)
+        self.assertEqual(seen, [True])
+        self.assertFalse(m._fs_probe_cache_active)
+
     def test_is_path_within_handles_success_and_errors(self) -> None:
         self.assertTrue(m.is_path_within(r"C:\Users\Admin\AppData\Roaming\npm", r"C:\Users\Admin"))
         self.assertFalse(m.is_path_within(r"C:\Program Files\nodejs", r"C:\Users\Admin"))
@@ -232,19 +347,44 @@ class UtilityFunctionTests(unittest.TestCase):
                 self.assertEqual(created, path)
                 self.assertTrue(os.path.isfile(path))
 
-                err = m.append_persistent_log_line(path, "hello")
-                self.assertIsNone(err)
+                with patch("builtins.open", wraps=open) as open_spy:
+                    self.assertIsNone(m.append_persistent_log_line(path, "hello"))
+                    self.assertIsNone(m.append_persistent_log_line(path, "again"))
+                self.assertEqual(open_spy.call_count, 1)
                 with open(path, "r", encoding="utf-8") as f:
                     text = f.read()
                 self.assertIn("InstallTheCli GUI log started:", text)
-                self.assertIn("hello\n", text)
+                self.assertIn("hello\nagain\n", text)
+
+                m.reset_gui_last_run_log()
+                self.assertEqual(m._persistent_log_files, {})
+                with open(path, "r", encoding="utf-8") as f:
+                    self.assertNotIn("hello", f.read())
+                m.close_persistent_log_files()
 
     def test_append_persistent_log_line_handles_none_and_oserror(self) -> None:
+        self.addCleanup(m.close_persistent_log_files)
         self.assertIsNone(m.append_persistent_log_line(None, "ignored"))
         with patch("builtins.open", side_effect=OSError("disk full")):
             err = m.append_persistent_log_line("x.log", "line")
         self.assertIn("disk full", err or "")
 
+        failing_handle = MagicMock()
+        failing_handle.write.side_effect = OSError("write failed")
+        with patch.dict(m._persistent_log_files, {"x.log": failing_handle}):
+            err = m.append_persistent_log_line("x.log", "line")
+            self.assertNotIn("x.log", m._persistent_log_files)
+        self.assertIn("write failed", err or "")
+        failing_handle.close.assert_called_once()
+
+    def test_write_nonempty_lines_writes_stripped_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "packages.txt")
+            m.write_nonempty_lines(path, [" a ", "", "b"])
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "a\nb\n")
+            self.assertEqual(os.listdir(tmp_dir), ["packages.txt"])
+
     def test_reset_gui_last_run_log_returns_none_on_failure(self) -> None:
         with (
             patch.object(m, "get_app_support_directory", return_value=r"C:\Denied\InstallTheCli"),
@@ -253,46 +393,51 @@ class UtilityFunctionTests(unittest.TestCase):
             self.assertIsNone(m.reset_gui_last_run_log())
 
     def test_read_linux_os_release_and_detect_family(self) -> None:
-        os_release = "ID=ubuntu\nID_LIKE=debian\nNAME='Ubuntu'\n#comment\n"
+        m._load_linux_os_release.cache_clear()
+        self.addCleanup(m._load_linux_os_release.cache_clear)
+        os_release = (
+            "ID=ubuntu\nID_LIKE=debian\nNAME='Ubuntu'\n#comment\n"
+            'PRETTY_NAME="Ubuntu 24.04 LTS" # trailing\nVERSION="unbalanced\n'
+        )
         with (
             patch.object(m, "is_linux", return_value=True),
-            patch("builtins.open", unittest.mock.mock_open(read_data=os_release)),
+            patch("builtins.open", side_effect=lambda *_args, **_kwargs: io.StringIO(os_release)) as open_mock,
         ):
             parsed = m.read_linux_os_release()
-        self.assertEqual(parsed["ID"], "ubuntu")
+            parsed["ID"] = "mutated"
+            self.assertEqual(m.read_linux_os_release()["ID"], "ubuntu")
+        self.assertEqual(open_mock.call_count, 1)
         self.assertEqual(parsed["ID_LIKE"], "debian")
+        self.assertEqual(parsed["NAME"], "Ubuntu")
+        self.assertEqual(parsed["PRETTY_NAME"], "Ubuntu 24.04 LTS")
+        self.assertEqual(parsed["VERSION"], "unbalanced")
+        m._load_linux_os_release.cache_clear()
 
         with patch.object(m, "is_linux", return_value=False):
             self.assertEqual(m.read_linux_os_release(), {})
 
         with (
             patch.object(m, "is_linux", return_value=True),
-            patch("builtins.open", side_effect=OSError("no file")),
+            patch("builtins.open", side_effect=OSError("no file")) as missing_open,
         ):
             self.assertEqual(m.read_linux_os_release(), {})
+            self.assertEqual(m.read_linux_os_release(), {})
+        self.assertEqual(missing_open.call_count, 1)
 
         with patch.object(m, "is_linux", return_value=False):
             self.assertIsNone(m.detect_linux_distro_family())
-        with (
-            patch.object(m, "is_linux", return_value=True),
-            patch.object(m, "read_linux_os_release", return_value={"ID": "ubuntu", "ID_LIKE": "debian"}),
-        ):
-            self.assertEqual(m.detect_linux_distro_family(), "debian")
-        with (
-            patch.object(m, "is_linux", return_value=True),
-            patch.object(m, "read_linux_os_release", return_value={"ID": "fedora", "ID_LIKE": "rhel"}),
-        ):
-            self.assertEqual(m.detect_linux_distro_family(), "fedora")
-        with (
-            patch.object(m, "is_linux", return_value=True),
-            patch.object(m, "read_linux_os_release", return_value={"ID": "arch", "ID_LIKE": ""}),
-        ):
-            self.assertEqual(m.detect_linux_distro_family(), "arch")
-        with (
-            patch.object(m, "is_linux", return_value=True),
-            patch.object(m, "read_linux_os_release", return_value={"ID": "suse", "ID_LIKE": ""}),
-        ):
-            self.assertIsNone(m.detect_linux_distro_family())
+        cases = [
+            ({"ID": "ubuntu", "ID_LIKE": "debian"}, "debian"),
+            ({"ID": "fedora", "ID_LIKE": "rhel"}, "fedora"),
+            ({"ID": "arch", "ID_LIKE": ""}, "arch"),
+            ({"ID": "suse", "ID_LIKE": ""}, None),
+            ({"ID": "archarm", "ID_LIKE": "fedora ubuntu"}, "debian"),
+            ({"ID": "endeavouros", "ID_LIKE": "archlinux"}, "arch"),
+        ]
+        with patch.object(m, "is_linux", return_value=True):
+            for release, family in cases:
+                with self.subTest(release=release), patch.object(m, "read_linux_os_release", return_value=release):
+                    self.assertEqual(m.detect_linux_distro_family(), family)
 
     def test_linux_root_helpers(self) -> None:
         with patch.object(m, "is_linux", return_value=True):
@@ -341,6 +486,24 @@ class UtilityFunctionTests(unittest.TestCase):
                 r"C:\Users\Admin\AppData\Local\InstallTheCli",
             )
 
+    def test_bin_dir_cache_memoizes_each_kind_until_invalidated(self) -> None:
+        with (
+            patch.object(m, "get_cli_bin_dirs", return_value=["/npm/bin", "/shared"]) as npm_dirs,
+            patch.object(m, "get_python_cli_bin_dirs", return_value=["/shared", "/py/bin"]) as py_dirs,
+            patch.object(m, "get_ollama_cli_bin_dirs") as ollama_dirs,
+        ):
+            cache = m.BinDirCache("npm", lambda _msg: None)
+            self.assertEqual(cache.dirs("npm", "python"), ["/npm/bin", "/shared", "/py/bin"])
+            self.assertEqual(cache.dirs("npm"), ["/npm/bin", "/shared"])
+            self.assertEqual(npm_dirs.call_count, 1)
+            self.assertEqual(py_dirs.call_count, 1)
+            cache.invalidate()
+            cache.dirs("npm")
+            self.assertEqual(npm_dirs.call_count, 2)
+            ollama_dirs.assert_not_called()
+            with self.assertRaises(ValueError):
+                cache.dirs("bogus")
+
     def test_filter_system_path_dirs_excludes_user_scoped_locations(self) -> None:
         dirs = [
             r"C:\Users\Admin\AppData\Roaming\npm",
@@ -363,54 +526,83 @@ class UtilityFunctionTests(unittest.TestCase):
             result = m.filter_system_path_dirs(dirs)
         self.assertEqual(result, [r"C:\Program Files\nodejs", r"D:\Shared\bin"])
 
-    def test_add_dirs_to_path_linux_user_system_and_errors(self) -> None:
-        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
-            home = os.path.join(tmp_dir, "home")
-            os.makedirs(home, exist_ok=True)
-            bin_dir = os.path.join(home, ".local", "bin")
-            os.makedirs(bin_dir, exist_ok=True)
-            profile_path = os.path.join(home, ".profile")
-            with open(profile_path, "w", encoding="utf-8") as f:
-                f.write("# existing")
-
-            with (
-                patch.object(m, "is_windows", return_value=False),
-                patch.object(m.os.path, "expanduser", return_value=home),
-                patch.dict(m.os.environ, {"PATH": "/usr/bin"}, clear=False),
-            ):
-                added, err = m.add_dirs_to_path("user", [bin_dir])
-            self.assertEqual(added, [bin_dir])
-            self.assertIsNone(err)
-            with open(profile_path, "r", encoding="utf-8") as f:
-                profile_text = f.read()
-            self.assertIn("InstallTheCli PATH", profile_text)
-            self.assertIn(bin_dir, profile_text)
+    def test_filter_system_path_dirs_does_not_treat_name_prefixes_as_ancestors(self) -> None:
+        home = os.path.join(os.sep, "home", "ann")
+        dirs = [
+            home,
+            os.path.join(home, ".local", "bin"),
+            os.path.join(os.sep, "home", "anna", "bin"),
+            os.path.join(os.sep, "usr", "bin"),
+        ]
+        with (
+            patch.object(m.os.path, "expanduser", return_value=home),
+            patch.dict(m.os.environ, {}, clear=False),
+        ):
+            for name in ("AppData", "LocalAppData", "UserProfile"):
+                m.os.environ.pop(name, None)
+            result = m.filter_system_path_dirs(dirs)
+        self.assertEqual(result, [os.path.join(os.sep, "home", "anna", "bin"), os.path.join(os.sep, "usr", "bin")])
+
+    def _make_linux_home(self) -> tuple[str, str, str]:
+        tmp_dir = tempfile.TemporaryDirectory(dir=".")
+        self.addCleanup(tmp_dir.cleanup)
+        home = os.path.join(tmp_dir.name, "home")
+        bin_dir = os.path.join(home, ".local", "bin")
+        os.makedirs(bin_dir, exist_ok=True)
+        profile_path = os.path.join(home, ".profile")
+        with open(profile_path, "w", encoding="utf-8") as f:
+            f.write("# existing")
+        return home, bin_dir, profile_path
+
+    def test_add_dirs_to_path_linux_user_appends_to_profile(self) -> None:
+        home, bin_dir, profile_path = self._make_linux_home()
+        with (
+            patch.object(m, "is_windows", return_value=False),
+            patch.object(m.os.path, "expanduser", return_value=home),
+            patch.dict(m.os.environ, {"PATH": "/usr/bin"}, clear=False),
+        ):
+            added, err = m.add_dirs_to_path("user", [bin_dir])
+        self.assertEqual(added, [bin_dir])
+        self.assertIsNone(err)
+        with open(profile_path, "r", encoding="utf-8") as f:
+            profile_text = f.read()
+        self.assertIn("InstallTheCli PATH", profile_text)
+        self.assertIn(bin_dir, profile_text)
 
-            with (
-                patch.object(m, "is_windows", return_value=False),
-                patch.object(m.os.path, "expanduser", return_value=home),
-                patch.dict(m.os.environ, {"PATH": f"/usr/bin{os.pathsep}{bin_dir}"}, clear=False),
-            ):
-                added, err = m.add_dirs_to_path("user", [bin_dir])
-            self.assertEqual(added, [])
-            self.assertIsNone(err)
+    def test_add_dirs_to_path_linux_user_skips_dir_already_on_path(self) -> None:
+        home, bin_dir, profile_path = self._make_linux_home()
+        with (
+            patch.object(m, "is_windows", return_value=False),
+            patch.object(m.os.path, "expanduser", return_value=home),
+            patch.dict(m.os.environ, {"PATH": f"/usr/bin{os.pathsep}{bin_dir}"}, clear=False),
+        ):
+            added, err = m.add_dirs_to_path("user", [bin_dir])
+        self.assertEqual(added, [])
+        self.assertIsNone(err)
+        with open(profile_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# existing")
 
-            with open(profile_path, "a", encoding="utf-8") as f:
-                f.write(f'\nexport PATH="$PATH:{bin_dir}"  # InstallTheCli PATH {bin_dir}\n')
-            with (
-                patch.object(m, "is_windows", return_value=False),
-                patch.object(m.os.path, "expanduser", return_value=home),
-                patch.dict(m.os.environ, {"PATH": "/usr/bin"}, clear=False),
-            ):
-                added, err = m.add_dirs_to_path("user", [bin_dir])
-            self.assertEqual(added, [])
-            self.assertIsNone(err)
+    def test_add_dirs_to_path_linux_user_skips_dir_already_in_profile(self) -> None:
+        home, bin_dir, profile_path = self._make_linux_home()
+        with open(profile_path, "a", encoding="utf-8") as f:
+            f.write(f'\nexport PATH="$PATH:{bin_dir}"  # InstallTheCli PATH {bin_dir}\n')
+        with (
+            patch.object(m, "is_windows", return_value=False),
+            patch.object(m.os.path, "expanduser", return_value=home),
+            patch.dict(m.os.environ, {"PATH": "/usr/bin"}, clear=False),
+        ):
+            added, err = m.add_dirs_to_path("user", [bin_dir])
+        self.assertEqual(added, [])
+        self.assertIsNone(err)
 
-            with patch.object(m, "is_windows", return_value=False):
-                self.assertEqual(m.add_dirs_to_path("system", [bin_dir]), ([], None))
-                with self.assertRaises(ValueError):
-                    m.add_dirs_to_path("machine", [bin_dir])
+    def test_add_dirs_to_path_linux_system_is_noop_and_unknown_scope_raises(self) -> None:
+        _home, bin_dir, _profile_path = self._make_linux_home()
+        with patch.object(m, "is_windows", return_value=False):
+            self.assertEqual(m.add_dirs_to_path("system", [bin_dir]), ([], None))
+            with self.assertRaises(ValueError):
+                m.add_dirs_to_path("machine", [bin_dir])
 
+    def test_add_dirs_to_path_linux_reports_profile_errors(self) -> None:
         with (
             patch.object(m, "is_windows", return_value=False),
             patch.object(m.os.path, "isdir", return_value=True),
@@ -422,6 +614,8 @@ class UtilityFunctionTests(unittest.TestCase):
         self.assertIn("profile denied", err or "")
 
     def test_find_desktop_directory_linux_prefers_existing_then_falls_back(self) -> None:
+        self.addCleanup(m.find_desktop_directory.cache_clear)
+        m.find_desktop_directory.cache_clear()
         with (
             patch.object(m, "is_windows", return_value=False),
             patch.object(m.os.path, "expanduser", return_value="/home/admin"),
@@ -431,6 +625,7 @@ class UtilityFunctionTests(unittest.TestCase):
         ):
             self.assertEqual(m.find_desktop_directory(), "/home/admin/MyDesktop")
 
+        m.find_desktop_directory.cache_clear()
         with (
             patch.object(m, "is_windows", return_value=False),
             patch.object(m.os.path, "expanduser", return_value="/home/admin"),
@@ -442,8 +637,10 @@ class UtilityFunctionTests(unittest.TestCase):
     def test_linux_one_click_script_exists_and_contains_expected_commands(self) -> None:
         script_path = os.path.join(os.getcwd(), "install_all_linux.sh")
         self.assertTrue(os.path.isfile(script_path), f"Missing script: {script_path}")
-        with open(script_path, "r", encoding="utf-8") as f:
-            script = f.read()
+        with open(script_path, "rb") as f:
+            raw = f.read()
+        self.assertNotIn(b"\r\n", raw)
+        script = raw.decode("utf-8")
         self.assertIn("Ollama", script)
         self.assertIn("mistral-vibe", script)
         self.assertIn("@openai/codex", script)
@@ -454,10 +651,6 @@ class UtilityFunctionTests(unittest.TestCase):
         self.assertIn("install <target>", script)
         self.assertIn("setup-cron", script)
 
-        with open(script_path, "rb") as f:
-            raw = f.read()
-        self.assertNotIn(b"\r\n", raw)
-
     def test_windows_one_click_powershell_script_exists_and_has_help_and_subcommands(self) -> None:
         script_path = os.path.join(os.getcwd(), "install_all_windows.ps1")
         self.assertTrue(os.path.isfile(script_path), f"Missing script: {script_path}")
@@ -471,6 +664,12 @@ class UtilityFunctionTests(unittest.TestCase):
 
 
 class RegistryAndWindowsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        m._REGISTRY_PATH_CACHE.clear()
+        m.find_desktop_directory.cache_clear()
+        self.addCleanup(m._REGISTRY_PATH_CACHE.clear)
+        self.addCleanup(m.find_desktop_directory.cache_clear)
+
     def test_add_dirs_to_path_returns_early_for_empty_or_missing_dirs(self) -> None:
         self.assertEqual(m.add_dirs_to_path("user", []), ([], None))
         with patch.object(m.os.path, "isdir", return_value=False):
@@ -482,7 +681,7 @@ class RegistryAndWindowsTests(unittest.TestCase):
                 m.add_dirs_to_path("machine", [r"C:\Tools"])
 
     def test_add_dirs_to_path_adds_only_new_dirs_and_broadcasts(self) -> None:
-        set_value = MagicMock()
+        set_value = Mock()
         with (
             patch.object(m.os.path, "isdir", return_value=True),
             patch.object(m.winreg, "OpenKey", return_value=FakeRegistryKey()),
@@ -504,8 +703,31 @@ class RegistryAndWindowsTests(unittest.TestCase):
         self.assertEqual(args[1], "Path")
         self.assertIn(r"C:\NewBin", args[4])
 
+    def test_add_dirs_to_path_skips_write_and_registry_when_nothing_new(self) -> None:
+        open_key = Mock(return_value=FakeRegistryKey())
+        set_value = Mock()
+        with (
+            patch.object(m.os.path, "isdir", return_value=True),
+            patch.object(m.winreg, "OpenKey", open_key),
+            patch.object(m.winreg, "QueryValueEx", return_value=(r"C:\Existing;C:\Tools", m.winreg.REG_SZ)),
+            patch.object(m.winreg, "SetValueEx", set_value),
+            patch.object(m, "broadcast_environment_change") as broadcast_mock,
+        ):
+            with m.fs_probe_cache():
+                self.assertEqual(m.add_dirs_to_path("user", [r"C:\Tools"]), ([], None))
+                self.assertEqual(open_key.call_count, 1)
+                self.assertEqual(open_key.call_args.args[3], m.winreg.KEY_READ)
+                self.assertEqual(m.add_dirs_to_path("user", [r"C:\Existing"]), ([], None))
+                self.assertEqual(open_key.call_count, 1)
+            self.assertEqual(m._REGISTRY_PATH_CACHE, {})
+            self.assertEqual(m.add_dirs_to_path("user", [r"C:\Tools"]), ([], None))
+            self.assertEqual(open_key.call_count, 2)
+
+        set_value.assert_not_called()
+        broadcast_mock.assert_not_called()
+
     def test_add_dirs_to_path_handles_missing_path_value(self) -> None:
-        set_value = MagicMock()
+        set_value = Mock()
         with (
             patch.object(m.os.path, "isdir", return_value=True),
             patch.object(m.winreg, "OpenKey", return_value=FakeRegistryKey()),
@@ -520,7 +742,7 @@ class RegistryAndWindowsTests(unittest.TestCase):
         self.assertEqual(set_value.call_args.args[3], m.winreg.REG_EXPAND_SZ)
 
     def test_add_dirs_to_path_normalizes_unknown_registry_type(self) -> None:
-        set_value = MagicMock()
+        set_value = Mock()
         with (
             patch.object(m.os.path, "isdir", return_value=True),
             patch.object(m.winreg, "OpenKey", return_value=FakeRegistryKey()),
@@ -566,6 +788,8 @@ class RegistryAndWindowsTests(unittest.TestCase):
         ):
             result = m.find_desktop_directory()
         self.assertEqual(result, r"C:\Users\Admin\Desktop")
+        with patch.object(m.winreg, "OpenKey", side_effect=AssertionError("registry re-queried")):
+            self.assertEqual(m.find_desktop_directory(), r"C:\Users\Admin\Desktop")
 
     def test_find_desktop_directory_falls_back_to_onedrive(self) -> None:
         with (
@@ -590,7 +814,17 @@ class RegistryAndWindowsTests(unittest.TestCase):
         self.assertEqual(result, r"C:\Users\Admin\Desktop")
 
     def test_create_windows_shortcut_builds_expected_powershell_command(self) -> None:
-        with patch.object(m.subprocess, "run") as run_mock:
+        scripts: list[str] = []
+
+        def fake_run(argv, **_kwargs):
+            with open(argv[-1], "r", encoding="utf-8-sig") as f:
+                scripts.append(f.read())
+            return types.SimpleNamespace(returncode=0, stdout="")
+
+        with (
+            patch.object(m, "win32com", None),
+            patch.object(m.subprocess, "run", side_effect=fake_run) as run_mock,
+        ):
             m.create_windows_shortcut(
                 shortcut_path=r"C:\Users\Admin\Desktop\Grok's.lnk",
                 target_path=r"C:\Windows\System32\cmd.exe",
@@ -600,13 +834,178 @@ class RegistryAndWindowsTests(unittest.TestCase):
             )
 
         argv = run_mock.call_args.args[0]
-        ps_script = argv[-1]
+        ps_script = scripts[0]
         self.assertEqual(argv[:4], ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass"])
+        self.assertEqual(argv[4], "-File")
+        self.assertFalse(os.path.exists(argv[5]))
         self.assertIn("CreateShortcut('C:\\Users\\Admin\\Desktop\\Grok''s.lnk')", ps_script)
         self.assertIn("$sc.Arguments = '/k \"grok\"'", ps_script)
 
+    def test_powershell_session_reuses_one_process_and_parses_sentinel(self) -> None:
+        sentinel = "__INSTALLTHECLI_DONE_abc__"
+        writes: list[str] = []
+        stdout_lines = iter(["first\n", f"{sentinel} 0\n", "oops\n", f"{sentinel} 1\n"])
+        process = MagicMock()
+        process.poll.return_value = None
+        process.stdin.write.side_effect = writes.append
+        process.stdout = stdout_lines
+        with (
+            patch.object(m.subprocess, "Popen", return_value=process) as popen_mock,
+            patch.object(m.uuid, "uuid4", return_value=types.SimpleNamespace(hex="abc")),
+        ):
+            session = m.PowerShellSession()
+            self.assertEqual(session.run("Write-Output first"), (0, "first\n"))
+            self.assertEqual(session.run("throw 'oops'"), (1, "oops\n"))
+            session.close()
+            session.close()
+
+        popen_mock.assert_called_once()
+        self.assertEqual(popen_mock.call_args.args[0][-2:], ["-Command", "-"])
+        self.assertTrue(all(line.isascii() for line in writes))
+        self.assertIn("FromBase64String", writes[1])
+        process.stdin.close.assert_called_once_with()
+        process.wait.assert_called_once_with(timeout=5)
+
+        process.stdout = iter([])
+        process.wait.side_effect = m.subprocess.TimeoutExpired("powershell", 5)
+        with patch.object(m.subprocess, "Popen", return_value=process):
+            session = m.PowerShellSession()
+            with self.assertRaises(OSError):
+                session.run("Write-Output lost")
+            session.close()
+        process.kill.assert_called_once_with()
+
+    def test_run_powershell_script_routes_through_active_session(self) -> None:
+        session = MagicMock()
+        session.run.side_effect = [(0, "done\n"), (1, "Access denied\n"), OSError("pipe closed")]
+        fallback = types.SimpleNamespace(returncode=0, stdout="one-shot\n")
+        with (
+            patch.object(m, "PowerShellSession", return_value=session),
+            patch.object(m.subprocess, "run", return_value=fallback) as run_mock,
+        ):
+            with m.powershell_session():
+                self.assertEqual(m.run_powershell_script(["Write-Output done"]).stdout, "done\n")
+                with self.assertRaises(m.subprocess.CalledProcessError) as ctx:
+                    m.run_powershell_script(["Register-ScheduledTask"])
+                self.assertIs(m.run_powershell_script(["Write-Output again"]), fallback)
+            self.assertIsNone(m._powershell_session)
+
+        self.assertIn("Access denied", ctx.exception.stderr)
+        self.assertTrue(session.run.call_args_list[0].args[0].startswith("$ErrorActionPreference = 'Stop'"))
+        run_mock.assert_called_once()
+        self.assertGreaterEqual(session.close.call_count, 2)
+
+    def test_create_windows_shortcuts_batches_into_one_run_and_reports_failures(self) -> None:
+        failed = types.SimpleNamespace(returncode=0, stdout="FAILED\tC:\\Desktop\\B.lnk\tAccess denied\nnoise\n")
+        with (
+            patch.object(m, "win32com", None),
+            patch.object(m, "run_powershell_script", return_value=failed) as run_mock,
+        ):
+            failures = m.create_windows_shortcuts(
+                [
+                    {"shortcut_path": r"C:\Desktop\A.lnk", "target_path": "cmd.exe"},
+                    {"shortcut_path": r"C:\Desktop\B.lnk", "target_path": "cmd.exe", "arguments": "/k b"},
+                ]
+            )
+            with self.assertRaises(RuntimeError) as ctx:
+                m.create_windows_shortcut(r"C:\Desktop\B.lnk", "cmd.exe")
+            self.assertEqual(m.create_windows_shortcuts([]), {})
+
+        self.assertEqual(failures, {r"C:\Desktop\B.lnk": "Access denied"})
+        self.assertIn("Access denied", str(ctx.exception))
+        self.assertEqual(run_mock.call_count, 2)
+        script = "\n".join(run_mock.call_args_list[0].args[0])
+        self.assertEqual(script.count("New-Object -ComObject WScript.Shell"), 1)
+        self.assertEqual(script.count("$sc.Save()"), 2)
+
+    def test_create_windows_shortcuts_uses_pywin32_in_process_when_available(self) -> None:
+        saved: list[types.SimpleNamespace] = []
+
+        def create_shortcut(path: str) -> types.SimpleNamespace:
+            if path.endswith("Bad.lnk"):
+                raise RuntimeError("com refused")
+            shortcut = types.SimpleNamespace(path=path)
+            shortcut.Save = lambda: saved.append(shortcut)
+            return shortcut
+
+        shell = types.SimpleNamespace(CreateShortcut=create_shortcut)
+        fake_pythoncom = types.SimpleNamespace(CoInitialize=MagicMock(), CoUninitialize=MagicMock())
+        fake_win32com = types.SimpleNamespace(client=types.SimpleNamespace(Dispatch=MagicMock(return_value=shell)))
+        with (
+            patch.object(m, "pythoncom", fake_pythoncom),
+            patch.object(m, "win32com", fake_win32com),
+            patch.object(m, "run_powershell_script") as ps_mock,
+        ):
+            failures = m.create_windows_shortcuts(
+                [
+                    {"shortcut_path": r"C:\Desktop\Good.lnk", "target_path": "cmd.exe", "arguments": "/k good"},
+                    {"shortcut_path": r"C:\Desktop\Bad.lnk", "target_path": "cmd.exe"},
+                ]
+            )
+
+        ps_mock.assert_not_called()
+        self.assertEqual(failures, {r"C:\Desktop\Bad.lnk": "com refused"})
+        self.assertEqual([(sc.path, sc.TargetPath, sc.Arguments) for sc in saved], [(r"C:\Desktop\Good.lnk", "cmd.exe", "/k good")])
+        fake_win32com.client.Dispatch.assert_called_once_with("WScript.Shell")
+        fake_pythoncom.CoUninitialize.assert_called_once_with()
+
+        fake_win32com.client.Dispatch.side_effect = RuntimeError("no COM")
+        with (
+            patch.object(m, "pythoncom", fake_pythoncom),
+            patch.object(m, "win32com", fake_win32com),
+            patch.object(m, "run_powershell_script", return_value=types.SimpleNamespace(stdout="")) as ps_mock,
+        ):
+            self.assertEqual(m.create_windows_shortcuts([{"shortcut_path": "A.lnk", "target_path": "cmd.exe"}]), {})
+        ps_mock.assert_called_once()
+
+    def test_create_cli_desktop_shortcuts_windows_logs_each_result(self) -> None:
+        codex = m._CLI_BY_KEY["codex"]
+        gemini = m._CLI_BY_KEY["gemini"]
+        items = [(codex, r"C:\npm\codex.cmd"), (gemini, r"C:\npm\gemini.cmd")]
+        desktop = r"C:\Users\Admin\Desktop"
+        logs: list[str] = []
+        with (
+            patch.object(m, "is_windows", return_value=True),
+            patch.object(m, "find_desktop_directory", return_value=desktop),
+            patch.object(
+                m,
+                "create_windows_shortcuts",
+                return_value={os.path.join(desktop, f"{gemini.shortcut_name}.lnk"): "denied"},
+            ) as batch_mock,
+        ):
+            m.create_cli_desktop_shortcuts(items, logs.append)
+            m.create_cli_desktop_shortcuts([], logs.append)
+        batch_mock.assert_called_once()
+        self.assertEqual([s["arguments"] for s in batch_mock.call_args.args[0]], ['/k "C:\\npm\\codex.cmd"', '/k "C:\\npm\\gemini.cmd"'])
+        self.assertIn(f"Created desktop shortcut: {os.path.join(desktop, codex.shortcut_name + '.lnk')}", logs)
+        self.assertIn("Shortcut creation failed for Gemini CLI: denied", logs)
+
+        logs.clear()
+        with (
+            patch.object(m, "is_windows", return_value=True),
+            patch.object(m, "find_desktop_directory", return_value=desktop),
+            patch.object(m, "create_windows_shortcuts", side_effect=OSError("no powershell")),
+        ):
+            m.create_cli_desktop_shortcuts(items, logs.append)
+        self.assertEqual(len([line for line in logs if "no powershell" in line]), 2)
+
+    def test_create_cli_desktop_shortcuts_linux_creates_each_and_updates_database(self) -> None:
+        codex = m._CLI_BY_KEY["codex"]
+        gemini = m._CLI_BY_KEY["gemini"]
+        logs: list[str] = []
+        with (
+            patch.object(m, "is_windows", return_value=False),
+            patch.object(m, "is_linux", return_value=True),
+            patch.object(m, "create_cli_desktop_shortcut", side_effect=[None, RuntimeError("boom")]) as single_mock,
+            patch.object(m, "update_desktop_database_for_user") as update_mock,
+        ):
+            m.create_cli_desktop_shortcuts([(codex, "/bin/codex"), (gemini, "/bin/gemini")], logs.append)
+        self.assertEqual(single_mock.call_count, 2)
+        self.assertIn("Shortcut creation failed for Gemini CLI: boom", logs)
+        update_mock.assert_called_once()
+
     def test_create_cli_desktop_shortcut_wraps_with_cmd_exe(self) -> None:
-        spec = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        spec = m._CLI_BY_KEY["codex"]
         logs: list[str] = []
         with (
             patch.object(m, "find_desktop_directory", return_value=r"C:\Users\Admin\Desktop"),
@@ -632,9 +1031,9 @@ class RegistryAndWindowsTests(unittest.TestCase):
     def test_create_linux_desktop_shortcut_writes_desktop_file(self) -> None:
         with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
             path = os.path.join(tmp_dir, "Desktop", "Codex CLI.desktop")
-            chmod_mock = MagicMock()
             with (
-                patch.object(m.os, "chmod", chmod_mock),
+                patch.object(m.os, "chmod") as chmod_mock,
+                patch.object(m.os, "fchmod") as fchmod_mock,
                 patch.object(m, "find_linux_terminal_emulator", return_value=None),
             ):
                 m.create_linux_desktop_shortcut(path, "/usr/local/bin/codex", "Codex CLI")
@@ -645,7 +1044,8 @@ class RegistryAndWindowsTests(unittest.TestCase):
             self.assertIn("[Desktop Entry]", content)
             self.assertIn("Exec=/usr/local/bin/codex", content)
             self.assertIn("Terminal=true", content)
-            chmod_mock.assert_called_once_with(path, 0o755)
+            chmod_mock.assert_not_called()
+            self.assertEqual(fchmod_mock.call_args.args[1], 0o755)
 
     def test_create_linux_desktop_shortcut_uses_terminal_emulator_when_available(self) -> None:
         with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
@@ -663,7 +1063,7 @@ class RegistryAndWindowsTests(unittest.TestCase):
             self.assertNotIn("Terminal=true", content)
 
     def test_create_cli_desktop_shortcut_linux_writes_desktop_file(self) -> None:
-        spec = next(spec for spec in m.CLI_SPECS if spec.key == "ollama")
+        spec = m._CLI_BY_KEY["ollama"]
         logs: list[str] = []
         with (
             patch.object(m, "is_windows", return_value=False),
@@ -687,61 +1087,109 @@ class RegistryAndWindowsTests(unittest.TestCase):
 
 
 class CommandAndDetectionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        m._NPM_PREFIX_CACHE.clear()
+        self.addCleanup(m._NPM_PREFIX_CACHE.clear)
+        env_patch = patch.dict(m.os.environ, clear=False)
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        m.os.environ.pop("NPM_CONFIG_PREFIX", None)
+        m.os.environ.pop("npm_config_prefix", None)
+        m.os.environ.pop("NPM_CONFIG_GLOBALCONFIG", None)
+        m.os.environ["NPM_CONFIG_USERCONFIG"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "missing-npmrc")
+
     def test_run_command_streams_output_and_returns_exit_code(self) -> None:
         logs: list[str] = []
 
         class FakePopen:
             def __init__(self) -> None:
-                self.stdout = iter(["hello\n", "\n", "world\n"])
+                self.stdout = types.SimpleNamespace(fileno=lambda: 99)
 
             def wait(self) -> int:
                 return 7
 
-        with patch.object(m.subprocess, "Popen", return_value=FakePopen()) as popen_mock:
+        chunks = [b"hel", b"lo\r\n\nwor", b"ld\rprogress \xe2\x9c", b"\x93 done", b""]
+        with (
+            patch.object(m.subprocess, "Popen", return_value=FakePopen()) as popen_mock,
+            patch.object(m.os, "read", side_effect=chunks) as read_mock,
+        ):
             rc = m.run_command(["demo", "arg"], logs.append)
 
         self.assertEqual(rc, 7)
-        self.assertEqual(logs[0], "> demo arg")
-        self.assertIn("hello", logs)
-        self.assertIn("world", logs)
-        self.assertNotIn("", logs)
+        self.assertEqual(logs, ["> demo arg", "hello", "world", "progress \u2713 done"])
         self.assertEqual(popen_mock.call_args.args[0], ["demo", "arg"])
+        self.assertNotIn("text", popen_mock.call_args.kwargs)
+        read_mock.assert_called_with(99, 65536)
 
-    def test_command_exists_handles_success_and_oserror(self) -> None:
-        ok = types.SimpleNamespace(returncode=0)
-        with patch.object(m.subprocess, "run", return_value=ok):
-            self.assertTrue(m.command_exists("npm"))
-        with patch.object(m.subprocess, "run", side_effect=OSError("bad")):
-            self.assertFalse(m.command_exists("npm"))
-
-    def test_command_exists_and_where_all_use_linux_which(self) -> None:
-        ok = types.SimpleNamespace(returncode=0)
-        found = types.SimpleNamespace(returncode=0, stdout="/usr/bin/codex\n/usr/local/bin/codex\n")
+    def test_command_exists_checks_path_in_process(self) -> None:
         with (
-            patch.object(m, "is_windows", return_value=False),
-            patch.object(m.subprocess, "run", return_value=ok) as run_mock,
+            patch.object(m.shutil, "which", return_value="/usr/bin/npm") as which_mock,
+            patch.object(m.subprocess, "run") as run_mock,
         ):
-            self.assertTrue(m.command_exists("codex"))
-        self.assertEqual(run_mock.call_args.args[0], ["which", "codex"])
+            self.assertTrue(m.command_exists("npm"))
+            self.assertTrue(m.command_exists("npm", env={"PATH": "/opt/node/bin"}))
+        run_mock.assert_not_called()
+        self.assertEqual(which_mock.call_args_list[0].kwargs, {"path": None})
+        self.assertEqual(which_mock.call_args_list[1].kwargs, {"path": "/opt/node/bin"})
+        with patch.object(m.shutil, "which", return_value=None):
+            self.assertFalse(m.command_exists("npm"))
 
-        with (
-            patch.object(m, "is_windows", return_value=False),
-            patch.object(m.subprocess, "run", return_value=found) as run_mock,
-        ):
-            self.assertEqual(m.where_all("codex"), ["/usr/bin/codex", "/usr/local/bin/codex"])
-        self.assertEqual(run_mock.call_args.args[0], ["which", "-a", "codex"])
+    def test_list_dir_names_reuses_listing_until_directory_mtime_changes(self) -> None:
+        self.addCleanup(m._DIR_LISTING_CACHE.clear)
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            with open(os.path.join(tmp_dir, "node"), "w", encoding="utf-8") as f:
+                f.write("")
+            old_ns = time.time_ns() - 60 * 1_000_000_000
+            os.utime(tmp_dir, ns=(old_ns, old_ns))
+
+            first = m._list_dir_names(tmp_dir)
+            with patch.object(m.os, "listdir", side_effect=AssertionError("listed twice")):
+                self.assertEqual(m._list_dir_names(tmp_dir), first)
+
+            with open(os.path.join(tmp_dir, "npm"), "w", encoding="utf-8") as f:
+                f.write("")
+            os.utime(tmp_dir, ns=(old_ns + 1_000_000_000, old_ns + 1_000_000_000))
+            self.assertIn(os.path.normcase("npm"), m._list_dir_names(tmp_dir))
+
+            # A freshly modified directory is listed every time: its mtime may not move again.
+            os.utime(tmp_dir)
+            m._list_dir_names(tmp_dir)
+            with patch.object(m.os, "listdir", return_value=["node"]) as listdir_mock:
+                m._list_dir_names(tmp_dir)
+            listdir_mock.assert_called_once()
+
+    def test_where_all_lists_executables_in_path_order_without_subprocess(self) -> None:
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            first = os.path.join(tmp_dir, "first")
+            second = os.path.join(tmp_dir, "second")
+            os.makedirs(first)
+            os.makedirs(second)
+            for path, mode in (
+                (os.path.join(first, "codex"), 0o755),
+                (os.path.join(second, "codex"), 0o755),
+                (os.path.join(second, "codex.cmd"), 0o644),
+            ):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("")
+                os.chmod(path, mode)
+            env = {"PATH": os.pathsep.join([first, os.path.join(tmp_dir, "missing"), second, first]), "PATHEXT": ".EXE;.CMD"}
 
-    def test_where_all_parses_output_and_handles_nonzero(self) -> None:
-        found = types.SimpleNamespace(returncode=0, stdout="A\r\n\r\nB\n")
-        with patch.object(m.subprocess, "run", return_value=found):
-            self.assertEqual(m.where_all("codex"), ["A", "B"])
-        miss = types.SimpleNamespace(returncode=1, stdout="")
-        with patch.object(m.subprocess, "run", return_value=miss):
-            self.assertEqual(m.where_all("codex"), [])
+            with (
+                patch.object(m, "is_windows", return_value=False),
+                patch.object(m.subprocess, "run") as run_mock,
+            ):
+                self.assertEqual(
+                    m.where_all("codex", env=env),
+                    [os.path.join(first, "codex"), os.path.join(second, "codex")],
+                )
+                self.assertEqual(m.where_all("missing-tool", env=env), [])
+            run_mock.assert_not_called()
 
-    def test_where_all_handles_oserror(self) -> None:
-        with patch.object(m.subprocess, "run", side_effect=OSError("where missing")):
-            self.assertEqual(m.where_all("codex"), [])
+            with patch.object(m, "is_windows", return_value=True):
+                self.assertEqual(
+                    m.where_all("codex", env=env),
+                    [os.path.join(first, "codex"), os.path.join(second, "codex"), os.path.join(second, "codex.cmd")],
+                )
 
     def test_find_winget_delegates_to_shutil_which(self) -> None:
         with patch.object(m.shutil, "which", return_value=r"C:\Windows\System32\winget.exe") as which_mock:
@@ -749,9 +1197,43 @@ class CommandAndDetectionTests(unittest.TestCase):
         self.assertEqual(result, r"C:\Windows\System32\winget.exe")
         which_mock.assert_called_once_with("winget")
 
+    def test_scan_path_for_prefers_name_order_and_skips_non_executables(self) -> None:
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            first = os.path.join(tmp_dir, "first")
+            second = os.path.join(tmp_dir, "second")
+            os.makedirs(first)
+            os.makedirs(second)
+            for path in (os.path.join(first, "tool-b"), os.path.join(second, "tool-a")):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("")
+                os.chmod(path, 0o755)
+            os.makedirs(os.path.join(first, "tool-dir"))
+            path_value = os.pathsep.join([os.path.join(tmp_dir, "missing"), first, second])
+            with (
+                patch.dict(m.os.environ, {"PATH": path_value}, clear=False),
+                patch.object(m.os, "listdir", wraps=os.listdir) as listdir_mock,
+            ):
+                self.assertEqual(m._scan_path_for(("tool-a", "tool-b")), os.path.join(second, "tool-a"))
+                # The missing directory fails its stat and is never listed.
+                self.assertEqual(listdir_mock.call_count, 2)
+                self.assertEqual(m._scan_path_for(("tool-dir", "tool-b")), os.path.join(first, "tool-b"))
+                self.assertIsNone(m._scan_path_for(("tool-c",)))
+
+    def test_scan_path_for_expands_pathext_before_bare_name_on_windows(self) -> None:
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            for file_name in ("npm", "npm.cmd"):
+                with open(os.path.join(tmp_dir, file_name), "w", encoding="utf-8") as f:
+                    f.write("")
+            with (
+                patch.object(m, "_IS_WINDOWS", True),
+                patch.dict(m.os.environ, {"PATH": tmp_dir, "PATHEXT": ".EXE;.CMD"}, clear=False),
+            ):
+                self.assertEqual(m._command_file_names("npm", m.os.environ), ("npm.exe", "npm.cmd", "npm"))
+                self.assertEqual(m._scan_path_for(("npm",)), os.path.join(tmp_dir, "npm.cmd"))
+
     def test_find_uv_and_python_launcher_and_pip3_return_none_when_missing(self) -> None:
         with (
-            patch.object(m.shutil, "which", return_value=None),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.object(m.os.path, "isfile", return_value=False),
         ):
             self.assertIsNone(m.find_uv())
@@ -760,13 +1242,13 @@ class CommandAndDetectionTests(unittest.TestCase):
             self.assertIsNone(m.find_ollama())
 
     def test_find_uv_and_python_launcher_return_detected_paths(self) -> None:
-        with patch.object(m.shutil, "which", side_effect=[r"C:\Tools\uv.exe", r"C:\Windows\py.exe"]):
+        with patch.object(m, "_scan_path_for", side_effect=[r"C:\Tools\uv.exe", r"C:\Windows\py.exe"]):
             self.assertEqual(m.find_uv(), r"C:\Tools\uv.exe")
             self.assertEqual(m.find_python_launcher(), r"C:\Windows\py.exe")
 
-    def test_find_ollama_prefers_shutil_which_and_known_locations(self) -> None:
+    def test_find_ollama_prefers_path_scan_and_known_locations(self) -> None:
         with (
-            patch.object(m.shutil, "which", side_effect=[r"C:\Users\Admin\AppData\Local\Programs\Ollama\ollama.exe"]),
+            patch.object(m, "_scan_path_for", return_value=r"C:\Users\Admin\AppData\Local\Programs\Ollama\ollama.exe"),
             patch.object(m.os.path, "isfile") as isfile_mock,
         ):
             self.assertEqual(m.find_ollama(), r"C:\Users\Admin\AppData\Local\Programs\Ollama\ollama.exe")
@@ -774,7 +1256,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
         expected = r"C:\Users\Admin\AppData\Local\Programs\Ollama\ollama.exe"
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.dict(
                 m.os.environ,
                 {
@@ -790,26 +1272,31 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_find_ollama_uses_linux_known_paths(self) -> None:
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.object(m, "is_linux", return_value=True),
             patch.object(m.os.path, "isfile", side_effect=lambda p: p == "/usr/local/bin/ollama"),
         ):
             self.assertEqual(m.find_ollama(), "/usr/local/bin/ollama")
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.object(m, "is_linux", return_value=True),
             patch.object(m.os.path, "isfile", return_value=False),
         ):
             self.assertIsNone(m.find_ollama())
 
-    def test_find_pip3_delegates_to_shutil_which(self) -> None:
-        with patch.object(m.shutil, "which", return_value=r"C:\Users\Admin\AppData\Roaming\Python\Scripts\pip3.exe"):
+    def test_find_pip3_delegates_to_path_scan(self) -> None:
+        with patch.object(m, "_scan_path_for", return_value=r"C:\Users\Admin\AppData\Roaming\Python\Scripts\pip3.exe"):
             self.assertEqual(m.find_pip3(), r"C:\Users\Admin\AppData\Roaming\Python\Scripts\pip3.exe")
 
     def test_get_python_version_parses_and_handles_failures(self) -> None:
+        self.addCleanup(m._PYTHON_VERSION_CACHE.clear)
+        m._PYTHON_VERSION_CACHE.clear()
         ok = types.SimpleNamespace(returncode=0, stdout="3.14.2\n")
-        with patch.object(m.subprocess, "run", return_value=ok):
+        with patch.object(m.subprocess, "run", return_value=ok) as run_mock:
             self.assertEqual(m.get_python_version(["py", "-3.14"]), (3, 14, 2))
+            self.assertEqual(m.get_python_version(["py", "-3.14"]), (3, 14, 2))
+        run_mock.assert_called_once()
+        m._PYTHON_VERSION_CACHE.clear()
 
         bad = types.SimpleNamespace(returncode=1, stdout="")
         with patch.object(m.subprocess, "run", return_value=bad):
@@ -862,9 +1349,10 @@ class CommandAndDetectionTests(unittest.TestCase):
 
         with (
             patch.object(m.shutil, "which", side_effect=fake_which),
-            patch.object(m, "get_python_version", side_effect=lambda args: (3, 14, 5) if args == [target] else None),
+            patch.object(m, "get_python_version", return_value=None) as version_mock,
         ):
             self.assertEqual(m.find_python_314_command(), [target])
+        version_mock.assert_not_called()
 
     def test_find_python_314_command_falls_back_to_generic_python_and_none(self) -> None:
         generic = r"C:\Python\python.exe"
@@ -888,9 +1376,9 @@ class CommandAndDetectionTests(unittest.TestCase):
         ):
             self.assertIsNone(m.find_python_314_command())
 
-    def test_find_node_prefers_shutil_which(self) -> None:
+    def test_find_node_prefers_path_scan(self) -> None:
         with (
-            patch.object(m.shutil, "which", side_effect=[r"C:\Program Files\nodejs\node.exe"]),
+            patch.object(m, "_scan_path_for", return_value=r"C:\Program Files\nodejs\node.exe"),
             patch.object(m.os.path, "isfile") as isfile_mock,
         ):
             result = m.find_node()
@@ -899,7 +1387,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_find_node_fallback_returns_none_without_local_appdata(self) -> None:
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.dict(
                 m.os.environ,
                 {"ProgramFiles": r"C:\Program Files", "ProgramFiles(x86)": r"C:\Program Files (x86)"},
@@ -912,7 +1400,7 @@ class CommandAndDetectionTests(unittest.TestCase):
     def test_find_node_fallback_uses_local_appdata_candidate(self) -> None:
         expected = r"C:\Users\Admin\AppData\Local\Programs\nodejs\node.exe"
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.dict(
                 m.os.environ,
                 {
@@ -926,9 +1414,9 @@ class CommandAndDetectionTests(unittest.TestCase):
         ):
             self.assertEqual(m.find_node(), expected)
 
-    def test_find_npm_prefers_shutil_which(self) -> None:
+    def test_find_npm_prefers_path_scan(self) -> None:
         with (
-            patch.object(m.shutil, "which", side_effect=[r"C:\Program Files\nodejs\npm.cmd"]),
+            patch.object(m, "_scan_path_for", return_value=r"C:\Program Files\nodejs\npm.cmd"),
             patch.object(m.os.path, "isfile") as isfile_mock,
         ):
             result = m.find_npm()
@@ -938,7 +1426,7 @@ class CommandAndDetectionTests(unittest.TestCase):
     def test_find_npm_falls_back_to_known_install_locations(self) -> None:
         expected = r"C:\Users\Admin\AppData\Local\Programs\nodejs\npm.cmd"
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.dict(
                 m.os.environ,
                 {
@@ -955,7 +1443,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_find_npm_fallback_returns_none_without_local_appdata(self) -> None:
         with (
-            patch.object(m.shutil, "which", side_effect=[None, None]),
+            patch.object(m, "_scan_path_for", return_value=None),
             patch.dict(
                 m.os.environ,
                 {"ProgramFiles": r"C:\Program Files", "ProgramFiles(x86)": r"C:\Program Files (x86)"},
@@ -965,6 +1453,26 @@ class CommandAndDetectionTests(unittest.TestCase):
         ):
             self.assertIsNone(m.find_npm())
 
+    def test_discover_environment_runs_probes_once_and_caches(self) -> None:
+        self.addCleanup(m.reset_discovery)
+        m.reset_discovery()
+        with (
+            patch.object(m, "find_npm", return_value=r"C:\Program Files\nodejs\npm.cmd"),
+            patch.object(m, "find_ollama", side_effect=RuntimeError("probe failed")),
+            patch.object(m, "find_python_314_command") as python_314_mock,
+            patch.object(m, "get_cli_bin_dirs", return_value=[r"C:\npm"]),
+            patch.object(m, "get_python_cli_bin_dirs", return_value=[r"C:\py", r"C:\npm"]) as python_dirs_mock,
+            patch.object(m, "get_ollama_cli_bin_dirs", return_value=[]),
+        ):
+            result = m.discover_environment()
+            self.assertIs(m.discover_environment(), result)
+            refreshed = m.discover_environment(refresh=True)
+
+        self.assertEqual(result, {"ollama": None, "cli_detection_dirs": [r"C:\npm", r"C:\py"]})
+        self.assertIsNot(refreshed, result)
+        self.assertEqual(python_dirs_mock.call_count, 2)
+        python_314_mock.assert_not_called()
+
     def test_get_npm_global_prefix_uses_fallback_command(self) -> None:
         responses = [
             types.SimpleNamespace(returncode=1, stdout=""),
@@ -996,12 +1504,69 @@ class CommandAndDetectionTests(unittest.TestCase):
             patch.object(m.subprocess, "run", side_effect=responses) as run_mock,
             patch.dict(m.os.environ, {"PATH": r"C:\Windows\System32"}, clear=False),
             patch.object(m.os.path, "isdir", return_value=True),
+            patch.object(m, "npm_prefix_from_npmrc", return_value=None),
         ):
             result = m.get_npm_global_prefix(r"C:\Program Files\nodejs\npm.cmd", lambda _msg: None)
         self.assertEqual(result, r"C:\Users\Admin\AppData\Roaming\npm")
         env = run_mock.call_args.kwargs["env"]
         self.assertTrue(env["PATH"].startswith(r"C:\Program Files\nodejs;"))
 
+    def test_get_npm_global_prefix_caches_success_and_honours_env_prefix(self) -> None:
+        responses = [types.SimpleNamespace(returncode=0, stdout=r"C:\Users\Admin\AppData\Roaming\npm" + "\n")]
+        with (
+            patch.object(m.subprocess, "run", side_effect=responses) as run_mock,
+            patch.object(m.os.path, "isdir", return_value=True),
+        ):
+            first = m.get_npm_global_prefix("npm.cmd", lambda _msg: None)
+            second = m.get_npm_global_prefix("npm.cmd", lambda _msg: None)
+        self.assertEqual(first, r"C:\Users\Admin\AppData\Roaming\npm")
+        self.assertEqual(second, first)
+        run_mock.assert_called_once()
+
+        with tempfile.TemporaryDirectory() as env_prefix:
+            with (
+                patch.dict(m.os.environ, {"NPM_CONFIG_PREFIX": env_prefix}, clear=False),
+                patch.object(m.subprocess, "run") as run_mock,
+            ):
+                self.assertEqual(m.get_npm_global_prefix("/usr/bin/npm", lambda _msg: None), env_prefix)
+            run_mock.assert_not_called()
+
+    def test_get_npm_global_prefix_reads_npmrc_files_without_subprocess(self) -> None:
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            user_prefix = os.path.join(tmp_dir, "user-prefix")
+            os.makedirs(user_prefix)
+            user_rc = os.path.join(tmp_dir, "user.npmrc")
+            with open(user_rc, "w", encoding="utf-8") as f:
+                f.write("; comment\nprefix=${ITC_TEST_ROOT}/user-prefix\n")
+            m.os.environ["NPM_CONFIG_USERCONFIG"] = user_rc
+            m.os.environ["ITC_TEST_ROOT"] = tmp_dir
+            with patch.object(m.subprocess, "run") as run_mock:
+                self.assertEqual(m.get_npm_global_prefix("npm.cmd", lambda _msg: None), tmp_dir + "/user-prefix")
+            run_mock.assert_not_called()
+
+            # An undefined ${VAR} means npm's answer is unknown.
+            m.os.environ.pop("ITC_TEST_ROOT")
+            self.assertIsNone(m.npm_prefix_from_npmrc("npm.cmd"))
+
+    def test_npm_prefix_from_npmrc_uses_windows_builtin_npmrc_unless_global_rc_exists(self) -> None:
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            node_dir = os.path.join(tmp_dir, "nodejs")
+            os.makedirs(os.path.join(node_dir, "node_modules", "npm"))
+            with open(os.path.join(node_dir, "node_modules", "npm", "npmrc"), "w", encoding="utf-8") as f:
+                f.write("prefix=${APPDATA}/npm\n")
+            m.os.environ["APPDATA"] = tmp_dir
+            npm_exe = os.path.join(node_dir, "npm.cmd")
+            expected = os.path.join(tmp_dir, "npm")
+
+            with patch.object(m, "_IS_WINDOWS", True):
+                self.assertEqual(m.npm_prefix_from_npmrc(npm_exe), tmp_dir + "/npm")
+                os.makedirs(os.path.join(expected, "etc"))
+                with open(os.path.join(expected, "etc", "npmrc"), "w", encoding="utf-8") as f:
+                    f.write("prefix=D:/elsewhere\n")
+                self.assertIsNone(m.npm_prefix_from_npmrc(npm_exe))
+            with patch.object(m, "_IS_WINDOWS", False):
+                self.assertIsNone(m.npm_prefix_from_npmrc(npm_exe))
+
     def test_get_npm_global_prefix_logs_oserror(self) -> None:
         logs: list[str] = []
         with patch.object(m.subprocess, "run", side_effect=OSError("boom")):
@@ -1045,6 +1610,13 @@ class CommandAndDetectionTests(unittest.TestCase):
             dirs = m.get_cli_bin_dirs("npm.cmd", lambda _msg: None)
         self.assertEqual(dirs, [r"C:\Program Files\nodejs", r"C:\Users\Admin\AppData\Roaming\npm"])
 
+    def test_dedup_existing_dirs_probes_each_directory_once(self) -> None:
+        isdir = MagicMock(side_effect=lambda p: p == "/opt/npm")
+        with patch.object(m.os.path, "isdir", isdir):
+            dirs = m._dedup_existing_dirs(["/missing", "/opt/npm", "", "/opt/npm/", "/missing", "/opt/./npm"])
+        self.assertEqual(dirs, ["/opt/npm"])
+        self.assertEqual([c.args[0] for c in isdir.call_args_list], ["/missing", "/opt/npm"])
+
     def test_get_cli_bin_dirs_linux_uses_standard_bins_and_prefix_bin_or_prefix(self) -> None:
         with (
             patch.object(m, "is_linux", return_value=True),
@@ -1075,31 +1647,33 @@ class CommandAndDetectionTests(unittest.TestCase):
             self.assertEqual(m.get_ollama_cli_bin_dirs(lambda _msg: None), ["/usr/local/bin"])
 
     def test_get_python_cli_bin_dirs_merges_and_dedupes(self) -> None:
-        home = r"C:\Users\Admin"
-        appdata = r"C:\Users\Admin\AppData\Roaming"
-        local_app = r"C:\Users\Admin\AppData\Local"
-        home_bin = os.path.join(home, ".local", "bin")
-        roaming_scripts = os.path.join(appdata, "Python", "Python314", "Scripts")
-        local_scripts = os.path.join(local_app, "Programs", "Python", "Python314", "Scripts")
-
-        def fake_glob(pattern: str) -> list[str]:
-            if pattern == os.path.join(appdata, "Python", "Python*", "Scripts"):
-                return [roaming_scripts, roaming_scripts]
-            if pattern == os.path.join(local_app, "Programs", "Python", "Python*", "Scripts"):
-                return [local_scripts]
-            return []
-        self.assertEqual(fake_glob("unmatched"), [])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            home = os.path.join(tmp_dir, "home")
+            appdata = os.path.join(tmp_dir, "Roaming")
+            local_app = os.path.join(tmp_dir, "Local")
+            home_bin = os.path.join(home, ".local", "bin")
+            roaming_scripts = os.path.join(appdata, "Python", "Python314", "Scripts")
+            local_scripts = os.path.join(local_app, "Programs", "Python", "Python314", "Scripts")
+            for path in (home_bin, roaming_scripts, local_scripts):
+                os.makedirs(path)
+            os.makedirs(os.path.join(appdata, "Python", "Python313"))  # no Scripts dir
+            os.makedirs(os.path.join(appdata, "Python", "pip", "Scripts"))
+            with open(os.path.join(appdata, "Python", "Python-notes.txt"), "w", encoding="utf-8"):
+                pass
 
-        existing = {home_bin, roaming_scripts, local_scripts}
-        with (
-            patch.object(m.os.path, "expanduser", return_value=home),
-            patch.dict(m.os.environ, {"AppData": appdata, "LocalAppData": local_app}, clear=False),
-            patch.object(m.glob, "glob", side_effect=fake_glob),
-            patch.object(m.os.path, "isdir", side_effect=lambda p: p in existing),
-        ):
-            dirs = m.get_python_cli_bin_dirs(lambda _msg: None)
+            with (
+                patch.object(m.os.path, "expanduser", return_value=home),
+                patch.dict(m.os.environ, {"AppData": appdata, "LocalAppData": local_app}, clear=False),
+            ):
+                dirs = m.get_python_cli_bin_dirs(lambda _msg: None)
+                with patch.dict(m.os.environ, {"AppData": os.path.join(local_app, "Programs")}, clear=False):
+                    duplicated = m.get_python_cli_bin_dirs(lambda _msg: None)
 
         self.assertEqual(dirs, [home_bin, roaming_scripts, local_scripts])
+        self.assertEqual(duplicated, [home_bin, local_scripts])
+
+    def test_python_scripts_under_returns_empty_for_missing_root(self) -> None:
+        self.assertEqual(m._python_scripts_under(os.path.join(tempfile.gettempdir(), "itc-missing-root")), [])
 
     def test_get_ollama_cli_bin_dirs_merges_and_dedupes(self) -> None:
         local_app = r"C:\Users\Admin\AppData\Local"
@@ -1126,7 +1700,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_try_install_package_candidates_retries_until_success(self) -> None:
         logs: list[str] = []
-        qwen = next(spec for spec in m.CLI_SPECS if spec.key == "qwen")
+        qwen = m._CLI_BY_KEY["qwen"]
         with patch.object(m, "npm_install_global", side_effect=[2, 0]) as npm_mock:
             success, pkg = m.try_install_package_candidates("npm.cmd", qwen, logs.append)
         self.assertTrue(success)
@@ -1136,6 +1710,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_npm_install_global_delegates_to_run_command(self) -> None:
         with (
+            patch.object(m, "_IS_LINUX", False),
             patch.object(m, "run_command", return_value=123) as run_mock,
             patch.dict(m.os.environ, {"PATH": r"C:\Windows\System32"}, clear=False),
         ):
@@ -1169,6 +1744,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_npm_uninstall_global_delegates_to_run_command(self) -> None:
         with (
+            patch.object(m, "_IS_LINUX", False),
             patch.object(m, "run_command", return_value=0) as run_mock,
             patch.dict(m.os.environ, {"PATH": r"C:\Windows\System32"}, clear=False),
         ):
@@ -1191,7 +1767,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_try_uninstall_package_candidates_returns_error_when_uninstalls_fail(self) -> None:
         logs: list[str] = []
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
         with patch.object(m, "npm_uninstall_global", return_value=11):
             ok, err = m.try_uninstall_package_candidates("npm.cmd", codex, logs.append)
         self.assertFalse(ok)
@@ -1212,7 +1788,7 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_try_install_package_candidates_returns_last_error(self) -> None:
         logs: list[str] = []
-        claude = next(spec for spec in m.CLI_SPECS if spec.key == "claude")
+        claude = m._CLI_BY_KEY["claude"]
         with patch.object(m, "npm_install_global", return_value=9):
             success, err = m.try_install_package_candidates("npm.cmd", claude, logs.append)
         self.assertFalse(success)
@@ -1221,10 +1797,11 @@ class CommandAndDetectionTests(unittest.TestCase):
 
     def test_try_install_package_candidates_retries_transient_windows_lock_error(self) -> None:
         logs: list[str] = []
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
         with (
             patch.object(m, "npm_install_global", side_effect=[4294963214, 0]) as npm_mock,
             patch.object(m.time, "sleep") as sleep_mock,
+            patch.object(m.random, "uniform", return_value=1.0),
         ):
             success, pkg = m.try_install_package_candidates("npm.cmd", codex, logs.append)
 
@@ -1234,6 +1811,40 @@ class CommandAndDetectionTests(unittest.TestCase):
         sleep_mock.assert_called_once_with(m.NPM_INSTALL_RETRY_DELAY_SECONDS)
         self.assertTrue(any("Transient npm install failure detected" in line for line in logs))
 
+    def test_try_bulk_install_npm_runs_one_npm_process_for_first_candidates(self) -> None:
+        logs: list[str] = []
+        specs = [spec for spec in m.CLI_SPECS if spec.key in ("claude", "codex")]
+        with patch.object(m, "npm_install_global_batch", return_value=0) as batch_mock:
+            self.assertTrue(m.try_bulk_install_npm("npm.cmd", specs, logs.append))
+        batch_mock.assert_called_once_with("npm.cmd", ["@anthropic-ai/claude-code", "@openai/codex"], logs.append)
+
+        with patch.object(m, "npm_install_global_batch", return_value=1):
+            self.assertFalse(m.try_bulk_install_npm("npm.cmd", specs, logs.append))
+        self.assertTrue(any("installing packages one at a time" in line for line in logs))
+
+        with patch.object(m, "npm_install_global_batch") as batch_mock:
+            self.assertFalse(m.try_bulk_install_npm("npm.cmd", specs[:1], logs.append))
+        batch_mock.assert_not_called()
+
+    def test_npm_install_global_batch_passes_all_packages_with_quiet_flags(self) -> None:
+        with (
+            patch.object(m, "_IS_LINUX", False),
+            patch.object(m, "run_command", return_value=0) as run_mock,
+        ):
+            m.npm_install_global_batch("npm.cmd", ["a", "b"], lambda _msg: None)
+        args = run_mock.call_args.args[0]
+        self.assertEqual(args, ["npm.cmd", *m.NPM_QUIET_FLAGS, "install", "-g", "a", "b"])
+        self.assertEqual(run_mock.call_args.kwargs["env"]["npm_config_update_notifier"], "false")
+
+    def test_npm_retry_delay_seconds_doubles_with_jitter_and_caps(self) -> None:
+        with patch.object(m.random, "uniform", return_value=1.0):
+            self.assertEqual(m.npm_retry_delay_seconds(1), m.NPM_INSTALL_RETRY_DELAY_SECONDS)
+            self.assertEqual(m.npm_retry_delay_seconds(2), m.NPM_INSTALL_RETRY_DELAY_SECONDS * 2)
+            self.assertEqual(m.npm_retry_delay_seconds(10), m.NPM_INSTALL_MAX_BACKOFF_SECONDS)
+        with patch.object(m.random, "uniform", return_value=0.5) as uniform_mock:
+            self.assertEqual(m.npm_retry_delay_seconds(1), m.NPM_INSTALL_RETRY_DELAY_SECONDS * 0.5)
+        uniform_mock.assert_called_once_with(0.5, 1.5)
+
     def test_resolve_command_path_prefers_cmd(self) -> None:
         with patch.object(
             m,
@@ -1277,10 +1888,12 @@ class CommandAndDetectionTests(unittest.TestCase):
         target = r"C:\Users\Admin\AppData\Roaming\npm\grok.cmd"
         with (
             patch.object(m, "where_all", return_value=[]),
-            patch.object(m.os.path, "isfile", side_effect=lambda p: p == target),
+            patch.object(m, "_list_dir_names", return_value=frozenset({m.os.path.normcase("grok.cmd")})),
+            patch.object(m.os.path, "isfile", side_effect=lambda p: p == target) as isfile_mock,
         ):
             result = m.resolve_command_path(("grok",), [r"C:\Users\Admin\AppData\Roaming\npm"])
         self.assertEqual(result, target)
+        isfile_mock.assert_called_once_with(target)
 
     def test_resolve_command_path_falls_back_to_direct_file_without_extension(self) -> None:
         direct = r"C:\Users\Admin\AppData\Roaming\npm\grok"
@@ -1288,6 +1901,7 @@ class CommandAndDetectionTests(unittest.TestCase):
             return path == direct
         with (
             patch.object(m, "where_all", return_value=[]),
+            patch.object(m, "_list_dir_names", return_value=frozenset({"grok"})),
             patch.object(m.os.path, "isfile", side_effect=fake_isfile),
         ):
             result = m.resolve_command_path(("grok",), [r"C:\Users\Admin\AppData\Roaming\npm"])
@@ -1356,7 +1970,7 @@ class CommandAndDetectionTests(unittest.TestCase):
             self.assertTrue(m.is_gui_app_installed(spec))
 
     def test_install_gui_app_winget_uses_source_when_configured(self) -> None:
-        spec = next(item for item in m.GUI_APP_SPECS if item.key == "codex_app")
+        spec = m._GUI_APP_BY_KEY["codex_app"]
         with (
             patch.object(m, "find_winget", return_value="winget.exe"),
             patch.object(m, "run_command", return_value=0) as run_mock,
@@ -1368,7 +1982,7 @@ class CommandAndDetectionTests(unittest.TestCase):
         self.assertIn("msstore", args)
 
     def test_uninstall_gui_app_returns_true_when_no_longer_detected(self) -> None:
-        spec = next(item for item in m.GUI_APP_SPECS if item.key == "chatgpt_app")
+        spec = m._GUI_APP_BY_KEY["chatgpt_app"]
         with (
             patch.object(m, "is_windows", return_value=True),
             patch.object(m, "_uninstall_gui_app_winget", return_value=False),
@@ -1417,9 +2031,16 @@ class AutoUpdateSchedulerTests(unittest.TestCase):
     def test_ensure_cli_auto_update_task_writes_files_and_registers_hidden_task(self) -> None:
         logs: list[str] = []
         with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            registered: list[str] = []
+
+            def fake_run(argv, **_kwargs):
+                with open(argv[-1], "r", encoding="utf-8-sig") as f:
+                    registered.append(f.read())
+                return types.SimpleNamespace(returncode=0, stdout="")
+
             with (
                 patch.object(m, "get_app_support_directory", return_value=tmp_dir),
-                patch.object(m.subprocess, "run") as run_mock,
+                patch.object(m.subprocess, "run", side_effect=fake_run) as run_mock,
             ):
                 merged = m.ensure_cli_auto_update_task(
                     r"C:\Program Files\nodejs\npm.cmd",
@@ -1440,8 +2061,9 @@ class AutoUpdateSchedulerTests(unittest.TestCase):
             self.assertIn("@packages", script_text)
 
             run_args = run_mock.call_args.args[0]
-            task_command = run_args[-1]
-            self.assertEqual(run_args[:4], ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass"])
+            task_command = registered[0]
+            self.assertEqual(run_args[:5], ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File"])
+            self.assertIn("$ErrorActionPreference = 'Stop'", task_command)
             self.assertIn("New-ScheduledTaskTrigger -AtStartup", task_command)
             self.assertIn("New-ScheduledTaskTrigger -AtLogOn", task_command)
             self.assertIn("New-ScheduledTaskTrigger -Daily -At '3:00AM'", task_command)
@@ -1553,6 +2175,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
     def test_ensure_node_via_winget_raises_when_install_command_fails(self) -> None:
         with (
+            patch.object(m, "_IS_LINUX", False),
             patch.object(m, "find_winget", return_value="winget.exe"),
             patch.object(m, "find_node", return_value=None),
             patch.object(m, "find_npm", return_value=None),
@@ -1562,8 +2185,43 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
                 m.ensure_node_via_winget(lambda _msg: None)
         self.assertIn("exit code 5", str(ctx.exception))
 
+    def test_ensure_node_via_winget_accepts_already_installed_exit_code(self) -> None:
+        with (
+            patch.object(m, "_IS_LINUX", False),
+            patch.object(m, "find_winget", return_value="winget.exe"),
+            patch.object(m, "find_node", side_effect=[None, r"C:\Program Files\nodejs\node.exe"]),
+            patch.object(m, "find_npm", side_effect=[None, r"C:\Program Files\nodejs\npm.cmd"]),
+            patch.object(m, "run_command", return_value=m.WINGET_PACKAGE_ALREADY_INSTALLED),
+        ):
+            m.ensure_node_via_winget(lambda _msg: None)
+        self.assertTrue(m.is_winget_already_installed_exit_code(m.WINGET_INSTALL_ALREADY_INSTALLED - (1 << 32)))
+        self.assertFalse(m.is_winget_already_installed_exit_code(5))
+
+    def test_ensure_node_via_winget_uses_install_dir_after_install_and_extends_path(self) -> None:
+        logs: list[str] = []
+        with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
+            node_dir = os.path.join(tmp_dir, "nodejs")
+            os.makedirs(node_dir)
+            for name in ("node.exe", "npm.cmd"):
+                with open(os.path.join(node_dir, name), "w", encoding="utf-8") as f:
+                    f.write("")
+            with (
+                patch.object(m, "_IS_LINUX", False),
+                patch.dict(m.os.environ, {"ProgramFiles": tmp_dir, "PATH": "base"}, clear=False),
+                patch.object(m, "find_winget", return_value="winget.exe"),
+                patch.object(m, "find_node", side_effect=[None]) as find_node_mock,
+                patch.object(m, "find_npm", side_effect=[None]),
+                patch.object(m, "run_command", return_value=0),
+            ):
+                m.ensure_node_via_winget(logs.append)
+                self.assertEqual(m.os.environ["PATH"], "base" + os.pathsep + node_dir)
+
+        self.assertEqual(find_node_mock.call_count, 1)
+        self.assertIn(f"npm is available: {os.path.join(node_dir, 'npm.cmd')}", logs)
+
     def test_ensure_node_via_winget_raises_when_binaries_still_missing_after_install(self) -> None:
         with (
+            patch.object(m, "_IS_LINUX", False),
             patch.object(m, "find_winget", return_value="winget.exe"),
             patch.object(m, "find_node", side_effect=[None, None]),
             patch.object(m, "find_npm", side_effect=[None, None]),
@@ -1577,7 +2235,11 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
         with patch.object(m, "linux_package_manager_name", return_value="debian"):
             self.assertEqual(
                 m.linux_package_manager_install_commands(["nodejs", "npm"]),
-                [["apt-get", "update"], ["apt-get", "install", "-y", "nodejs", "npm"]],
+                [["sh", "-c", "apt-get update && apt-get install -y nodejs npm"]],
+            )
+            self.assertEqual(
+                m.linux_package_manager_install_commands(["odd name;rm"]),
+                [["sh", "-c", "apt-get update && apt-get install -y 'odd name;rm'"]],
             )
         with patch.object(m, "linux_package_manager_name", return_value="fedora"):
             self.assertEqual(
@@ -1755,6 +2417,31 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
         self.assertTrue(any("trying winget upgrade" in line.lower() for line in logs))
         self.assertTrue(any("Using existing installation and continuing" in line for line in logs))
 
+    def test_ensure_ollama_via_winget_skips_upgrade_when_no_update_is_applicable(self) -> None:
+        logs: list[str] = []
+        existing = r"C:\Users\Admin\AppData\Local\Programs\Ollama\ollama.exe"
+        with (
+            patch.object(m, "_IS_LINUX", False),
+            patch.object(m, "find_winget", return_value="winget.exe"),
+            patch.object(m, "find_ollama", return_value=existing),
+            patch.object(m, "run_command", return_value=m.WINGET_UPDATE_NOT_APPLICABLE) as run_command_mock,
+        ):
+            ok, pkg = m.ensure_ollama_via_winget(logs.append)
+        self.assertTrue(ok)
+        self.assertEqual(pkg, m.OLLAMA_WINGET_ID)
+        run_command_mock.assert_called_once()
+        self.assertTrue(any("already installed and up to date" in line for line in logs))
+
+        with (
+            patch.object(m, "_IS_LINUX", False),
+            patch.object(m, "find_winget", return_value="winget.exe"),
+            patch.object(m, "find_ollama", return_value=None),
+            patch.object(m, "run_command", side_effect=[m.WINGET_UPDATE_NOT_APPLICABLE - (1 << 32), 0]) as run_command_mock,
+        ):
+            ok, _pkg = m.ensure_ollama_via_winget(lambda _msg: None)
+        self.assertTrue(ok)
+        self.assertEqual(run_command_mock.call_count, 2)
+
     def test_ensure_ollama_via_winget_returns_error_when_winget_missing_or_install_fails(self) -> None:
         logs: list[str] = []
         with patch.object(m, "find_winget", return_value=None):
@@ -1978,7 +2665,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
     def test_try_install_mistral_vibe_uses_uv_then_falls_back_to_pip(self) -> None:
         logs: list[str] = []
-        spec = next(spec for spec in m.CLI_SPECS if spec.key == "mistral")
+        spec = m._CLI_BY_KEY["mistral"]
         with (
             patch.object(m, "ensure_mistral_vibe_dependencies", return_value=(["py.exe", "-3.14"], "uv.exe")),
             patch.object(m, "run_command", side_effect=[2, 0]) as run_command_mock,
@@ -1997,7 +2684,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
     def test_try_install_mistral_vibe_returns_false_on_dependency_error(self) -> None:
         logs: list[str] = []
-        spec = next(spec for spec in m.CLI_SPECS if spec.key == "mistral")
+        spec = m._CLI_BY_KEY["mistral"]
         with patch.object(m, "ensure_mistral_vibe_dependencies", side_effect=RuntimeError("Python 3.14 missing")):
             ok, detail = m.try_install_mistral_vibe(spec, logs.append)
         self.assertFalse(ok)
@@ -2006,7 +2693,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
     def test_try_install_mistral_vibe_returns_success_on_uv_and_failure_on_pip(self) -> None:
         logs: list[str] = []
-        spec = next(spec for spec in m.CLI_SPECS if spec.key == "mistral")
+        spec = m._CLI_BY_KEY["mistral"]
         with (
             patch.object(m, "ensure_mistral_vibe_dependencies", return_value=(["py.exe", "-3.14"], "uv.exe")),
             patch.object(m, "run_command", return_value=0),
@@ -2027,7 +2714,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
     def test_try_uninstall_mistral_vibe_returns_true_when_uv_succeeds(self) -> None:
         logs: list[str] = []
-        spec = next(item for item in m.CLI_SPECS if item.key == "mistral")
+        spec = m._CLI_BY_KEY["mistral"]
         with (
             patch.object(m, "find_uv", return_value="uv.exe"),
             patch.object(m, "_find_python_for_mistral_uninstall", return_value=["py.exe", "-3.14"]),
@@ -2052,7 +2739,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
     def test_install_worker_logs_failure_and_sets_failed_status(self) -> None:
         dummy = DummyFrame()
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
 
         def boom(_selected, _enable_auto_update=True):
             raise RuntimeError("boom")
@@ -2068,7 +2755,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_raises_when_npm_missing_after_node_setup(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        selected = [next(spec for spec in m.CLI_SPECS if spec.key == "codex")]
+        selected = [m._CLI_BY_KEY["codex"]]
 
         with (
             patch.object(m, "is_admin", return_value=False),
@@ -2082,7 +2769,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_raises_when_required_cli_install_fails(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
 
         with (
             patch.object(m, "is_admin", return_value=True),
@@ -2099,7 +2786,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_logs_shortcut_failure_and_completes(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
 
         with (
             patch.object(m, "is_admin", return_value=True),
@@ -2118,7 +2805,9 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             patch.object(m, "try_install_package_candidates", return_value=(True, "@openai/codex")),
             patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\codex.cmd"),
             patch.object(m, "ensure_cli_auto_update_task", return_value=["@openai/codex"]),
-            patch.object(m, "create_cli_desktop_shortcut", side_effect=RuntimeError("shortcut boom")),
+            patch.object(m, "is_windows", return_value=True),
+            patch.object(m, "find_desktop_directory", return_value=r"C:\Users\Admin\Desktop"),
+            patch.object(m, "create_windows_shortcuts", side_effect=RuntimeError("shortcut boom")),
         ):
             dummy._run_install([codex])
 
@@ -2126,10 +2815,245 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
         self.assertTrue(any("Next step: launch a shortcut" in line for line in dummy.logs))
         self.assertIn(98, dummy.gauges)
 
+    def test_run_install_overlaps_system_installs_with_serial_npm_installs(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "gemini", "mistral")]
+        mistral_started = threading.Event()
+        counter_lock = threading.Lock()
+        state: dict[str, object] = {"active": 0, "max_active": 0, "overlapped": False, "auto_update_packages": None}
+
+        def fake_npm_install(_npm_exe, spec, _log):
+            with counter_lock:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            if spec.key == "codex":
+                state["overlapped"] = mistral_started.wait(5)
+            with counter_lock:
+                state["active"] -= 1
+            return (True, spec.package_candidates[0])
+
+        def fake_mistral_install(_spec, _log):
+            mistral_started.set()
+            return (True, "mistral-vibe")
+
+        def fake_auto_update(_npm_exe, packages, _log):
+            state["auto_update_packages"] = list(packages)
+            return list(packages)
+
+        with (
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget"),
+            patch.object(m, "try_bulk_install_npm", return_value=False),
+            patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
+            patch.object(m, "get_cli_bin_dirs", return_value=[r"C:\Users\Admin\AppData\Roaming\npm"]),
+            patch.object(m, "get_python_cli_bin_dirs", return_value=[]),
+            patch.object(m, "add_dirs_to_path", return_value=([], None)),
+            patch.object(m, "try_install_package_candidates", side_effect=fake_npm_install),
+            patch.object(m, "try_install_mistral_vibe", side_effect=fake_mistral_install),
+            patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\cli.cmd"),
+            patch.object(m, "ensure_cli_auto_update_task", side_effect=fake_auto_update),
+            patch.object(m, "create_cli_desktop_shortcuts"),
+        ):
+            dummy._run_install(selected)
+
+        self.assertTrue(state["overlapped"])
+        self.assertEqual(state["max_active"], 1)
+        npm_packages = [spec.package_candidates[0] for spec in selected if spec.key != "mistral"]
+        self.assertEqual(state["auto_update_packages"], npm_packages)
+        self.assertIn(80, dummy.gauges)
+
+    def test_run_install_overlaps_windows_system_installs_with_node_bootstrap(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "ollama")]
+        ollama_started = threading.Event()
+        state: dict[str, bool] = {}
+
+        def fake_node_bootstrap(_log):
+            state["overlapped"] = ollama_started.wait(5)
+
+        def fake_ollama_install(_log):
+            ollama_started.set()
+            return (True, m.OLLAMA_WINGET_ID)
+
+        with (
+            patch.object(m, "is_linux", return_value=False),
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget", side_effect=fake_node_bootstrap),
+            patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
+            patch.object(m, "get_cli_bin_dirs", return_value=[r"C:\Users\Admin\AppData\Roaming\npm"]),
+            patch.object(m, "get_ollama_cli_bin_dirs", return_value=[]),
+            patch.object(m, "add_dirs_to_path", return_value=([], None)),
+            patch.object(m, "try_install_package_candidates", return_value=(True, "@openai/codex")),
+            patch.object(m, "ensure_ollama_via_winget", side_effect=fake_ollama_install),
+            patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\cli.cmd"),
+            patch.object(m, "ensure_cli_auto_update_task", return_value=["@openai/codex"]),
+            patch.object(m, "create_cli_desktop_shortcuts"),
+        ):
+            dummy._run_install(selected)
+
+        self.assertTrue(state["overlapped"])
+        self.assertTrue(any("Installed Ollama" in line for line in dummy.logs))
+
+    def test_run_install_prefixes_concurrent_install_output_with_cli_label(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "ollama")]
+        # Both installs log, wait for each other, then log again, so their lines interleave.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_npm_install(_npm_exe, spec, log):
+            log("npm step 1")
+            barrier.wait()
+            log("npm step 2")
+            return (True, spec.package_candidates[0])
+
+        def fake_ollama_install(log):
+            log("winget step 1")
+            barrier.wait()
+            log("winget step 2")
+            return (True, m.OLLAMA_WINGET_ID)
+
+        with (
+            patch.object(m, "is_linux", return_value=False),
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget"),
+            patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
+            patch.object(m, "get_cli_bin_dirs", return_value=[r"C:\Users\Admin\AppData\Roaming\npm"]),
+            patch.object(m, "get_ollama_cli_bin_dirs", return_value=[]),
+            patch.object(m, "add_dirs_to_path", return_value=([], None)),
+            patch.object(m, "try_install_package_candidates", side_effect=fake_npm_install),
+            patch.object(m, "ensure_ollama_via_winget", side_effect=fake_ollama_install),
+            patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\cli.cmd"),
+            patch.object(m, "ensure_cli_auto_update_task", return_value=["@openai/codex"]),
+            patch.object(m, "create_cli_desktop_shortcuts"),
+        ):
+            dummy._run_install(selected)
+
+        codex = m._CLI_BY_KEY["codex"]
+        ollama = m._CLI_BY_KEY["ollama"]
+        step_lines = [line for line in dummy.logs if " step " in line]
+        self.assertEqual(
+            sorted(step_lines),
+            sorted(
+                [
+                    f"[{codex.label}] npm step 1",
+                    f"[{codex.label}] npm step 2",
+                    f"[{ollama.label}] winget step 1",
+                    f"[{ollama.label}] winget step 2",
+                ]
+            ),
+        )
+        # Neither install finished its first step after the other had started its second.
+        self.assertLess(
+            max(step_lines.index(f"[{codex.label}] npm step 1"), step_lines.index(f"[{ollama.label}] winget step 1")),
+            min(step_lines.index(f"[{codex.label}] npm step 2"), step_lines.index(f"[{ollama.label}] winget step 2")),
+        )
+
+    def test_run_install_stops_queued_installs_when_node_bootstrap_fails(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "ollama")]
+
+        with (
+            patch.object(m, "is_linux", return_value=True),
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget", side_effect=RuntimeError("node boom")),
+            patch.object(m, "ensure_ollama_via_winget") as ollama_install,
+        ):
+            with self.assertRaises(RuntimeError):
+                dummy._run_install(selected)
+
+        ollama_install.assert_not_called()
+
+    def test_run_install_reprobes_cli_dirs_only_when_resolution_misses(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "gemini", "qwen")]
+        npm_dir = r"C:\Users\Admin\AppData\Roaming\npm"
+
+        def fake_resolve(candidates, _dirs):
+            # qwen is only found once the directories have been probed again.
+            if candidates == next(spec for spec in selected if spec.key == "qwen").command_candidates:
+                return npm_dir + r"\qwen.cmd" if get_dirs.call_count > 1 else None
+            return npm_dir + r"\cli.cmd"
+
+        with (
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget"),
+            patch.object(m, "try_bulk_install_npm", return_value=True),
+            patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
+            patch.object(m, "get_cli_bin_dirs", return_value=[npm_dir]) as get_dirs,
+            patch.object(m, "add_dirs_to_path", return_value=([], None)),
+            patch.object(m, "try_install_package_candidates", side_effect=lambda _n, spec, _l: (True, spec.package_candidates[0])),
+            patch.object(m, "resolve_command_path", side_effect=fake_resolve),
+            patch.object(m, "ensure_cli_auto_update_task", return_value=[]),
+            patch.object(m, "create_cli_desktop_shortcuts"),
+        ):
+            dummy._run_install(selected)
+
+        # Once before the installs, once after qwen's miss, once for the post-install PATH refresh.
+        self.assertEqual(get_dirs.call_count, 3)
+        self.assertTrue(any("Resolved command path for Qwen" in line for line in dummy.logs))
+
+    def test_run_install_skips_per_cli_npm_installs_after_successful_batch(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "gemini")]
+        state: dict[str, object] = {}
+
+        def fake_auto_update(_npm_exe, packages, _log):
+            state["auto_update_packages"] = list(packages)
+            return list(packages)
+
+        with (
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget"),
+            patch.object(m, "try_bulk_install_npm", return_value=True) as bulk_mock,
+            patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
+            patch.object(m, "get_cli_bin_dirs", return_value=[r"C:\Users\Admin\AppData\Roaming\npm"]),
+            patch.object(m, "add_dirs_to_path", return_value=([], None)),
+            patch.object(m, "try_install_package_candidates") as per_cli_mock,
+            patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\cli.cmd"),
+            patch.object(m, "ensure_cli_auto_update_task", side_effect=fake_auto_update),
+            patch.object(m, "create_cli_desktop_shortcuts"),
+        ):
+            dummy._run_install(selected)
+
+        bulk_mock.assert_called_once()
+        per_cli_mock.assert_not_called()
+        self.assertEqual(state["auto_update_packages"], [spec.package_candidates[0] for spec in selected])
+        self.assertIn(80, dummy.gauges)
+
+    def test_run_install_does_not_start_pending_installs_after_required_failure(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        selected = [spec for spec in m.CLI_SPECS if spec.key in ("codex", "gemini")]
+        attempted: list[str] = []
+
+        def fake_npm_install(_npm_exe, spec, _log):
+            attempted.append(spec.key)
+            return (False, None)
+
+        with (
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget"),
+            patch.object(m, "try_bulk_install_npm", return_value=False),
+            patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
+            patch.object(m, "get_cli_bin_dirs", return_value=[r"C:\Users\Admin\AppData\Roaming\npm"]),
+            patch.object(m, "add_dirs_to_path", return_value=([], None)),
+            patch.object(m, "try_install_package_candidates", side_effect=fake_npm_install),
+        ):
+            with self.assertRaises(RuntimeError):
+                dummy._run_install(selected)
+
+        self.assertEqual(len(attempted), 1)
+
     def test_run_install_mistral_success_uses_python_cli_dirs_for_resolution(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        mistral = next(spec for spec in m.CLI_SPECS if spec.key == "mistral")
+        mistral = m._CLI_BY_KEY["mistral"]
 
         def fake_auto_update(_npm_exe, _packages, log):
             log("Auto-update task unchanged: no newly installed npm CLI packages in this run.")
@@ -2153,7 +3077,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             patch.object(m, "try_install_mistral_vibe", return_value=(True, "mistral-vibe")),
             patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\Python\Scripts\vibe.exe") as resolve_mock,
             patch.object(m, "ensure_cli_auto_update_task", side_effect=fake_auto_update),
-            patch.object(m, "create_cli_desktop_shortcut", return_value=r"C:\Users\Admin\Desktop\Mistral Vibe CLI.lnk"),
+            patch.object(m, "create_cli_desktop_shortcuts"),
         ):
             dummy._run_install([mistral])
 
@@ -2166,7 +3090,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_ollama_success_uses_ollama_cli_dirs_for_resolution(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        ollama = next(spec for spec in m.CLI_SPECS if spec.key == "ollama")
+        ollama = m._CLI_BY_KEY["ollama"]
         state: dict[str, object] = {"auto_update_packages": None}
 
         def fake_auto_update(_npm_exe, packages, log):
@@ -2192,7 +3116,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             patch.object(m, "ensure_ollama_via_winget", return_value=(True, m.OLLAMA_WINGET_ID)),
             patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Local\Programs\Ollama\ollama.exe") as resolve_mock,
             patch.object(m, "ensure_cli_auto_update_task", side_effect=fake_auto_update),
-            patch.object(m, "create_cli_desktop_shortcut", return_value=r"C:\Users\Admin\Desktop\Ollama CLI.lnk"),
+            patch.object(m, "create_cli_desktop_shortcuts"),
         ):
             dummy._run_install([ollama])
 
@@ -2205,7 +3129,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_logs_path_refresh_and_auto_update_warnings(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
 
         add_results = [
             ([], "user path denied"),
@@ -2231,11 +3155,11 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             patch.object(m, "try_install_package_candidates", return_value=(True, "@openai/codex")),
             patch.object(m, "resolve_command_path", return_value=None),
             patch.object(m, "ensure_cli_auto_update_task", side_effect=RuntimeError("task failed")),
-            patch.object(m, "create_cli_desktop_shortcut") as shortcut_mock,
+            patch.object(m, "create_cli_desktop_shortcuts") as shortcut_mock,
         ):
             dummy._run_install([codex])
 
-        shortcut_mock.assert_not_called()
+        shortcut_mock.assert_called_once_with([], dummy.log)
         self.assertTrue(any("User PATH update warning: user path denied" in line for line in dummy.logs))
         self.assertTrue(any("Added to system PATH: C:\\Program Files\\nodejs" in line for line in dummy.logs))
         self.assertTrue(any("Warning: Could not resolve executable path for Codex CLI" in line for line in dummy.logs))
@@ -2248,7 +3172,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_skips_auto_update_when_toggle_disabled(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
 
         with (
             patch.object(m, "is_admin", return_value=True),
@@ -2267,7 +3191,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             patch.object(m, "try_install_package_candidates", return_value=(True, "@openai/codex")),
             patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\codex.cmd"),
             patch.object(m, "ensure_cli_auto_update_task") as auto_update_mock,
-            patch.object(m, "create_cli_desktop_shortcut"),
+            patch.object(m, "create_cli_desktop_shortcuts"),
         ):
             dummy._run_install([codex], enable_auto_update=False)
 
@@ -2277,18 +3201,17 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_install_continues_when_required_cli_locked_but_existing_command_found(self) -> None:
         dummy = DummyFrame()
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
         state: dict[str, object] = {"auto_update_packages": None, "shortcuts": []}
 
         def fake_auto_update(_npm_exe, packages, _log):
             state["auto_update_packages"] = list(packages)
             return list(packages)
 
-        def fake_shortcut(spec, cmd_path, _log):
+        def fake_shortcuts(items, _log):
             cast = state["shortcuts"]
             assert isinstance(cast, list)
-            cast.append((spec.key, cmd_path))
-            return r"C:\Users\Admin\Desktop\Codex CLI.lnk"
+            cast.extend((spec.key, cmd_path) for spec, cmd_path in items)
 
         with (
             patch.object(m, "is_admin", return_value=True),
@@ -2311,7 +3234,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             ),
             patch.object(m, "resolve_command_path", return_value=r"C:\Users\Admin\AppData\Roaming\npm\codex.cmd"),
             patch.object(m, "ensure_cli_auto_update_task", side_effect=fake_auto_update),
-            patch.object(m, "create_cli_desktop_shortcut", side_effect=fake_shortcut),
+            patch.object(m, "create_cli_desktop_shortcuts", side_effect=fake_shortcuts),
         ):
             dummy._run_install([codex])
 
@@ -2325,9 +3248,9 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
         dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
 
         selected = [
-            next(spec for spec in m.CLI_SPECS if spec.key == "codex"),
-            next(spec for spec in m.CLI_SPECS if spec.key == "mistral"),
-            next(spec for spec in m.CLI_SPECS if spec.key == "gemini"),
+            m._CLI_BY_KEY["codex"],
+            m._CLI_BY_KEY["mistral"],
+            m._CLI_BY_KEY["gemini"],
         ]
 
         state: dict[str, object] = {
@@ -2376,12 +3299,12 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             cmd = command_candidates[0]
             return rf"C:\Users\Admin\AppData\Roaming\npm\{cmd}.cmd"
 
-        def fake_shortcut(spec, cmd_path, log):
+        def fake_shortcuts(items, log):
             cast_list = state["shortcuts"]
             assert isinstance(cast_list, list)
-            cast_list.append((spec.key, cmd_path))
-            log(f"FAKE: shortcut created for {spec.key}")
-            return rf"C:\Users\Admin\Desktop\{spec.shortcut_name}.lnk"
+            for spec, cmd_path in items:
+                cast_list.append((spec.key, cmd_path))
+                log(f"FAKE: shortcut created for {spec.key}")
 
         def fake_auto_update(_npm_exe, packages, log):
             state["auto_update_packages"] = list(packages)
@@ -2399,7 +3322,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
             patch.object(m, "try_install_mistral_vibe", side_effect=fake_try_install_mistral),
             patch.object(m, "resolve_command_path", side_effect=fake_resolve),
             patch.object(m, "ensure_cli_auto_update_task", side_effect=fake_auto_update),
-            patch.object(m, "create_cli_desktop_shortcut", side_effect=fake_shortcut),
+            patch.object(m, "create_cli_desktop_shortcuts", side_effect=fake_shortcuts),
         ):
             m.InstallerFrame._install_worker(dummy, selected)
 
@@ -2450,13 +3373,28 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 
         self.assertTrue(any("Persistent log file: " in line for line in dummy.logs))
 
+    def test_run_install_with_empty_selection_skips_node_setup(self) -> None:
+        dummy = DummyFrame()
+        dummy._run_install = types.MethodType(m.InstallerFrame._run_install, dummy)
+        with (
+            patch.object(m, "is_admin", return_value=True),
+            patch.object(m, "ensure_node_via_winget") as node_mock,
+            patch.object(m, "add_dirs_to_path") as add_path_mock,
+        ):
+            dummy._run_install([])
+
+        node_mock.assert_not_called()
+        add_path_mock.assert_not_called()
+        self.assertIn("No CLI tools selected for install.", dummy.logs)
+
     def test_run_uninstall_removes_shortcuts_and_updates_auto_update_packages(self) -> None:
         dummy = DummyFrame()
         dummy._run_uninstall = types.MethodType(m.InstallerFrame._run_uninstall, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
 
         with (
             patch.object(m, "is_windows", return_value=True),
+            patch.object(m, "is_admin", return_value=True),
             patch.object(m, "find_npm", return_value=r"C:\Fake\nodejs\npm.cmd"),
             patch.object(m, "try_uninstall_package_candidates", return_value=(True, None)),
             patch.object(m, "remove_cli_desktop_shortcuts") as remove_shortcuts_mock,
@@ -2471,7 +3409,7 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
     def test_run_uninstall_raises_when_npm_missing_for_npm_cli(self) -> None:
         dummy = DummyFrame()
         dummy._run_uninstall = types.MethodType(m.InstallerFrame._run_uninstall, dummy)
-        codex = next(spec for spec in m.CLI_SPECS if spec.key == "codex")
+        codex = m._CLI_BY_KEY["codex"]
         with patch.object(m, "find_npm", return_value=None):
             with self.assertRaises(RuntimeError) as ctx:
                 dummy._run_uninstall([codex])
@@ -2481,8 +3419,10 @@ class NodeInstallAndWorkflowTests(unittest.TestCase):
 class UiHandlerTests(unittest.TestCase):
     def test_append_log_writes_line_and_scrolls(self) -> None:
         dummy = types.SimpleNamespace(log_ctrl=DummyLogCtrl())
-        m.InstallerFrame._append_log(dummy, "hello")
+        m.InstallerFrame._append_log_lines(dummy, ["hello"])
         self.assertEqual(dummy.log_ctrl.appended, ["hello\n"])
+        m.InstallerFrame._append_log_lines(dummy, ["a", "b"])
+        self.assertEqual(dummy.log_ctrl.appended, ["hello\n", "a\nb\n"])
 
     def test_append_log_writes_persistent_file_when_path_available(self) -> None:
         with tempfile.TemporaryDirectory(dir=".") as tmp_dir:
@@ -2492,7 +3432,8 @@ class UiHandlerTests(unittest.TestCase):
                 _persistent_log_path=log_path,
                 _persistent_log_write_warning_shown=False,
             )
-            m.InstallerFrame._append_log(dummy, "hello")
+            m.InstallerFrame._append_log_lines(dummy, ["hello"])
+            m.close_persistent_log_files()
             with open(log_path, "r", encoding="utf-8") as f:
                 self.assertEqual(f.read(), "hello\n")
 
@@ -2503,8 +3444,8 @@ class UiHandlerTests(unittest.TestCase):
             _persistent_log_write_warning_shown=False,
         )
         with patch.object(m, "append_persistent_log_line", side_effect=["disk full", "disk full"]):
-            m.InstallerFrame._append_log(dummy, "first")
-            m.InstallerFrame._append_log(dummy, "second")
+            m.InstallerFrame._append_log_lines(dummy, ["first"])
+            m.InstallerFrame._append_log_lines(dummy, ["second"])
 
         self.assertTrue(dummy._persistent_log_write_warning_shown)
         self.assertEqual(
@@ -2526,12 +3467,20 @@ class UiHandlerTests(unittest.TestCase):
         self.assertEqual(dummy._persistent_log_path, "new.log")
         self.assertFalse(dummy._persistent_log_write_warning_shown)
 
-    def test_log_set_status_set_gauge_use_callafter(self) -> None:
+    def test_log_queues_lines_and_set_status_set_gauge_use_callafter(self) -> None:
         log_ctrl = DummyLogCtrl()
         status_label = types.SimpleNamespace(SetLabel=MagicMock())
         gauge = types.SimpleNamespace(SetValue=MagicMock())
-        dummy = types.SimpleNamespace(log_ctrl=log_ctrl, status_label=status_label, gauge=gauge)
-        dummy._append_log = types.MethodType(m.InstallerFrame._append_log, dummy)
+        dummy = types.SimpleNamespace(
+            log_ctrl=log_ctrl,
+            status_label=status_label,
+            gauge=gauge,
+            _log_buffer=m.BatchedLogger(),
+            _ui_update_lock=threading.Lock(),
+            _ui_last_values={},
+        )
+        dummy._append_log_lines = types.MethodType(m.InstallerFrame._append_log_lines, dummy)
+        dummy._call_after_if_changed = types.MethodType(m.InstallerFrame._call_after_if_changed, dummy)
         calls: list[str] = []
 
         def immediate(fn, *args, **kwargs):
@@ -2540,13 +3489,87 @@ class UiHandlerTests(unittest.TestCase):
 
         with patch.object(m.wx, "CallAfter", side_effect=immediate):
             m.InstallerFrame.log(dummy, "line")
+            m.InstallerFrame.log(dummy, "second line")
+            self.assertEqual(log_ctrl.appended, [])
             m.InstallerFrame.set_status(dummy, "Working")
             m.InstallerFrame.set_gauge(dummy, 150)
+            # Unchanged values do not post another GUI event.
+            m.InstallerFrame.set_status(dummy, "Working")
+            m.InstallerFrame.set_gauge(dummy, 100)
+
+        m.InstallerFrame._flush_log_queue(dummy)
+        m.InstallerFrame._flush_log_queue(dummy)
 
-        self.assertEqual(log_ctrl.appended, ["line\n"])
+        self.assertEqual(log_ctrl.appended, ["line\nsecond line\n"])
         status_label.SetLabel.assert_called_once_with("Status: Working")
         gauge.SetValue.assert_called_once_with(100)
-        self.assertTrue(calls)
+        self.assertEqual(len(calls), 2)
+
+    def test_set_progress_posts_one_event_and_skips_unchanged_values(self) -> None:
+        status_label = types.SimpleNamespace(SetLabel=MagicMock())
+        gauge = types.SimpleNamespace(SetValue=MagicMock())
+        dummy = types.SimpleNamespace(
+            status_label=status_label,
+            gauge=gauge,
+            _ui_update_lock=threading.Lock(),
+            _ui_last_values={},
+        )
+        posted: list[object] = []
+
+        def immediate(fn, *args, **kwargs):
+            posted.append(fn)
+            return fn(*args, **kwargs)
+
+        with patch.object(m.wx, "CallAfter", side_effect=immediate):
+            m.InstallerFrame.set_progress(dummy, "Locating npm", 15)
+            m.InstallerFrame.set_progress(dummy, "Locating npm", 15)
+            m.InstallerFrame.set_progress(dummy, "Locating npm", 120)
+
+        self.assertEqual(len(posted), 2)
+        status_label.SetLabel.assert_called_once_with("Status: Locating npm")
+        self.assertEqual([c.args for c in gauge.SetValue.call_args_list], [(15,), (100,)])
+
+    def test_batched_logger_drains_at_most_max_lines_per_call(self) -> None:
+        buffer = m.BatchedLogger(max_lines_per_drain=2)
+        for line in ("a", "b", "c"):
+            buffer.enqueue(line)
+        self.assertEqual(buffer.drain(), ["a", "b"])
+        self.assertEqual(buffer.drain(), ["c"])
+        self.assertEqual(buffer.drain(), [])
+
+    def test_frame_close_stops_timer_and_flushes_queued_lines(self) -> None:
+        log_ctrl = DummyLogCtrl()
+        dummy = types.SimpleNamespace(
+            worker_future=DummyWorkerFuture(False),
+            log_ctrl=log_ctrl,
+            _log_buffer=m.BatchedLogger(max_lines_per_drain=1),
+            _log_timer=types.SimpleNamespace(Stop=MagicMock()),
+        )
+        dummy._append_log_lines = types.MethodType(m.InstallerFrame._append_log_lines, dummy)
+        dummy._log_buffer.enqueue("first")
+        dummy._log_buffer.enqueue("second")
+        event = types.SimpleNamespace(Skip=MagicMock())
+
+        m.InstallerFrame._on_frame_close(dummy, event)
+
+        dummy._log_timer.Stop.assert_called_once()
+        self.assertEqual(log_ctrl.appended, ["first\n", "second\n"])
+        event.Skip.assert_called_once()
+
+    def test_frame_close_is_vetoed_while_worker_running(self) -> None:
+        dummy = types.SimpleNamespace(
+            worker_future=DummyWorkerFuture(True),
+            _log_timer=types.SimpleNamespace(Stop=MagicMock()),
+        )
+        event = types.SimpleNamespace(CanVeto=MagicMock(return_value=True), Veto=MagicMock(), Skip=MagicMock())
+
+        with patch.object(m.wx, "MessageBox") as msg_mock:
+            m.InstallerFrame._on_frame_close(dummy, event)
+
+        msg_mock.assert_called_once()
+        event.Veto.assert_called_once()
+        event.Skip.assert_not_called()
+        dummy._log_timer.Stop.assert_not_called()
 
     def test_set_busy_disables_buttons_and_pulses_when_busy(self) -> None:
         install_btn = types.SimpleNamespace(Enable=MagicMock())
@@ -2560,10 +3583,13 @@ class UiHandlerTests(unittest.TestCase):
             cli_action_buttons={"codex": cli_btn},
             gui_app_action_buttons={"chatgpt_app": app_btn},
             gauge=gauge,
+            _ui_update_lock=threading.Lock(),
+            _ui_last_values={"gauge": 0},
         )
 
         with patch.object(m.wx, "CallAfter", side_effect=lambda fn, *a, **k: fn(*a, **k)):
             m.InstallerFrame.set_busy(dummy, True)
+            self.assertNotIn("gauge", dummy._ui_last_values)
             m.InstallerFrame.set_busy(dummy, False)
 
         install_btn.Enable.assert_any_call(False)
@@ -2593,6 +3619,36 @@ class UiHandlerTests(unittest.TestCase):
         buttons["codex"].SetLabel.assert_called_with("Uninstall Codex CLI")
         dummy.install_all_btn.SetLabel.assert_called_with("&Uninstall All")
 
+    def test_rediscover_cli_state_refreshes_buttons_on_gui_thread(self) -> None:
+        dummy = types.SimpleNamespace(refresh_cli_action_buttons=MagicMock())
+        dummy._rediscover_cli_state = types.MethodType(m.InstallerFrame._rediscover_cli_state, dummy)
+        with (
+            patch.object(m, "discover_environment") as discover_mock,
+            patch.object(m.wx, "CallAfter") as call_after_mock,
+            patch.object(m, "submit_bg", side_effect=lambda fn: fn()) as submit_mock,
+        ):
+            m.InstallerFrame._refresh_cli_detection_in_background(dummy)
+
+        submit_mock.assert_called_once()
+        discover_mock.assert_called_once_with(refresh=True)
+        call_after_mock.assert_called_once_with(dummy.refresh_cli_action_buttons)
+        dummy.refresh_cli_action_buttons.assert_not_called()
+
+    def test_detection_helpers_read_cached_discovery(self) -> None:
+        codex = m._CLI_BY_KEY["codex"]
+        ollama = m._CLI_BY_KEY["ollama"]
+        dummy = types.SimpleNamespace()
+        dummy._get_cli_detection_dirs = types.MethodType(m.InstallerFrame._get_cli_detection_dirs, dummy)
+        discovery = {"cli_detection_dirs": [r"C:\npm"], "ollama": None}
+        with (
+            patch.object(m, "discover_environment", return_value=discovery),
+            patch.object(m, "resolve_command_path", return_value=r"C:\npm\codex.cmd") as resolve_mock,
+        ):
+            self.assertEqual(m.InstallerFrame._get_cli_detection_dirs(dummy), [r"C:\npm"])
+            self.assertTrue(m.InstallerFrame._is_cli_installed(dummy, codex))
+            self.assertFalse(m.InstallerFrame._is_cli_installed(dummy, ollama))
+        resolve_mock.assert_called_once_with(codex.command_candidates, [r"C:\npm"])
+
     def test_refresh_gui_app_action_buttons_updates_individual_and_bulk_labels(self) -> None:
         buttons = {spec.key: types.SimpleNamespace(SetLabel=MagicMock()) for spec in m.GUI_APP_SPECS}
         dummy = types.SimpleNamespace(
@@ -2611,27 +3667,41 @@ class UiHandlerTests(unittest.TestCase):
             m.InstallerFrame.refresh_gui_app_action_buttons(dummy)
         dummy.install_btn.SetLabel.assert_called_with("&Uninstall All Apps")
 
-    def test_on_close_blocks_when_worker_thread_running(self) -> None:
-        dummy = types.SimpleNamespace(worker_thread=DummyThreadState(True), Close=MagicMock())
+    def test_on_close_blocks_when_worker_running(self) -> None:
+        dummy = types.SimpleNamespace(worker_future=DummyWorkerFuture(True), Close=MagicMock())
         with patch.object(m.wx, "MessageBox") as msg_mock:
             m.InstallerFrame.on_close(dummy, None)
         msg_mock.assert_called_once()
         dummy.Close.assert_not_called()
 
+    def test_start_worker_submits_to_shared_background_pool(self) -> None:
+        dummy = types.SimpleNamespace(worker_future=None)
+        seen: list[tuple[str, tuple[object, ...]]] = []
+
+        def target(*args: object) -> None:
+            seen.append((threading.current_thread().name, args))
+
+        m.InstallerFrame._start_worker(dummy, target, ("install", []))
+        dummy.worker_future.result(timeout=5)
+
+        self.assertTrue(dummy.worker_future.done())
+        self.assertEqual(seen[0][1], ("install", []))
+        self.assertTrue(seen[0][0].startswith("itc-bg"))
+
     def test_on_close_closes_when_idle(self) -> None:
-        dummy = types.SimpleNamespace(worker_thread=DummyThreadState(False), Close=MagicMock())
+        dummy = types.SimpleNamespace(worker_future=DummyWorkerFuture(False), Close=MagicMock())
         m.InstallerFrame.on_close(dummy, None)
         dummy.Close.assert_called_once()
 
     def test_on_install_returns_if_worker_already_running(self) -> None:
-        dummy = types.SimpleNamespace(worker_thread=DummyThreadState(True))
+        dummy = types.SimpleNamespace(worker_future=DummyWorkerFuture(True))
         with patch.object(m.wx, "MessageBox") as msg_mock:
             m.InstallerFrame.on_install(dummy, None)
         msg_mock.assert_not_called()
 
     def test_on_install_all_apps_toggle_warns_when_nothing_to_do(self) -> None:
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             gui_app_installed_state={spec.key: True for spec in m.GUI_APP_SPECS},
             refresh_gui_app_action_buttons=MagicMock(),
             _all_gui_apps_installed=MagicMock(return_value=False),
@@ -2643,7 +3713,7 @@ class UiHandlerTests(unittest.TestCase):
     def test_on_install_all_apps_toggle_starts_install_for_missing_apps(self) -> None:
         installed_state = {spec.key: (spec.key == "chatgpt_app") for spec in m.GUI_APP_SPECS}
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             gui_app_installed_state=installed_state,
             refresh_gui_app_action_buttons=MagicMock(),
             _all_gui_apps_installed=MagicMock(return_value=False),
@@ -2664,7 +3734,7 @@ class UiHandlerTests(unittest.TestCase):
 
     def test_on_install_all_apps_toggle_starts_uninstall_when_all_installed(self) -> None:
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             gui_app_installed_state={spec.key: True for spec in m.GUI_APP_SPECS},
             refresh_gui_app_action_buttons=MagicMock(),
             _all_gui_apps_installed=MagicMock(return_value=True),
@@ -2680,7 +3750,7 @@ class UiHandlerTests(unittest.TestCase):
 
     def test_on_gui_app_action_uses_installed_state_to_pick_uninstall(self) -> None:
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             gui_app_installed_state={"chatgpt_app": True},
             _prepare_for_worker_run=MagicMock(return_value=True),
             _start_worker=MagicMock(),
@@ -2694,7 +3764,7 @@ class UiHandlerTests(unittest.TestCase):
 
     def test_on_install_all_toggle_starts_install_for_missing_clis(self) -> None:
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             cli_installed_state={spec.key: (spec.key == "codex") for spec in m.CLI_SPECS},
             refresh_cli_action_buttons=MagicMock(),
             _prepare_for_worker_run=MagicMock(return_value=True),
@@ -2713,7 +3783,7 @@ class UiHandlerTests(unittest.TestCase):
 
     def test_on_install_all_toggle_starts_uninstall_when_all_installed(self) -> None:
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             cli_installed_state={spec.key: True for spec in m.CLI_SPECS},
             refresh_cli_action_buttons=MagicMock(),
             _prepare_for_worker_run=MagicMock(return_value=True),
@@ -2730,7 +3800,7 @@ class UiHandlerTests(unittest.TestCase):
 
     def test_on_cli_action_uses_installed_state_to_pick_uninstall(self) -> None:
         dummy = types.SimpleNamespace(
-            worker_thread=None,
+            worker_future=None,
             cli_installed_state={"codex": True},
             _prepare_for_worker_run=MagicMock(return_value=True),
             _start_worker=MagicMock(),